@@ -6,10 +6,16 @@ from langchain.messages import HumanMessage
 from dotenv import load_dotenv
 from ..tools.src.tools_for_agent.static_tools import (
     read_file,
+    tail_file,
+    list_archive,
+    read_archive_member,
+    profile_data_file,
     write_file,
     add_file,
     delete_file,
     rename_file,
+    copy_file,
+    bulk_file_operations,
     excute_python,
 )
 from ..tools.src.tools_for_agent.generate_dynamic_tools import generate_working_dir_tool
@@ -26,10 +32,16 @@ tool_model = ChatDeepSeek(model="deepseek-chat", temperature=0)
 # 配置tool_agent
 static_tools = [
     read_file,
+    tail_file,
+    list_archive,
+    read_archive_member,
+    profile_data_file,
     write_file,
     add_file,
     delete_file,
     rename_file,
+    copy_file,
+    bulk_file_operations,
     excute_python,
 ]
 with (
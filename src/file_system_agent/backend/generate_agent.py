@@ -7,19 +7,33 @@ from langchain_deepseek import ChatDeepSeek
 from langchain.agents import create_agent
 from langchain_core.runnables import RunnableConfig
 from langchain.tools import tool, BaseTool
-from langchain.messages import HumanMessage
+from langchain.messages import AnyMessage, HumanMessage, ToolMessage
 from langchain.agents.middleware import SummarizationMiddleware
+from langchain.agents.structured_output import ToolStrategy
 from langgraph.checkpoint.memory import InMemorySaver
 
 from ..tools.src.tools_for_agent.static_tools import (
     read_file,
+    tail_file,
+    list_archive,
+    read_archive_member,
+    profile_data_file,
     write_file,
     add_file,
     delete_file,
     rename_file,
+    copy_file,
+    bulk_file_operations,
     excute_python,
 )
 from ..tools.src.tools_for_agent.generate_dynamic_tools import generate_working_dir_tool
+from ..tools.src.file_system_tools.working_dir import WorkingDir
+from ..tools.src.file_system_tools.dir_pager import page_entries
+from ..tools.src.file_system_tools.listing_cache import ListingCache
+from ..tools.src.file_system_tools.name_index import NameIndex
+from ..tools.src.file_system_tools.metadata_index import MetadataIndex
+from ..tools.src.file_system_tools.duplicate_finder import HashCache
+from ..tools.src.file_system_tools.symbol_index import SymbolIndex
 
 
 class FileSystemItem(TypedDict):
@@ -30,22 +44,42 @@ class FileSystemItem(TypedDict):
     target: Optional[str]
 
 
+class AgentReply(BaseModel):
+    """agent的结构化输出格式，目录内容由服务端填充，模型只需要给出回复和标记"""
+
+    reply: str = Field(..., description="AI的回复内容")
+    with_file_system: bool = Field(
+        ...,
+        description="回复是否涉及当前目录的内容，为True时会向用户展示当前目录的文件列表",
+    )
+
+
 class ReplyResponse(BaseModel):
-    """生成agent的回复格式"""
+    """返回给前端的回复格式"""
 
     reply: str = Field(..., description="AI的回复内容")
     with_file_system: bool = Field(..., description="是否包含文件系统信息")
     file_system: Optional[list[FileSystemItem]] = Field(
         None,
-        description="""如果包含文件系统信息，则为文件系统的内容列表，列表中每一项包含以下字段：
+        description="""如果包含文件系统信息，则为当前目录的内容列表，列表中每一项包含以下字段：
         - file_name: 文件或目录的名称
         - full_name: 文件或目录的完整路径
         - file_type: 文件类型（file 或 directory 或 link）
         - size: 文件大小（字节）
         - target: 可选，如果是链接文件，则为链接目标路径
-        如果不包含文件系统信息，则为返回空值。
+        如果不包含文件系统信息，则为空值。
+        目录项过多时只包含按类型排序(目录在前)的前 FILE_SYSTEM_PAGE_SIZE 项。
     """,
     )
+    file_system_truncated: bool = Field(
+        False, description="file_system 是否因为目录项过多而只包含了一部分"
+    )
+
+
+# 会列出目录内容的工具，本轮调用过这些工具时由服务端填充 file_system
+LISTING_TOOLS = frozenset({"list_directory_contents"})
+# 回复中 file_system 最多包含的目录项数，避免超大目录把整个列表塞进一个回复
+FILE_SYSTEM_PAGE_SIZE = 500
 
 
 prompt_dir: Path = resources.files(__package__) / ".." / "agents" / "prompts"  # type: ignore
@@ -54,62 +88,85 @@ model = ChatDeepSeek(model="deepseek-chat", temperature=0)
 # 配置工具agent
 tool_agent_tools = [
     read_file,
+    tail_file,
+    list_archive,
+    read_archive_member,
+    profile_data_file,
     write_file,
     add_file,
     delete_file,
     rename_file,
+    copy_file,
+    bulk_file_operations,
     excute_python,
 ]
 with open(prompt_dir / "tool_agent.md", "r", encoding="utf-8") as f:
     TOOL_PROMPT = f.read()
 if not TOOL_PROMPT:
     raise ValueError("无法加载tool_agent的提示词模板")
-tool_agent = create_agent(
-    model=model,
-    tools=tool_agent_tools,
-    system_prompt=TOOL_PROMPT,
-    checkpointer=InMemorySaver(),
-)
 
 
-# 将智能体改造为tool
-@tool
-def file_expert(task: str) -> str:
-    """文件操作专家。负责所有文件相关操作。
+def create_file_expert() -> BaseTool:
+    """创建文件操作专家工具
 
-    可以执行：
-    - 读取文件内容
-    - 写入/覆盖文件
-    - 创建新文件
-    - 删除文件
-    - 重命名/移动文件
-    - 总结文件内容
-    - 回答关于文件内容的问题
-    - 执行python文件
-
-    Args:
-        task: 描述要执行的文件操作任务，例如：
-            - "读取 C:/project/config.json"
-            - "总结 E:/data/report.txt 的内容"
-            - "将这段代码写入 E:/code/utils.py: [代码内容]"
-            - "删除 C:/temp/old.txt"
-            - "把 C:/old.txt 重命名为 C:/new.txt"
-            - "执行 E:/code/script.py"
+    每次调用都会创建新的工具agent和独立的对话记录，每个主控agent(会话)各自持有一个，
+    不同会话的文件操作不会共享对话记录，也不会同时运行在同一个对话线程上。
+    会话被淘汰时工具agent和对话记录随之释放。
 
     Returns:
-        操作结果或文件内容
+        BaseTool: 把工具agent包装成的 file_expert 工具
     """
-    try:
-        # 调用 tool_agent 处理任务
-        config: RunnableConfig = {"configurable": {"thread_id": "file_expert_thread"}}
-        result = tool_agent.invoke({"messages": [HumanMessage(content=task)]}, config)
+    tool_agent = create_agent(
+        model=model,
+        tools=tool_agent_tools,
+        system_prompt=TOOL_PROMPT,
+        checkpointer=InMemorySaver(),
+    )
+
+    # 将智能体改造为tool
+    @tool
+    def file_expert(task: str) -> str:
+        """文件操作专家。负责所有文件相关操作。
+
+        可以执行：
+        - 读取文件内容
+        - 写入/覆盖文件
+        - 创建新文件
+        - 删除文件
+        - 重命名/移动文件
+        - 总结文件内容
+        - 回答关于文件内容的问题
+        - 执行python文件
+
+        Args:
+            task: 描述要执行的文件操作任务，例如：
+                - "读取 C:/project/config.json"
+                - "总结 E:/data/report.txt 的内容"
+                - "将这段代码写入 E:/code/utils.py: [代码内容]"
+                - "删除 C:/temp/old.txt"
+                - "把 C:/old.txt 重命名为 C:/new.txt"
+                - "执行 E:/code/script.py"
+
+        Returns:
+            操作结果或文件内容
+        """
+        try:
+            # 调用 tool_agent 处理任务
+            config: RunnableConfig = {
+                "configurable": {"thread_id": "file_expert_thread"}
+            }
+            result = tool_agent.invoke(
+                {"messages": [HumanMessage(content=task)]}, config
+            )
 
-        # 提取最后的响应
-        last_message = result["messages"][-1]
-        return last_message.content
+            # 提取最后的响应
+            last_message = result["messages"][-1]
+            return last_message.content
 
-    except Exception as e:
-        return f"文件操作失败: {str(e)}"
+        except Exception as e:
+            return f"文件操作失败: {str(e)}"
+
+    return file_expert
 
 
 # 配置主控agent
@@ -131,21 +188,44 @@ _more_prompt = """
 - "显示 E:/project 目录的内容"
 - "告诉我 D:/data 目录下有什么"
 
-请务必将回复格式的"with_file_system"字段设置为True，并且在"file_system"字段中以列表形式返回目录内容, 具体格式请参考具体的说明。
+请务必将回复格式的"with_file_system"字段设置为True。目录内容会由系统根据当前工作目录自动附加，不需要你在回复中逐项列出全部文件，"reply"中给出概括或用户关心的部分即可。
 """
 CONTROLLER_PROMPT += _more_prompt
 
 
-def create_controller_agent(root_path: str):
+def create_controller_agent(
+    root_path: str,
+    listing_cache: ListingCache | None = None,
+    name_index: NameIndex | None = None,
+    metadata_index: MetadataIndex | None = None,
+    hash_cache: HashCache | None = None,
+    symbol_index: SymbolIndex | None = None,
+):
+    """创建主控agent
+
+    Args:
+        root_path (str): 允许agent访问的根目录
+        listing_cache (ListingCache | None): 多个agent之间共享的目录列表缓存
+        name_index (NameIndex | None): 多个agent之间共享的文件名索引
+        metadata_index (MetadataIndex | None): 多个agent之间共享的元信息索引
+        hash_cache (HashCache | None): 多个agent之间共享的文件哈希缓存
+        symbol_index (SymbolIndex | None): 多个agent之间共享的 Python 符号索引
+
+    Returns:
+        tuple: (agent, working_dir)，working_dir 用于在回复中填充目录内容
+    """
     controller_agent_tools: list[BaseTool]
-    controller_agent_tools, _ = generate_working_dir_tool(root_path)  # type: ignore
-    controller_agent_tools.append(file_expert)
-    return create_agent(
+    controller_agent_tools, working_dir = generate_working_dir_tool(  # type: ignore
+        root_path, listing_cache, name_index, metadata_index, hash_cache, symbol_index
+    )
+    controller_agent_tools.append(create_file_expert())
+    agent = create_agent(
         model=model,
         tools=controller_agent_tools,
         checkpointer=InMemorySaver(),
         system_prompt=CONTROLLER_PROMPT,
-        response_format=ReplyResponse,
+        # 固定使用工具调用输出结构化回复，流式接口从工具参数中解析回复文本
+        response_format=ToolStrategy(AgentReply),
         middleware=[
             SummarizationMiddleware(
                 model=model,
@@ -155,3 +235,50 @@ def create_controller_agent(root_path: str):
             )
         ],
     )
+    return agent, working_dir
+
+
+def _listing_tool_ran(messages: list[AnyMessage]) -> bool:
+    """判断最近一轮对话（最后一条用户消息之后）中是否调用过目录列表工具"""
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            return False
+        if isinstance(message, ToolMessage) and message.name in LISTING_TOOLS:
+            return True
+    return False
+
+
+def build_reply(
+    result: dict, working_dir: WorkingDir, page_size: int = FILE_SYSTEM_PAGE_SIZE
+) -> ReplyResponse:
+    """根据agent的运行结果组装返回给前端的回复
+
+    模型只输出回复文本和 with_file_system 标记。模型标记需要展示目录，
+    或者本轮调用过目录列表工具时，直接使用 WorkingDir 当前目录的列表填充
+    file_system，避免模型把整个目录列表重新生成一遍。目录项超过 page_size 时
+    只返回目录在前的前 page_size 项，并设置 file_system_truncated。
+
+    Args:
+        result (dict): agent.invoke 的返回值
+        working_dir (WorkingDir): agent工具所使用的工作目录
+        page_size (int): file_system 最多包含的目录项数
+
+    Returns:
+        ReplyResponse: 返回给前端的回复
+    """
+    structured: AgentReply = result["structured_response"]
+    with_file_system = structured.with_file_system or _listing_tool_ran(
+        result["messages"]
+    )
+    file_system: Optional[list[FileSystemItem]] = None
+    truncated = False
+    if with_file_system:
+        page = page_entries(working_dir.iter_dir(), page_size, sort_key="type")
+        file_system = page["items"]  # type: ignore
+        truncated = page["next_cursor"] is not None
+    return ReplyResponse(
+        reply=structured.reply,
+        with_file_system=with_file_system,
+        file_system=file_system,
+        file_system_truncated=truncated,
+    )
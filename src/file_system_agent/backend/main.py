@@ -1,21 +1,55 @@
 import importlib.resources
-from typing import Optional, TypedDict
 import importlib
 import argparse
-
-from fastapi import FastAPI, staticfiles
+import asyncio
+import contextlib
+import re
+import uuid
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any, TypedDict
+
+from fastapi import FastAPI, Request, Response, staticfiles
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
 from langchain.messages import HumanMessage
 from langchain_core.runnables import RunnableConfig
 import uvicorn
 
-from .generate_agent import create_controller_agent
+from .generate_agent import ReplyResponse, build_reply, create_controller_agent
+from .sessions import SessionStore
+from .streaming import AgentEventTranslator, format_sse
+from ..tools.src.file_system_tools.listing_cache import ListingCache
+from ..tools.src.file_system_tools.name_index import NameIndex
+from ..tools.src.file_system_tools.metadata_index import MetadataIndex
+from ..tools.src.file_system_tools.duplicate_finder import HashCache
+from ..tools.src.file_system_tools.symbol_index import SymbolIndex
+from ..tools.src.file_system_tools.working_dir import WorkingDir
 
 
 def generate_parser():
     parser = argparse.ArgumentParser(description="文件系统管理智能体CLI")
     parser.add_argument("-r", "--root", type=str, required=True)
+    parser.add_argument(
+        "-c",
+        "--max-concurrency",
+        type=int,
+        default=4,
+        help="同时处理的回复请求数上限，超出的请求排队等待；同一会话的请求总是依次处理",
+    )
+    parser.add_argument(
+        "--max-sessions",
+        type=int,
+        default=64,
+        help="最多同时保存的会话数，超出时淘汰最久未使用的会话",
+    )
+    parser.add_argument(
+        "--session-ttl",
+        type=float,
+        default=1800,
+        help="会话空闲多少秒后被淘汰，淘汰后对话记录和当前目录会被清空",
+    )
     return parser
 
 
@@ -27,33 +61,69 @@ class MessageRequest(BaseModel):
     content: str
 
 
-class FileSystemItem(TypedDict):
-    file_name: str
-    full_name: str
-    file_type: str
-    size: int
-    target: Optional[str]
-
-
-class ReplyResponse(BaseModel):
-    """生成agent的回复格式"""
-
-    reply: str = Field(..., description="AI的回复内容")
-    with_file_system: bool = Field(..., description="是否包含文件系统信息")
-    file_system: Optional[list[FileSystemItem]] = Field(
-        None,
-        description="""如果包含文件系统信息，则为文件系统的内容列表，列表中每一项包含以下字段：
-        - file_name: 文件或目录的名称
-        - full_name: 文件或目录的完整路径
-        - file_type: 文件类型（file 或 directory 或 link）
-        - size: 文件大小（字节）
-        - target: 可选，如果是链接文件，则为链接目标路径
-        如果不包含文件系统信息，则为返回空值。
-    """,
+class Session(TypedDict):
+    agent: Any
+    working_dir: WorkingDir
+    config: RunnableConfig
+    lock: asyncio.Lock  # 同一会话的请求依次处理，避免同时修改当前目录和对话记录
+
+
+SESSION_COOKIE = "session_id"
+SESSION_HEADER = "X-Session-Id"
+_SESSION_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{8,64}")
+
+# 缓存和索引只和根目录有关，所有会话共享: 新会话不需要重新遍历根目录，
+# 同一个 SQLite 文件也只有一个连接，不同会话的刷新不会互相等待写锁
+listing_cache = ListingCache()
+name_index = NameIndex(Path(args.root))
+metadata_index = MetadataIndex(Path(args.root))
+hash_cache = HashCache()
+symbol_index = SymbolIndex(Path(args.root))
+
+
+def create_session(session_id: str) -> Session:
+    """为新会话创建独立的agent(对话记录)和工作目录
+
+    会话只持有agent、对话记录和 WorkingDir 这些内存中的状态，文件句柄和数据库连接
+    都属于共享的缓存和索引，会话被淘汰时不需要关闭任何资源。
+    """
+    agent, working_dir = create_controller_agent(
+        args.root, listing_cache, name_index, metadata_index, hash_cache, symbol_index
     )
+    return {
+        "agent": agent,
+        "working_dir": working_dir,
+        "config": {"configurable": {"thread_id": session_id}},
+        "lock": asyncio.Lock(),
+    }
+
 
+sessions: SessionStore[Session] = SessionStore(
+    create_session, max_sessions=args.max_sessions, ttl=args.session_ttl
+)
+
+
+def resolve_session_id(request: Request) -> tuple[str, bool]:
+    """依次从请求头和cookie中读取会话id，都没有时生成新的id
+
+    Returns:
+        tuple[str, bool]: (会话id, 是否为新生成的id)
+    """
+    for session_id in (
+        request.headers.get(SESSION_HEADER),
+        request.cookies.get(SESSION_COOKIE),
+    ):
+        if session_id is not None and _SESSION_ID_PATTERN.fullmatch(session_id):
+            return session_id, False
+    return uuid.uuid4().hex, True
+
+
+def attach_session_id(response: Response, session_id: str, issued: bool):
+    """在响应中返回会话id，新生成的id同时写入cookie"""
+    response.headers[SESSION_HEADER] = session_id
+    if issued:
+        response.set_cookie(SESSION_COOKIE, session_id, httponly=True)
 
-agent = create_controller_agent(args.root)
 
 app = FastAPI()
 
@@ -63,17 +133,96 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[SESSION_HEADER],
 )
 
-config: RunnableConfig = {"configurable": {"thread_id": "1"}}
+# 限制同时在途的agent调用数量，避免大量请求同时占满模型接口和工具线程
+reply_slots = asyncio.Semaphore(max(1, args.max_concurrency))
+
+
+@contextlib.asynccontextmanager
+async def session_turn(session: Session) -> AsyncIterator[None]:
+    """占用会话处理一轮对话
+
+    同一个对话线程(会话)同一时间只能运行一个agent调用: 检查点按线程保存对话记录，
+    并发运行会互相覆盖，WorkingDir 的当前目录也会被同时修改。--max-concurrency
+    只限制不同会话之间的并发数。先按会话排队，再占用全局名额，同一会话排队的
+    请求不会占用其他会话的名额。
+    """
+    async with session["lock"]:
+        async with reply_slots:
+            yield
 
 
 @app.post("/api/reply")
-async def reply(message: MessageRequest) -> ReplyResponse:
+async def reply(
+    message: MessageRequest, request: Request, response: Response
+) -> ReplyResponse:
     print(message.content)
-    res = agent.invoke({"messages": [HumanMessage(content=message.content)]}, config)  # type: ignore
-    print(res["structured_response"])
-    return res["structured_response"]
+    session_id, issued = resolve_session_id(request)
+    attach_session_id(response, session_id, issued)
+    session = sessions.get(session_id)
+    async with session_turn(session):
+        # 使用 ainvoke，等待模型返回时不阻塞事件循环，静态资源和其他请求可以正常响应
+        res = await session["agent"].ainvoke(
+            {"messages": [HumanMessage(content=message.content)]},
+            session["config"],
+        )
+        # 填充目录列表需要读取文件系统，放到线程中执行，读取时当前目录不会被其他请求修改
+        reply_response = await asyncio.to_thread(
+            build_reply, res, session["working_dir"]
+        )
+    print(reply_response.reply)
+    return reply_response
+
+
+@app.post("/api/reply/stream")
+async def reply_stream(message: MessageRequest, request: Request) -> StreamingResponse:
+    """以 Server-Sent Events 的形式流式返回回复
+
+    依次产生 start / token / tool_start / tool_end 事件，最后产生 done 事件(数据与
+    /api/reply 的返回值相同)，出错时产生 error 事件。
+    """
+    print(message.content)
+    session_id, issued = resolve_session_id(request)
+    session = sessions.get(session_id)
+
+    async def events():
+        # 立即发送一个事件，浏览器在排队和等待模型期间就能确认连接已建立
+        yield format_sse("start", {"session_id": session_id})
+        async with session_turn(session):
+            translator = AgentEventTranslator()
+            final_state = None
+            try:
+                async for event in session["agent"].astream_events(
+                    {"messages": [HumanMessage(content=message.content)]},
+                    session["config"],
+                    version="v2",
+                ):
+                    for name, data in translator.translate(event):
+                        if name == "final":
+                            final_state = data
+                        else:
+                            yield format_sse(name, data)
+                if final_state is None:
+                    raise RuntimeError("agent没有返回结果")
+                reply_response = await asyncio.to_thread(
+                    build_reply, final_state, session["working_dir"]
+                )
+            except Exception as e:
+                yield format_sse("error", {"message": str(e)})
+                return
+        print(reply_response.reply)
+        yield format_sse("done", reply_response.model_dump())
+
+    stream = StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # 禁止缓存和反向代理缓冲，保证事件及时到达浏览器
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    attach_session_id(stream, session_id, issued)
+    return stream
 
 
 app.mount(
@@ -0,0 +1,116 @@
+"""后端会话存储
+
+每个会话(浏览器标签页)拥有独立的 agent 对话记录(包括 file_expert 子agent的对话记录)
+和当前工作目录。会话保存在内存中，按最近使用顺序排列:
+- 超过 ttl 秒没有访问的会话被淘汰
+- 会话数量超过 max_sessions 时淘汰最久未使用的会话
+淘汰后会话的对话记录随之释放，同一个会话 id 再次访问时重新创建。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import TypedDict
+
+
+class SessionStats(TypedDict):
+    sessions: int
+    created: int
+    evicted_idle: int
+    evicted_lru: int
+
+
+class SessionStore[T]:
+    """LRU + 空闲超时的会话存储，会话不存在时使用 factory 创建"""
+
+    def __init__(
+        self,
+        factory: Callable[[str], T],
+        max_sessions: int = 64,
+        ttl: float = 1800,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            factory (Callable[[str], T]): 根据会话 id 创建会话状态
+            max_sessions (int): 最多同时保存的会话数量
+            ttl (float): 会话空闲多少秒后被淘汰
+            clock (Callable[[], float]): 时间函数，测试时可以替换
+        """
+        if max_sessions < 1:
+            raise ValueError("max_sessions 至少为 1")
+        self._factory = factory
+        self._max_sessions = max_sessions
+        self._ttl = ttl
+        self._clock = clock
+        # 会话 id -> (会话状态, 最后访问时间)，最近访问的在末尾
+        self._sessions: OrderedDict[str, tuple[T, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted_idle = 0
+        self.evicted_lru = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def get(self, session_id: str) -> T:
+        """获取会话状态，不存在或已过期时新建，并刷新最后访问时间
+
+        Args:
+            session_id (str): 会话 id
+        Returns:
+            T: 会话状态
+        """
+        with self._lock:
+            now = self._clock()
+            self._evict_idle(now)
+            entry = self._sessions.pop(session_id, None)
+            if entry is None:
+                session = self._factory(session_id)
+                self.created += 1
+                while len(self._sessions) >= self._max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.evicted_lru += 1
+            else:
+                session = entry[0]
+            self._sessions[session_id] = (session, now)
+            return session
+
+    def discard(self, session_id: str):
+        """主动删除会话"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def evict_idle(self) -> int:
+        """淘汰所有空闲超时的会话
+
+        Returns:
+            int: 淘汰的会话数量
+        """
+        with self._lock:
+            return self._evict_idle(self._clock())
+
+    def stats(self) -> SessionStats:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "created": self.created,
+                "evicted_idle": self.evicted_idle,
+                "evicted_lru": self.evicted_lru,
+            }
+
+    def _evict_idle(self, now: float) -> int:
+        # 按访问时间排序，从最旧的开始检查，遇到未过期的即可停止
+        evicted = 0
+        while self._sessions:
+            session_id, (_, last_used) = next(iter(self._sessions.items()))
+            if now - last_used < self._ttl:
+                break
+            del self._sessions[session_id]
+            evicted += 1
+        self.evicted_idle += evicted
+        return evicted
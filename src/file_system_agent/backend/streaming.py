@@ -0,0 +1,211 @@
+"""把 agent 的 astream_events 事件转换为前端使用的流式事件
+
+后端的主控agent使用 ToolStrategy 输出结构化回复，回复文本位于 AgentReply 工具
+调用的参数 JSON 中，参数随模型输出逐段到达。这里从不完整的 JSON 中增量解析出
+reply 字段，使回复文本可以逐字显示，而不必等待整个 agent 运行结束。
+CLI 的主控agent直接输出文本，此时转发模型输出的文本片段即可。
+
+只转发主控agent自身的回复文本，工具内部(比如 file_expert 中的子agent)的模型
+输出不会作为回复文本转发，但其中的工具调用会产生带有嵌套深度的进度事件。
+
+产生的事件:
+- token: {"text": 新增的回复文本}
+- tool_start: {"name": 工具名, "run_id": 运行id, "depth": 嵌套深度}
+- tool_end: {"name": 工具名, "run_id": 运行id, "depth": 嵌套深度, "seconds": 耗时, "error": 是否出错}
+- final: agent运行结束时的完整状态，由调用方组装最终回复
+"""
+
+import json
+import re
+import time
+from collections.abc import Iterator
+from typing import Any
+
+REPLY_TOOL_NAME = "AgentReply"
+
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+class ReplyTextExtractor:
+    """从逐段到达的 JSON 文本中增量解析某个字符串字段的值"""
+
+    def __init__(self, field: str = "reply"):
+        """
+        Args:
+            field (str): 要解析的顶层字符串字段名
+        """
+        self._key = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buffer = ""
+        self._pos: int | None = None  # 字段值中下一个未解码字符的位置
+        self._done = False
+        self.text = ""
+
+    @property
+    def done(self) -> bool:
+        """字段值是否已经完整"""
+        return self._done
+
+    def feed(self, fragment: str) -> str:
+        """追加一段 JSON 文本
+
+        Args:
+            fragment (str): 新到达的 JSON 片段
+        Returns:
+            str: 字段值中新解码出的文本，没有新内容时为空字符串
+        """
+        self._buffer += fragment
+        if self._done:
+            return ""
+        if self._pos is None:
+            match = self._key.search(self._buffer)
+            if match is None:
+                return ""
+            self._pos = match.end()
+
+        buf = self._buffer
+        i = self._pos
+        out: list[str] = []
+        while i < len(buf):
+            c = buf[i]
+            if c == '"':
+                self._done = True
+                i += 1
+                break
+            if c != "\\":
+                out.append(c)
+                i += 1
+                continue
+            # 转义序列不完整时停在反斜杠处，等待后续片段
+            if i + 1 >= len(buf):
+                break
+            escape = buf[i + 1]
+            if escape != "u":
+                out.append(_ESCAPES.get(escape, escape))
+                i += 2
+                continue
+            if i + 6 > len(buf):
+                break
+            code = int(buf[i + 2 : i + 6], 16)
+            if 0xD800 <= code < 0xDC00:
+                # 代理对需要和下一个 \uXXXX 一起解码
+                if i + 12 > len(buf):
+                    break
+                if buf[i + 6 : i + 8] == "\\u":
+                    low = int(buf[i + 8 : i + 12], 16)
+                    out.append(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                    i += 12
+                    continue
+            out.append(chr(code))
+            i += 6
+        self._pos = i
+        delta = "".join(out)
+        self.text += delta
+        return delta
+
+
+class AgentEventTranslator:
+    """把主控agent的 astream_events(version="v2") 事件翻译为流式事件"""
+
+    def __init__(self, reply_tool: str | None = REPLY_TOOL_NAME):
+        """
+        Args:
+            reply_tool (str | None): 输出结构化回复的工具名，为 None 时直接转发模型输出的文本
+        """
+        self._reply_tool = reply_tool
+        # 模型运行id -> {工具调用序号: 工具名}，工具名只在第一个片段中出现
+        self._call_names: dict[str, dict[int, str | None]] = {}
+        self._extractors: dict[str, ReplyTextExtractor] = {}
+        # 正在运行的工具: 运行id -> 开始时间
+        self._tool_started: dict[str, float] = {}
+
+    def translate(self, event: dict[str, Any]) -> Iterator[tuple[str, dict[str, Any]]]:
+        """翻译一个 astream_events 事件
+
+        Args:
+            event (dict): astream_events 产生的事件
+        Returns:
+            Iterator[tuple[str, dict]]: (事件名, 数据) 序列，大多数事件不产生输出
+        """
+        kind = event["event"]
+        if kind == "on_chat_model_stream":
+            # 工具内部的模型输出不属于回复
+            if self._depth(event):
+                return
+            chunk = event["data"]["chunk"]
+            if self._reply_tool is None:
+                text = _chunk_text(chunk)
+            else:
+                text = self._reply_delta(event["run_id"], chunk)
+            if text:
+                yield "token", {"text": text}
+        elif kind == "on_tool_start":
+            depth = self._depth(event)
+            self._tool_started[event["run_id"]] = time.perf_counter()
+            yield "tool_start", {
+                "name": event["name"],
+                "run_id": event["run_id"],
+                "depth": depth,
+            }
+        elif kind == "on_tool_end" or kind == "on_tool_error":
+            depth = self._depth(event)
+            started = self._tool_started.pop(event["run_id"], None)
+            seconds = 0.0 if started is None else time.perf_counter() - started
+            yield "tool_end", {
+                "name": event["name"],
+                "run_id": event["run_id"],
+                "depth": depth,
+                "seconds": round(seconds, 3),
+                "error": kind == "on_tool_error",
+            }
+        elif kind == "on_chain_end" and not event.get("parent_ids"):
+            # 最外层图运行结束，输出即为 agent 的最终状态
+            yield "final", event["data"]["output"]
+
+    def _depth(self, event: dict[str, Any]) -> int:
+        """事件所在的工具嵌套深度，即祖先中正在运行的工具数量"""
+        return sum(
+            1 for pid in event.get("parent_ids", ()) if pid in self._tool_started
+        )
+
+    def _reply_delta(self, run_id: str, chunk: Any) -> str:
+        names = self._call_names.setdefault(run_id, {})
+        delta = ""
+        for call in getattr(chunk, "tool_call_chunks", None) or []:
+            index = call.get("index") or 0
+            if call.get("name"):
+                names[index] = call["name"]
+            if names.get(index) != REPLY_TOOL_NAME or not call.get("args"):
+                continue
+            extractor = self._extractors.setdefault(
+                f"{run_id}:{index}", ReplyTextExtractor()
+            )
+            delta += extractor.feed(call["args"])
+        return delta
+
+
+def _chunk_text(chunk: Any) -> str:
+    """取出消息片段中的文本，content 可能是字符串或内容块列表"""
+    content = getattr(chunk, "content", None)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "")
+            for block in content
+            if isinstance(block, dict) and block.get("type") == "text"
+        )
+    return ""
+
+
+def format_sse(event: str, data: Any) -> str:
+    """编码为一条 Server-Sent Events 消息"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -1,4 +1,5 @@
 import argparse
+import asyncio
 import importlib
 import importlib.resources
 from pathlib import Path
@@ -12,14 +13,21 @@ from langchain_core.runnables import RunnableConfig
 from langchain_deepseek import ChatDeepSeek
 from langgraph.checkpoint.memory import InMemorySaver
 
+from ..backend.streaming import AgentEventTranslator
 from ..tools.src.file_system_tools.working_dir import WorkingDir
 from ..tools.src.tools_for_agent.generate_dynamic_tools import generate_working_dir_tool
 from ..tools.src.tools_for_agent.static_tools import (
     add_file,
+    bulk_file_operations,
+    copy_file,
     delete_file,
     excute_python,
+    list_archive,
+    profile_data_file,
+    read_archive_member,
     read_file,
     rename_file,
+    tail_file,
     write_file,
 )
 
@@ -41,10 +49,16 @@ tool_model = ChatDeepSeek(model="deepseek-chat", temperature=0)
 # 配置tool_agent
 static_tools = [
     read_file,
+    tail_file,
+    list_archive,
+    read_archive_member,
+    profile_data_file,
     write_file,
     add_file,
     delete_file,
     rename_file,
+    copy_file,
+    bulk_file_operations,
     excute_python,
 ]
 with open(prompt_dir / "tool_agent.md", "r", encoding="utf-8") as f:
@@ -130,17 +144,80 @@ controller_agent = create_agent(
 )
 
 
-def main():
-    user_config: RunnableConfig = {"configurable": {"thread_id": "1"}}
+async def stream_reply(user_input: str, config: RunnableConfig):
+    """流式运行主控agent，边生成边打印回复，并打印每次工具调用的开始、结束和耗时
+
+    对话记录与一次性 invoke 相同，只是输出方式不同。
+    """
+    translator = AgentEventTranslator(reply_tool=None)
+    line_open = False  # 当前行是否正在输出回复文本
+    streamed = False  # 最后一次工具调用之后是否已经输出过回复文本
+    final_state = None
+    async for event in controller_agent.astream_events(
+        {"messages": [HumanMessage(content=user_input)]}, config, version="v2"
+    ):
+        for name, data in translator.translate(event):
+            if name == "token":
+                if not line_open:
+                    print("agent> ", end="")
+                    line_open = True
+                print(data["text"], end="", flush=True)
+                streamed = True
+            elif name == "final":
+                final_state = data
+            else:
+                if line_open:
+                    print()
+                    line_open = False
+                streamed = False
+                indent = "  " * (data["depth"] + 1)
+                if name == "tool_start":
+                    print(f"{indent}[工具] {data['name']} 运行中...", flush=True)
+                else:
+                    status = "出错" if data["error"] else "完成"
+                    print(
+                        f"{indent}[工具] {data['name']} {status}, 用时 {data['seconds']:.2f}s",
+                        flush=True,
+                    )
+    if line_open:
+        print()
+    # 模型没有流式输出最终回复时，直接打印最后一条消息
+    if not streamed and final_state is not None:
+        print("agent> ", end="")
+        print(final_state["messages"][-1].content)
+
+
+def print_cache_stats():
+    stats = working_dir.cache_stats
+    print(
+        f"目录缓存({stats['backend']}): 命中 {stats['hits']} 次, "
+        f"未命中 {stats['misses']} 次, 失效 {stats['invalidations']} 次"
+    )
+
+
+def chat(runner: asyncio.Runner, user_config: RunnableConfig):
     while True:
-        user_input = input("user> ")
+        # input 在主线程中读取，Ctrl-C/Ctrl-D 可以直接结束对话；
+        # 每轮回复在同一个事件循环中运行，模型客户端的连接可以复用
+        try:
+            user_input = input("user> ")
+        except (KeyboardInterrupt, EOFError):
+            print()
+            break
         if user_input.lower() == "exit":
             break
-        res = controller_agent.invoke(
-            {"messages": [HumanMessage(content=user_input)]}, user_config
-        )
-        print("agent> ", end="")
-        print(res["messages"][-1].content)
+        runner.run(stream_reply(user_input, user_config))
+
+
+def main():
+    user_config: RunnableConfig = {"configurable": {"thread_id": "1"}}
+    try:
+        with asyncio.Runner() as runner:
+            chat(runner, user_config)
+    except KeyboardInterrupt:
+        # 回复过程中按下 Ctrl-C: Runner 已取消正在运行的回复
+        print()
+    print_cache_stats()
 
 
 if __name__ == "__main__":
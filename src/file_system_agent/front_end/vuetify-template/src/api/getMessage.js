@@ -1,9 +1,79 @@
 import axios from 'axios'
 
 const url = '/api/reply'
+const streamUrl = '/api/reply/stream'
 
 export const getMessage = async (message) => {
   return await axios.post(url, {
     content: message,
   })
 }
+
+// 解析一条 Server-Sent Events 消息，返回事件名和数据
+const parseEvent = (block) => {
+  let event = 'message'
+  const data = []
+  for (const line of block.split('\n')) {
+    if (line.startsWith('event:')) {
+      event = line.slice(6).trim()
+    } else if (line.startsWith('data:')) {
+      data.push(line.slice(5).trimStart())
+    }
+  }
+  return { event, data: data.length ? JSON.parse(data.join('\n')) : null }
+}
+
+/**
+ * 流式获取回复，事件到达时调用对应的回调
+ * @param {string} message 用户消息
+ * @param {object} handlers onToken(text) / onToolStart(data) / onToolEnd(data) / onDone(reply) / onError(message)
+ */
+export const streamMessage = async (message, handlers = {}) => {
+  const response = await fetch(streamUrl, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    credentials: 'same-origin',
+    body: JSON.stringify({ content: message }),
+  })
+  if (!response.ok || !response.body) {
+    throw new Error(`请求失败: ${response.status}`)
+  }
+
+  // 收到 done 或 error 后回复才算结束
+  let finished = false
+  const callbacks = {
+    token: (data) => handlers.onToken?.(data.text),
+    tool_start: (data) => handlers.onToolStart?.(data),
+    tool_end: (data) => handlers.onToolEnd?.(data),
+    done: (data) => {
+      finished = true
+      handlers.onDone?.(data)
+    },
+    error: (data) => {
+      finished = true
+      handlers.onError?.(data.message)
+    },
+  }
+  const dispatch = (block) => {
+    if (!block.trim()) return
+    const { event, data } = parseEvent(block)
+    callbacks[event]?.(data)
+  }
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+  let buffer = ''
+  for (;;) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += value
+    // 事件之间以空行分隔，最后一段可能不完整，留到下次处理
+    const blocks = buffer.split('\n\n')
+    buffer = blocks.pop()
+    blocks.forEach(dispatch)
+  }
+  // 最后一个事件后面可能没有空行
+  dispatch(buffer)
+  if (!finished) {
+    // 服务端或代理提前关闭了连接，不能让界面一直停在等待状态
+    handlers.onError?.('连接在回复完成前断开')
+  }
+}
@@ -1 +1 @@
-export { getMessage } from './getMessage'
+export { getMessage, streamMessage } from './getMessage'
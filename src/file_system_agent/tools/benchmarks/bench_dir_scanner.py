@@ -0,0 +1,143 @@
+"""对比 iterdir 旧实现与 scandir 引擎的目录列举开销
+
+用法:
+    python -m file_system_agent.tools.benchmarks.bench_dir_scanner [条目数]
+
+会在临时目录中生成指定数量的文件/目录/链接，输出两种实现的耗时；
+如果系统中有 strace，还会统计每个条目平均触发的 stat 类系统调用次数。
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from file_system_agent.tools.src.file_system_tools.dir_scanner import scan_dir
+
+# stat 类系统调用，不同 libc/内核版本名称不同
+STAT_SYSCALLS = {
+    "stat",
+    "lstat",
+    "fstat",
+    "newfstatat",
+    "statx",
+    "readlink",
+    "readlinkat",
+}
+
+
+def legacy_walk(path: Path) -> list[dict]:
+    """旧版 WorkingDir.walk_dir 的实现，用于对比"""
+    res = []
+    for child in path.iterdir():
+        if child.is_file():
+            file_type, target = "file", None
+        elif child.is_dir():
+            file_type, target = "directory", None
+        else:
+            file_type, target = "link", child.readlink().name
+        res.append(
+            {
+                "file_name": child.name,
+                "full_name": child.resolve().name,
+                "file_type": file_type,
+                "size": child.stat().st_size,
+                "target": target,
+            }
+        )
+    return res
+
+
+def scandir_walk(path: Path) -> list[dict]:
+    return list(scan_dir(path))
+
+
+ENGINES = {"legacy": legacy_walk, "scandir": scandir_walk}
+
+
+def populate(root: Path, count: int):
+    """生成测试目录: 约 90% 文件, 9% 目录, 1% 符号链接"""
+    for i in range(count):
+        if i % 100 == 0 and i:
+            (root / f"link_{i}").symlink_to(root / "file_1")
+        elif i % 11 == 0:
+            (root / f"dir_{i}").mkdir()
+        else:
+            (root / f"file_{i}").write_bytes(b"x" * (i % 512))
+
+
+def time_engine(name: str, root: Path, rounds: int = 5) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        ENGINES[name](root)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def count_syscalls(name: str, root: Path) -> int | None:
+    """在 strace 下运行一次列举，返回 stat 类系统调用总数；没有 strace 时返回 None"""
+    if shutil.which("strace") is None:
+        return None
+    with tempfile.NamedTemporaryFile(suffix=".strace") as out:
+        # 先在子进程里完成导入，再只跟踪列举部分的系统调用差值并不方便，
+        # 这里分别跑一次"只导入"和"导入+列举"，取差值
+        totals = []
+        for run in (False, True):
+            code = (
+                "import sys; from pathlib import Path;"
+                "from file_system_agent.tools.benchmarks.bench_dir_scanner import ENGINES;"
+                + (f"ENGINES[{name!r}](Path(sys.argv[1]))" if run else "")
+            )
+            subprocess.run(
+                [
+                    "strace",
+                    "-f",
+                    "-c",
+                    "-o",
+                    out.name,
+                    sys.executable,
+                    "-c",
+                    code,
+                    str(root),
+                ],
+                check=True,
+                capture_output=True,
+            )
+            totals.append(_parse_strace_summary(Path(out.name).read_text()))
+        return totals[1] - totals[0]
+
+
+def _parse_strace_summary(text: str) -> int:
+    total = 0
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) >= 5 and parts[-1] in STAT_SYSCALLS:
+            # 列: % time, seconds, usecs/call, calls, [errors], syscall
+            total += int(parts[3])
+    return total
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        populate(root, count)
+        entries = len(os.listdir(root))
+        print(f"条目数: {entries}")
+        for name in ENGINES:
+            seconds = time_engine(name, root)
+            line = f"{name:>8}: {seconds * 1000:8.1f} ms ({seconds / entries * 1e6:.2f} us/条目)"
+            calls = count_syscalls(name, root)
+            if calls is not None:
+                line += f", stat 类系统调用 {calls / entries:.2f} 次/条目"
+            print(line)
+        if shutil.which("strace") is None:
+            print("未找到 strace，跳过系统调用计数")
+
+
+if __name__ == "__main__":
+    main()
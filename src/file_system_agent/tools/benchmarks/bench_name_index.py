@@ -0,0 +1,85 @@
+"""文件名 trigram 索引的建立与查询耗时
+
+用法:
+    python -m file_system_agent.tools.benchmarks.bench_name_index [文件数]
+
+会在临时目录中生成指定数量的文件(每个目录 100 个文件)，输出建立索引的耗时、
+增量更新(无变化)的耗时以及几种典型查询的耗时。
+"""
+
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from file_system_agent.tools.src.file_system_tools.name_index import NameIndex
+
+WORDS = [
+    "main",
+    "util",
+    "config",
+    "test",
+    "data",
+    "model",
+    "view",
+    "report",
+    "cache",
+    "index",
+]
+EXTS = [".py", ".json", ".md", ".txt", ".log", ".csv"]
+
+QUERIES = [
+    ("substring", "report_4242"),
+    ("substring", "config"),
+    ("glob", "*_777?.*"),
+    ("glob", "d1/**/model_*.py"),
+    ("regex", r"^cache_\d+\.log$"),
+]
+
+
+def populate(root: Path, count: int):
+    rng = random.Random(0)
+    for i in range(count):
+        d = root / f"d{i // 10000}" / f"s{i // 100}"
+        if i % 100 == 0:
+            d.mkdir(parents=True)
+        (d / f"{rng.choice(WORDS)}_{i}{rng.choice(EXTS)}").touch()
+
+
+def measure(func, rounds: int = 20) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        print(f"生成 {count} 个文件...")
+        populate(root, count)
+
+        index = NameIndex(root)
+        start = time.perf_counter()
+        index.refresh()
+        print(f"建立索引: {time.perf_counter() - start:.2f} s, 条目数 {len(index)}")
+
+        start = time.perf_counter()
+        index.refresh()
+        print(f"增量更新(无变化): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        for mode, pattern in QUERIES:
+            hits = len(index.search(pattern, mode=mode, limit=50))  # type: ignore
+            seconds = measure(lambda: index.search(pattern, mode=mode, limit=50))  # type: ignore
+            print(
+                f"{mode:>9} {pattern!r:>22}: {seconds * 1000:7.2f} ms ({hits} 条结果)"
+            )
+
+
+if __name__ == "__main__":
+    main()
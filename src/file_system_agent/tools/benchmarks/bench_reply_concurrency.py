@@ -0,0 +1,75 @@
+"""/api/reply 并发压测，检查多个回复请求能否同时在途、是否阻塞其他请求
+
+用法:
+    file-system-agent-gui -r <根目录> -c 4
+    python -m file_system_agent.tools.benchmarks.bench_reply_concurrency [并发数] [地址]
+
+先单独发出一个 /api/reply 请求作为基准耗时，然后同时发出指定数量(默认 4)的
+请求，期间每 100ms 请求一次首页。输出每个回复请求的开始/结束时间、相对于逐个
+处理的加速比，以及首页请求的最大延迟。事件循环被阻塞时回复请求只能逐个完成，
+加速比约为 1，首页延迟接近单次回复的耗时；并发处理时加速比接近
+min(并发数, 服务端 --max-concurrency)。
+"""
+
+import asyncio
+import sys
+import time
+import uuid
+
+import httpx
+
+MESSAGE = "当前目录下有哪些文件？只需要简单回答。"
+
+
+async def send_reply(client: httpx.AsyncClient, origin: float) -> tuple[float, float]:
+    start = time.perf_counter() - origin
+    # 每个请求使用独立的会话，同一会话的请求在服务端会依次处理
+    response = await client.post(
+        "/api/reply",
+        json={"content": MESSAGE},
+        headers={"X-Session-Id": f"bench-{uuid.uuid4().hex}"},
+    )
+    response.raise_for_status()
+    return start, time.perf_counter() - origin
+
+
+async def poll_index(client: httpx.AsyncClient, stop: asyncio.Event) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        (await client.get("/")).raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.1)
+    return latencies
+
+
+async def run(concurrency: int, base_url: str):
+    async with httpx.AsyncClient(base_url=base_url, timeout=600) as client:
+        _, baseline = await send_reply(client, time.perf_counter())
+        print(f"单个请求耗时 {baseline:.2f} s")
+
+        stop = asyncio.Event()
+        poller = asyncio.create_task(poll_index(client, stop))
+        origin = time.perf_counter()
+        intervals = await asyncio.gather(
+            *(send_reply(client, origin) for _ in range(concurrency))
+        )
+        wall = time.perf_counter() - origin
+        stop.set()
+        latencies = await poller
+
+    for i, (start, end) in enumerate(sorted(intervals)):
+        print(f"请求 {i}: {start:6.2f} s -> {end:6.2f} s ({end - start:.2f} s)")
+    print(f"总耗时 {wall:.2f} s, 加速比 {concurrency * baseline / wall:.2f}")
+    if latencies:
+        print(f"首页请求 {len(latencies)} 次, 最大延迟 {max(latencies) * 1000:.1f} ms")
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    base_url = sys.argv[2] if len(sys.argv) > 2 else "http://127.0.0.1:8000"
+    asyncio.run(run(concurrency, base_url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""worker_pool 的工作进程入口，作为独立脚本运行，不依赖本项目的其他模块
+
+协议: 从 stdin 逐行读取 JSON 请求，向原 stdout 的副本逐行写入 JSON 结果。
+脚本运行期间文件描述符 1/2 被重定向到临时文件，因此 C 扩展和子进程的输出也会被捕获；
+每次运行结束后从 sys.modules 中删除脚本目录下的模块(site-packages 中的除外)，修改后的辅助模块在下次运行时生效；
+两次运行之间 1/2 指向 /dev/null，脚本留下的后台线程等在运行结束后的输出不会混入协议；
+stdin 被替换为 /dev/null，脚本读取 stdin 不会破坏协议。
+"""
+
+import importlib
+import json
+import os
+import runpy
+import sys
+import tempfile
+import time
+import traceback
+
+# 第三方库的安装目录
+_LIBRARY_DIRS = {"site-packages", "dist-packages"}
+
+
+def _rss_mb() -> float:
+    """当前常驻内存(MB)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+
+        # 非 Linux 平台只能得到峰值，单位因平台而异，按 KB 处理
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        return 0.0
+
+
+def _exit_code(e: SystemExit) -> int:
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    print(e.code, file=sys.stderr)
+    return 1
+
+
+def _purge_modules(directory: str):
+    """从 sys.modules 中删除位于 directory 下的模块
+
+    脚本目录在运行期间位于 sys.path 的开头，脚本导入的同目录模块会留在
+    sys.modules 中，不删除的话下一次运行会直接使用旧的模块，看不到对它的修改。
+    安装在 site-packages/dist-packages 下的第三方库(比如放在脚本目录中的虚拟环境)
+    不会被修改，保留在 sys.modules 中，下次运行不需要重新导入。
+    """
+    prefix = os.path.join(os.path.realpath(directory), "")
+    for name, module in list(sys.modules.items()):
+        file = getattr(module, "__file__", None)
+        if not file:
+            continue
+        path = os.path.realpath(file)
+        if not path.startswith(prefix):
+            continue
+        if _LIBRARY_DIRS.intersection(path[len(prefix) :].split(os.sep)):
+            continue
+        del sys.modules[name]
+
+
+def _run(request: dict) -> dict:
+    script = request["script"]
+    directory = os.path.dirname(script)
+    max_output = request["max_output_bytes"]
+    with tempfile.TemporaryFile() as out:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        saved = os.dup(1), os.dup(2)
+        os.dup2(out.fileno(), 1)
+        os.dup2(out.fileno(), 2)
+        old_argv, old_path, old_cwd = sys.argv, sys.path[:], os.getcwd()
+        sys.argv = [script, *request["args"]]
+        sys.path.insert(0, directory)
+        # 目录内容可能在两次运行之间发生变化，清除导入系统缓存的目录列表
+        importlib.invalidate_caches()
+        started = time.perf_counter()
+        try:
+            os.chdir(directory)
+            # 每次运行都使用新的全局命名空间
+            runpy.run_path(script, run_name="__main__")
+            exit_code = 0
+        except SystemExit as e:
+            exit_code = _exit_code(e)
+        except BaseException:
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            exec_time = time.perf_counter() - started
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            os.close(saved[0])
+            os.close(saved[1])
+            sys.argv, sys.path[:] = old_argv, old_path
+            os.chdir(old_cwd)
+            _purge_modules(directory)
+        size = out.seek(0, os.SEEK_END)
+        start = max(0, size - max_output)
+        out.seek(start)
+        output = out.read()
+    return {
+        "exit_code": exit_code,
+        "output": output.decode("utf-8", errors="replace"),
+        "dropped_bytes": start,
+        "exec_time": exec_time,
+        "rss_mb": _rss_mb(),
+    }
+
+
+def main():
+    # 不让脚本导入到本目录下的模块
+    sys.path.pop(0)
+    protocol_in = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    protocol_out = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.close(devnull)
+    for name in json.loads(sys.argv[1]) if len(sys.argv) > 1 else []:
+        try:
+            __import__(name)
+        except Exception:
+            pass
+    sys.argv = sys.argv[:1]
+    protocol_out.write(json.dumps({"ready": True}) + "\n")
+    for line in protocol_in:
+        protocol_out.write(json.dumps(_run(json.loads(line))) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""不解压到磁盘，直接查看压缩包内容
+
+支持 zip、tar(包括 .tar.gz/.tar.bz2/.tar.xz)以及单个的 .gz/.bz2/.xz 压缩文件。
+所有读取都是流式的，内存占用与压缩包大小无关:
+- zip 通过中央目录定位成员，只解压需要读取的成员
+- tar 以流模式(r|*)顺序读取，边解压边扫描成员头，成员信息读取后即丢弃
+- 读取成员的某个字节/行范围时，之前的内容解压后直接丢弃，只保留返回的部分
+"""
+
+import bz2
+import fnmatch
+import gzip
+import lzma
+import tarfile
+import time
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Literal, TypedDict
+
+ArchiveFormat = Literal["zip", "tar", "gz", "bz2", "xz"]
+
+# 单个压缩文件的魔数和打开方式
+_COMPRESSED = {
+    "gz": (b"\x1f\x8b", gzip.open),
+    "bz2": (b"BZh", bz2.open),
+    "xz": (b"\xfd7zXZ\x00", lzma.open),
+}
+# 解压时每次读取的字节数
+CHUNK_SIZE = 64 * 1024
+# 单次最多返回的字节数
+MAX_READ_BYTES = 1024 * 1024
+
+
+class ArchiveMember(TypedDict):
+    name: str
+    type: Literal["file", "directory", "link", "other"]
+    size: int | None  # 解压后的大小，单个压缩文件无法预先知道时为 None
+    compressed_size: int | None  # 只有 zip 记录了每个成员的压缩后大小
+    mtime: str | None
+
+
+class ArchiveListing(TypedDict):
+    format: ArchiveFormat
+    members: list[ArchiveMember]  # 最多 max_members 个匹配的成员
+    matched: int  # 匹配的成员总数
+    total: int  # 成员总数
+    total_size: int  # 所有成员解压后的总大小(已知部分)
+
+
+class MemberData(TypedDict):
+    member: str
+    data: bytes
+    start: int  # data 在成员中的起始字节偏移
+    size: int | None  # 成员解压后的大小
+    truncated: bool  # 是否因为超过读取上限而截断
+
+
+class MemberLines(TypedDict):
+    member: str
+    data: bytes
+    start_line: int
+    end_line: int  # 实际读取到的最后一行，没有读到任何行时为 start_line - 1
+    truncated: bool
+
+
+def _format_time(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+
+
+def detect_format(path: Path) -> ArchiveFormat:
+    """根据文件内容(而不是后缀名)判断压缩包格式
+
+    Raises:
+        ValueError: 不是支持的压缩包格式
+    """
+    if zipfile.is_zipfile(path):
+        return "zip"
+    try:
+        with tarfile.open(path, "r|*") as tar:
+            tar.next()
+        return "tar"
+    except tarfile.TarError:
+        pass
+    with open(path, "rb") as f:
+        head = f.read(8)
+    for name, (magic, _) in _COMPRESSED.items():
+        if head.startswith(magic):
+            return name  # type: ignore[return-value]
+    raise ValueError(f"不是支持的压缩包格式(zip/tar/gz/bz2/xz): {path}")
+
+
+def _iter_tar(tar: tarfile.TarFile) -> Iterator[tarfile.TarInfo]:
+    while (info := tar.next()) is not None:
+        # 流模式下 TarFile 仍会把每个成员信息追加到 members 中，逐个丢弃，
+        # 使内存占用与成员数量无关
+        tar.members.clear()
+        yield info
+
+
+def _tar_member(info: tarfile.TarInfo) -> ArchiveMember:
+    if info.isdir():
+        kind = "directory"
+    elif info.issym() or info.islnk():
+        kind = "link"
+    elif info.isfile():
+        kind = "file"
+    else:
+        kind = "other"
+    return {
+        "name": info.name,
+        "type": kind,
+        "size": info.size if info.isfile() else 0,
+        "compressed_size": None,
+        "mtime": _format_time(info.mtime),
+    }
+
+
+def _zip_member(info: zipfile.ZipInfo) -> ArchiveMember:
+    return {
+        "name": info.filename,
+        "type": "directory" if info.is_dir() else "file",
+        "size": info.file_size,
+        "compressed_size": info.compress_size,
+        "mtime": "%04d-%02d-%02d %02d:%02d:%02d" % info.date_time,
+    }
+
+
+def _compressed_member_name(path: Path) -> str:
+    """单个压缩文件中唯一成员的名字: 去掉压缩后缀的文件名"""
+    return path.stem if path.suffix.lower() in (".gz", ".bz2", ".xz") else path.name
+
+
+def list_members(
+    path: Path, pattern: str | None = None, max_members: int = 1000
+) -> ArchiveListing:
+    """列出压缩包中的成员
+
+    Args:
+        path (Path): 压缩包路径
+        pattern (str | None): 只返回名字匹配该 glob 模式的成员，如 "*.py"、"docs/*"
+        max_members (int): 最多返回的成员数，超出的只计数
+    Returns:
+        ArchiveListing: 成员列表和统计信息
+    Raises:
+        ValueError: 不是支持的压缩包格式
+    """
+    fmt = detect_format(path)
+    listing: ArchiveListing = {
+        "format": fmt,
+        "members": [],
+        "matched": 0,
+        "total": 0,
+        "total_size": 0,
+    }
+
+    def add(member: ArchiveMember):
+        listing["total"] += 1
+        listing["total_size"] += member["size"] or 0
+        if pattern is None or fnmatch.fnmatchcase(member["name"], pattern):
+            listing["matched"] += 1
+            if len(listing["members"]) < max_members:
+                listing["members"].append(member)
+
+    if fmt == "zip":
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                add(_zip_member(info))
+    elif fmt == "tar":
+        with tarfile.open(path, "r|*") as tar:
+            for info in _iter_tar(tar):
+                add(_tar_member(info))
+    else:
+        add(
+            {
+                "name": _compressed_member_name(path),
+                "type": "file",
+                "size": None,
+                "compressed_size": path.stat().st_size,
+                "mtime": _format_time(path.stat().st_mtime),
+            }
+        )
+    return listing
+
+
+@contextmanager
+def open_member(
+    path: Path, member: str | None = None
+) -> Iterator[tuple[str, BinaryIO, int | None]]:
+    """以流的方式打开压缩包中的一个成员
+
+    Args:
+        path (Path): 压缩包路径
+        member (str | None): 成员名，单个压缩文件可以不传；压缩包中只有一个文件时也可以不传
+    Yields:
+        tuple[str, BinaryIO, int | None]: 成员名、解压后的数据流和成员大小(未知时为 None)
+    Raises:
+        ValueError: 不是支持的压缩包格式，或者没有指定成员
+        KeyError: 成员不存在
+        IsADirectoryError: 成员不是普通文件
+    """
+    fmt = detect_format(path)
+    if fmt == "zip":
+        with zipfile.ZipFile(path) as zf:
+            if member is None:
+                files = [i for i in zf.infolist() if not i.is_dir()]
+                if len(files) != 1:
+                    raise ValueError("压缩包中有多个文件，请指定要读取的成员")
+                info = files[0]
+            else:
+                info = zf.getinfo(member)
+            if info.is_dir():
+                raise IsADirectoryError(f"成员是目录: {info.filename}")
+            with zf.open(info) as stream:
+                yield info.filename, stream, info.file_size  # type: ignore[misc]
+    elif fmt == "tar":
+        if member is None:
+            raise ValueError("tar 包需要指定要读取的成员")
+        with tarfile.open(path, "r|*") as tar:
+            for info in _iter_tar(tar):
+                if info.name.rstrip("/") != member.rstrip("/"):
+                    continue
+                if not info.isfile():
+                    raise IsADirectoryError(f"成员不是普通文件: {info.name}")
+                stream = tar.extractfile(info)
+                assert stream is not None
+                yield info.name, stream, info.size  # type: ignore[misc]
+                return
+        raise KeyError(f"压缩包中没有成员: {member}")
+    else:
+        name = _compressed_member_name(path)
+        if member is not None and member != name:
+            raise KeyError(f"压缩包中没有成员: {member}")
+        with _COMPRESSED[fmt][1](path, "rb") as stream:
+            yield name, stream, None  # type: ignore[misc]
+
+
+def _skip(stream: BinaryIO, count: int) -> int:
+    """解压并丢弃 count 个字节，返回实际跳过的字节数"""
+    skipped = 0
+    while skipped < count:
+        chunk = stream.read(min(CHUNK_SIZE, count - skipped))
+        if not chunk:
+            break
+        skipped += len(chunk)
+    return skipped
+
+
+def read_member(
+    path: Path,
+    member: str | None = None,
+    offset: int = 0,
+    length: int = 64 * 1024,
+) -> MemberData:
+    """读取成员的 [offset, offset+length) 字节
+
+    Args:
+        path (Path): 压缩包路径
+        member (str | None): 成员名
+        offset (int): 起始字节偏移，负数表示从成员末尾倒数(需要知道成员大小)
+        length (int): 读取的字节数，最多 MAX_READ_BYTES
+    Returns:
+        MemberData: 读取到的内容
+    Raises:
+        ValueError: 偏移不合法
+    """
+    if length < 0:
+        raise ValueError(f"无效的读取长度: {length}")
+    with open_member(path, member) as (name, stream, size):
+        if offset < 0:
+            if size is None:
+                raise ValueError("该压缩文件无法预先知道解压后的大小，不支持负数偏移")
+            offset = max(0, size + offset)
+        start = _skip(stream, offset)
+        data = stream.read(min(length, MAX_READ_BYTES))
+    return {
+        "member": name,
+        "data": data,
+        "start": start,
+        "size": size,
+        "truncated": length > MAX_READ_BYTES and len(data) == MAX_READ_BYTES,
+    }
+
+
+def read_member_lines(
+    path: Path,
+    member: str | None,
+    start_line: int,
+    end_line: int,
+    max_bytes: int = MAX_READ_BYTES,
+) -> MemberLines:
+    """读取成员的 [start_line, end_line] 行(1 开始，包含两端)
+
+    按块解压并统计换行符，起始行之前的内容直接丢弃；返回的内容超过 max_bytes 时截断
+
+    Args:
+        path (Path): 压缩包路径
+        member (str | None): 成员名
+        start_line (int): 起始行号
+        end_line (int): 结束行号
+        max_bytes (int): 最多返回的字节数
+    Returns:
+        MemberLines: 读取到的内容
+    Raises:
+        ValueError: 行号不合法
+    """
+    if start_line < 1 or end_line < start_line:
+        raise ValueError(f"无效的行范围: {start_line}-{end_line}")
+    out = bytearray()
+    line = 1
+    last_line = start_line - 1
+    truncated = False
+    with open_member(path, member) as (name, stream, _):
+        while line <= end_line and not truncated:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            pos = 0
+            while pos < len(chunk) and line <= end_line:
+                nl = chunk.find(b"\n", pos)
+                stop = len(chunk) if nl == -1 else nl + 1
+                if line >= start_line:
+                    piece = chunk[pos:stop]
+                    if len(out) + len(piece) > max_bytes:
+                        out += piece[: max_bytes - len(out)]
+                        truncated = True
+                        last_line = line
+                        break
+                    out += piece
+                    last_line = line
+                pos = stop
+                if nl != -1:
+                    line += 1
+    return {
+        "member": name,
+        "data": bytes(out),
+        "start_line": start_line,
+        "end_line": last_line,
+        "truncated": truncated,
+    }
@@ -0,0 +1,246 @@
+"""批量文件操作: 创建、删除、移动、复制
+
+一次调用处理一批操作，先生成执行计划并逐项检查(源是否存在、目标是否已存在、
+同一路径或互相包含的路径是否出现在多个操作中)，检查通过的操作在线程池中并发执行，
+每一项单独记录结果，失败的项不影响其他项。
+操作可以直接列出，也可以由 glob 展开并用目标模板生成，例如把图片按修改日期移动到
+"/photos/{date}/{name}"。
+"""
+
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Literal, NotRequired, TypedDict
+
+from .fast_copy import copy_tree
+
+OpType = Literal["create", "delete", "move", "copy"]
+
+# 单次调用最多的操作数
+MAX_OPERATIONS = 10000
+
+
+class BulkOperation(TypedDict):
+    op: OpType
+    path: str
+    target: NotRequired[str]  # move/copy 的目标路径
+    content: NotRequired[str]  # create 时写入的内容
+
+
+class ItemResult(TypedDict):
+    op: str
+    path: str
+    target: str | None
+    ok: bool
+    error: str | None
+
+
+class BulkReport(TypedDict):
+    dry_run: bool
+    succeeded: int
+    failed: int
+    results: list[ItemResult]
+
+
+def expand_glob(
+    op: OpType, base_dir: Path, pattern: str, target: str | None = None
+) -> list[BulkOperation]:
+    """把 glob 展开为一批操作
+
+    target 是目标路径模板，可以使用占位符 {name} {stem} {suffix} {parent}
+    以及按修改时间的 {date}(YYYY-MM-DD) {year} {month}；
+    不包含占位符时视为目标目录，等价于 "{target}/{name}"
+
+    Args:
+        op (OpType): 操作类型，通常是 delete/move/copy
+        base_dir (Path): glob 的起始目录
+        pattern (str): glob 模式，如 "*.jpg" 或 "**/*.log"
+        target (str | None): 目标路径模板，move/copy 时必需
+    Returns:
+        list[BulkOperation]: 按路径排序的操作
+    Raises:
+        ValueError: 缺少目标或模板无效
+    """
+    if op in ("move", "copy") and not target:
+        raise ValueError(f"{op} 操作需要 target")
+    if target is not None and "{" not in target:
+        target = target.rstrip("/") + "/{name}"
+    operations: list[BulkOperation] = []
+    for path in sorted(base_dir.glob(pattern)):
+        item: BulkOperation = {"op": op, "path": str(path)}
+        if target is not None and op in ("move", "copy"):
+            item["target"] = _render_target(target, path)
+        operations.append(item)
+        if len(operations) > MAX_OPERATIONS:
+            break
+    return operations
+
+
+def _render_target(template: str, path: Path) -> str:
+    fields = {
+        "name": path.name,
+        "stem": path.stem,
+        "suffix": path.suffix,
+        "parent": str(path.parent),
+    }
+    if any(key in template for key in ("{date", "{year", "{month")):
+        mtime = time.localtime(path.lstat().st_mtime)
+        fields["date"] = time.strftime("%Y-%m-%d", mtime)
+        fields["year"] = time.strftime("%Y", mtime)
+        fields["month"] = time.strftime("%m", mtime)
+    try:
+        return template.format(**fields)
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(f"无效的目标模板 {template}: {e}") from None
+
+
+def plan_operations(operations: list[BulkOperation]) -> list[ItemResult]:
+    """检查每个操作能否执行，不修改文件系统
+
+    Returns:
+        list[ItemResult]: 与输入顺序一致，ok 为 False 的项会被跳过
+    """
+    if len(operations) > MAX_OPERATIONS:
+        raise ValueError(f"操作数超过上限 {MAX_OPERATIONS}，请分批执行")
+    conflicts = _find_conflicts(operations)
+    plan = []
+    for i, item in enumerate(operations):
+        op, path, target = item.get("op"), item.get("path", ""), item.get("target")
+        error = _check(op, path, target)
+        if error is None:
+            error = conflicts.get(i)
+        plan.append(
+            {
+                "op": str(op),
+                "path": path,
+                "target": target,
+                "ok": error is None,
+                "error": error,
+            }
+        )
+    return plan
+
+
+def _find_conflicts(operations: list[BulkOperation]) -> dict[int, str]:
+    """找出与其他操作涉及同一路径或互相包含的路径的操作
+
+    操作是并发执行的，比如同一批中移动 /a 和修改 /a/x，执行顺序无法保证，
+    结果取决于哪个先完成，因此相关的操作全部拒绝
+
+    Returns:
+        dict[int, str]: 操作序号 -> 拒绝原因
+    """
+    owners: dict[str, set[int]] = {}
+    paths: list[list[str]] = []
+    for i, item in enumerate(operations):
+        norm = [
+            os.path.normpath(value)
+            for value in (item.get("path"), item.get("target"))
+            if value
+        ]
+        paths.append(norm)
+        for value in norm:
+            owners.setdefault(value, set()).add(i)
+
+    conflicts: dict[int, str] = {}
+    for i, norm in enumerate(paths):
+        for value in norm:
+            if len(owners[value] - {i}) > 0:
+                conflicts[i] = "同一路径出现在多个操作中"
+                continue
+            # 逐级检查上级目录是否是其他操作的路径，只需要查找深度次
+            parent = os.path.dirname(value)
+            while parent and parent != value:
+                others = owners.get(parent, set()) - {i}
+                if others:
+                    reason = "与其他操作的路径存在包含关系"
+                    conflicts.setdefault(i, reason)
+                    for j in others:
+                        conflicts.setdefault(j, reason)
+                value, parent = parent, os.path.dirname(parent)
+    return conflicts
+
+
+def _check(op: str | None, path: str, target: str | None) -> str | None:
+    if op not in ("create", "delete", "move", "copy"):
+        return f"不支持的操作: {op}"
+    if not path or not os.path.isabs(path):
+        return "路径必须是绝对路径"
+    exists = os.path.lexists(path)
+    if op == "create":
+        return "文件已存在" if exists else None
+    if not exists:
+        return "源路径不存在"
+    if op == "delete":
+        if os.path.isdir(path) and not os.path.islink(path):
+            return "不能批量删除目录"
+        return None
+    if not target or not os.path.isabs(target):
+        return "目标路径必须是绝对路径"
+    if os.path.lexists(target):
+        return "目标已存在"
+    if os.path.isdir(path) and Path(target).resolve().is_relative_to(
+        Path(path).resolve()
+    ):
+        return "不能移动或复制到自身的子目录中"
+    return None
+
+
+def _execute(item: BulkOperation) -> str | None:
+    op, path = item["op"], Path(item["path"])
+    try:
+        if op == "create":
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "x", encoding="utf-8") as f:
+                f.write(item.get("content", ""))
+        elif op == "delete":
+            path.unlink()
+        else:
+            target = Path(item["target"])
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if op == "move":
+                shutil.move(path, target)
+            else:
+                errors = copy_tree(path, target)["errors"]
+                if errors:
+                    return f"部分内容复制失败: {'; '.join(errors)}"
+    except Exception as e:
+        return str(e)
+    return None
+
+
+def run_operations(
+    operations: list[BulkOperation],
+    dry_run: bool = False,
+    max_workers: int | None = None,
+) -> BulkReport:
+    """检查并执行一批操作
+
+    Args:
+        operations (list[BulkOperation]): 操作列表
+        dry_run (bool): 为 True 时只返回计划，不执行
+        max_workers (int | None): 线程池大小
+    Returns:
+        BulkReport: 每一项的结果以及成功/失败数量
+    Raises:
+        ValueError: 操作数超过上限
+    """
+    results = plan_operations(operations)
+    if not dry_run:
+        todo = [i for i, r in enumerate(results) if r["ok"]]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for i, error in zip(
+                todo, pool.map(_execute, (operations[i] for i in todo))
+            ):
+                if error is not None:
+                    results[i]["ok"] = False
+                    results[i]["error"] = error
+    succeeded = sum(r["ok"] for r in results)
+    return {
+        "dry_run": dry_run,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+    }
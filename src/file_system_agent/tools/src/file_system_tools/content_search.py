@@ -0,0 +1,272 @@
+"""并发的文件内容搜索(类似 grep)
+
+- 遍历目录时遵循 .gitignore，跳过 .git 目录，不跟随符号链接
+- 用 mmap 映射文件，正则直接在映射区上搜索，不需要把文件读成 str；
+  只有包含非 ASCII 字符的模式才逐行解码后匹配
+- 读取文件头部，包含 NUL 字节的视为二进制文件并跳过
+- 在线程池中并发处理多个文件，命中数达到上限后提前停止
+只返回命中的行及其行号，而不是整个文件内容。
+"""
+
+import mmap
+import os
+import re
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import TypedDict
+
+from .gitignore import IgnoreMatcher
+
+# 判断是否为二进制文件时读取的头部大小
+SNIFF_SIZE = 8192
+# 返回的单行最大长度，避免压缩过的 js 等超长行占满上下文
+MAX_LINE_CHARS = 300
+# 线程池中排队和运行中的文件数上限(至少为线程数的 4 倍)
+MAX_PENDING = 128
+# 统计换行符时每次复制出的最大字节数
+COUNT_CHUNK = 1024 * 1024
+
+
+class ContentMatch(TypedDict):
+    path: str
+    line_number: int
+    line: str
+
+
+class SearchResult(TypedDict):
+    matches: list[ContentMatch]
+    files_scanned: int
+    binary_skipped: int
+    truncated: bool  # 命中数是否超过了 max_matches(超出部分没有返回)
+
+
+def is_binary_header(header: bytes) -> bool:
+    """根据文件头部判断是否为二进制文件"""
+    return b"\0" in header
+
+
+def iter_search_files(
+    start: Path,
+    root: Path | None = None,
+    file_glob: str | None = None,
+    max_file_size: int | None = None,
+) -> Iterator[Path]:
+    """遍历 start 下需要搜索的普通文件，遵循 .gitignore
+
+    Args:
+        start (Path): 搜索起点
+        root (Path | None): .gitignore 的起始目录，start 到 root 之间各层的 .gitignore 都会生效，默认为 start
+        file_glob (str | None): 只返回文件名匹配该 glob 的文件
+        max_file_size (int | None): 跳过大于该大小的文件
+    Yields:
+        Path: 文件路径
+    """
+    root = root or start
+    matcher = IgnoreMatcher()
+    for parent in reversed([start, *start.parents]):
+        if parent == root or root in parent.parents:
+            matcher = matcher.descend(parent)
+    stack: list[tuple[Path, IgnoreMatcher]] = [(start, matcher)]
+    while stack:
+        directory, matcher = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            path = directory / entry.name
+            try:
+                if entry.is_symlink():
+                    continue
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if matcher.is_ignored(path, is_dir):
+                continue
+            if is_dir:
+                subdirs.append(path)
+                continue
+            if file_glob is not None and not fnmatchcase(entry.name, file_glob):
+                continue
+            if max_file_size is not None:
+                try:
+                    if entry.stat(follow_symlinks=False).st_size > max_file_size:
+                        continue
+                except OSError:
+                    continue
+            yield path
+        # 逆序入栈，保证按名称顺序遍历
+        stack.extend((d, matcher.descend(d)) for d in reversed(subdirs))
+
+
+def search_contents(
+    start: Path,
+    pattern: str,
+    root: Path | None = None,
+    fixed_string: bool = False,
+    ignore_case: bool = False,
+    file_glob: str | None = None,
+    max_matches: int = 100,
+    max_file_size: int | None = 100 * 1024 * 1024,
+    max_workers: int | None = None,
+) -> SearchResult:
+    """在 start 下搜索文件内容
+
+    Args:
+        start (Path): 搜索起点目录
+        pattern (str): 正则表达式，fixed_string 为 True 时按普通字符串匹配
+        root (Path | None): .gitignore 的起始目录，默认为 start
+        fixed_string (bool): 是否把 pattern 当作普通字符串
+        ignore_case (bool): 是否忽略大小写
+        file_glob (str | None): 只搜索文件名匹配该 glob 的文件，如 "*.py"
+        max_matches (int): 命中行数上限，找到更多命中后停止搜索
+        max_file_size (int | None): 跳过大于该大小的文件，None 表示不限制
+        max_workers (int | None): 线程池大小
+    Returns:
+        SearchResult: 命中的行(按路径和行号排序)以及统计信息
+    Raises:
+        ValueError: 正则表达式无效
+    """
+    source = re.escape(pattern) if fixed_string else pattern
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    try:
+        # 非 ASCII 的模式按 bytes 编译时字符类和忽略大小写只作用于单个字节，
+        # 这种情况下逐行解码后用 str 正则匹配
+        regex: re.Pattern[bytes] | re.Pattern[str] = (
+            re.compile(source.encode("utf-8"), flags)
+            if source.isascii()
+            else re.compile(source, flags)
+        )
+    except re.error as e:
+        raise ValueError(f"无效的正则表达式: {e}") from None
+
+    matches: list[ContentMatch] = []
+    counters = {"files_scanned": 0, "binary_skipped": 0}
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def scan(path: Path):
+        if done.is_set():
+            return
+        # 多找一个命中，用来判断是否还有超出上限的结果
+        found = _search_file(path, regex, done, max_matches + 1)
+        with lock:
+            if found is None:
+                counters["binary_skipped"] += 1
+                return
+            counters["files_scanned"] += 1
+            for line_number, line in found:
+                if len(matches) >= max_matches:
+                    # 只有确实存在第 max_matches + 1 个命中时才停止并标记截断
+                    done.set()
+                    return
+                matches.append(
+                    {"path": str(path), "line_number": line_number, "line": line}
+                )
+
+    # 限制排队中的任务数，遍历大目录时不会一次性提交所有文件
+    pending = threading.BoundedSemaphore(max(MAX_PENDING, (max_workers or 0) * 4))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for path in iter_search_files(start, root, file_glob, max_file_size):
+            if done.is_set():
+                break
+            pending.acquire()
+            future = pool.submit(scan, path)
+            future.add_done_callback(lambda _: pending.release())
+
+    matches.sort(key=lambda m: (m["path"], m["line_number"]))
+    return {
+        "matches": matches,
+        "files_scanned": counters["files_scanned"],
+        "binary_skipped": counters["binary_skipped"],
+        "truncated": done.is_set(),
+    }
+
+
+def _search_file(
+    path: Path,
+    regex: re.Pattern[bytes] | re.Pattern[str],
+    done: threading.Event,
+    limit: int,
+) -> list[tuple[int, str]] | None:
+    """搜索单个文件，返回 (行号, 行内容) 列表；二进制文件返回 None"""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(SNIFF_SIZE)
+            if is_binary_header(header):
+                return None
+            if not header:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if isinstance(regex.pattern, str):
+                    return _search_lines(mm, regex, done, limit)  # type: ignore[arg-type]
+                return _search_buffer(mm, regex, done, limit)  # type: ignore[arg-type]
+    except (OSError, ValueError):
+        return []
+
+
+def _search_buffer(
+    mm: mmap.mmap, regex: re.Pattern[bytes], done: threading.Event, limit: int
+) -> list[tuple[int, str]]:
+    found = []
+    line_number = 1
+    counted_to = 0  # 已经统计过换行符的位置
+    pos = 0
+    size = len(mm)
+    while pos <= size and len(found) < limit and not done.is_set():
+        m = regex.search(mm, pos)
+        if m is None:
+            break
+        line_start = mm.rfind(b"\n", 0, m.start()) + 1
+        line_end = mm.find(b"\n", m.end())
+        if line_end == -1:
+            line_end = size
+        line_number += _count_newlines(mm, counted_to, line_start)
+        counted_to = line_start
+        # 超长行只解码足够 MAX_LINE_CHARS 个字符的部分(UTF-8 每个字符最多 4 字节)
+        raw_end = min(line_end, line_start + MAX_LINE_CHARS * 4)
+        line = mm[line_start:raw_end].decode("utf-8", errors="replace").rstrip("\r")
+        found.append((line_number, _clip(line, raw_end < line_end)))
+        # 每行只报告一次，从下一行继续
+        pos = line_end + 1
+    return found
+
+
+def _search_lines(
+    mm: mmap.mmap, regex: re.Pattern[str], done: threading.Event, limit: int
+) -> list[tuple[int, str]]:
+    """逐行解码后用 str 正则匹配"""
+    found = []
+    line_number = 0
+    pos = 0
+    size = len(mm)
+    while pos < size and len(found) < limit and not done.is_set():
+        line_end = mm.find(b"\n", pos)
+        if line_end == -1:
+            line_end = size
+        line_number += 1
+        line = mm[pos:line_end].decode("utf-8", errors="replace").rstrip("\r")
+        if regex.search(line):
+            found.append((line_number, _clip(line)))
+        pos = line_end + 1
+    return found
+
+
+def _clip(line: str, cut: bool = False) -> str:
+    """截断超过 MAX_LINE_CHARS 的行，cut 表示行在解码前已被截断"""
+    if cut or len(line) > MAX_LINE_CHARS:
+        return line[:MAX_LINE_CHARS] + "..."
+    return line
+
+
+def _count_newlines(mm: mmap.mmap, start: int, end: int) -> int:
+    """统计 [start, end) 中的换行符数量，每次只复制 COUNT_CHUNK 字节"""
+    count = 0
+    for pos in range(start, end, COUNT_CHUNK):
+        count += mm[pos : min(pos + COUNT_CHUNK, end)].count(b"\n")
+    return count
@@ -0,0 +1,125 @@
+"""目录列表分页
+
+对目录项的流式迭代器做分页，避免把整个目录一次性交给LLM:
+- 不排序时按文件系统顺序，用 offset 作为游标，读够一页就停止遍历
+- 按名称/大小/类型排序时，用上一页最后一项的排序键作为游标，
+  通过 heapq 维护大小为 page_size 的有界堆，整个目录既不会被完整排序，也不会常驻内存
+"""
+
+import heapq
+import json
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+from typing import Literal, TypedDict, get_args
+
+from .file_metadata import FileMetadata
+
+SortKey = Literal["none", "name", "size", "type"]
+
+# 按类型排序时的先后顺序: 目录 -> 文件 -> 链接
+_TYPE_ORDER = {"directory": 0, "file": 1, "link": 2}
+
+_KEY_FUNCS: dict[str, Callable[[FileMetadata], tuple]] = {
+    "name": lambda item: (item["file_name"],),
+    # 大小按从大到小排列，第一页即为"最大的 N 项"
+    "size": lambda item: (-item["size"], item["file_name"]),
+    "type": lambda item: (_TYPE_ORDER[item["file_type"]], item["file_name"]),
+}
+
+
+class DirPage(TypedDict):
+    items: list[FileMetadata]
+    next_cursor: str | None  # 为 None 表示没有下一页
+    total: int | None  # 目录项总数，只有在完整遍历过目录时才会给出
+
+
+def page_entries(
+    entries: Iterable[FileMetadata],
+    page_size: int = 100,
+    cursor: str | None = None,
+    sort_key: SortKey = "none",
+) -> DirPage:
+    """从目录项的迭代器中取出一页
+
+    Args:
+        entries (Iterable[FileMetadata]): 目录项，通常是 WorkingDir.iter_dir() 的返回值
+        page_size (int): 每页的条目数
+        cursor (str | None): 上一页返回的 next_cursor，为 None 时从第一页开始
+        sort_key (SortKey): 排序方式，none/name/size/type
+    Returns:
+        DirPage: 当前页的内容和下一页的游标
+    Raises:
+        ValueError: 参数不合法或游标无法解析
+    """
+    if page_size <= 0:
+        raise ValueError(f"page_size 必须为正整数: {page_size}")
+    if sort_key not in get_args(SortKey):
+        raise ValueError(f"不支持的排序方式: {sort_key}")
+
+    if sort_key == "none":
+        offset = _decode_offset(cursor)
+        # 多取一项用来判断是否还有下一页
+        items = list(islice(entries, offset, offset + page_size + 1))
+        has_more = len(items) > page_size
+        return {
+            "items": items[:page_size],
+            "next_cursor": str(offset + page_size) if has_more else None,
+            "total": None if has_more else offset + len(items),
+        }
+
+    key_func = _KEY_FUNCS[sort_key]
+    counter = _Counter(entries)
+    stream: Iterator[FileMetadata] = iter(counter)
+    if cursor is not None:
+        after = _decode_key(cursor)
+        stream = (item for item in stream if key_func(item) > after)
+    try:
+        items = heapq.nsmallest(page_size + 1, stream, key=key_func)
+    except TypeError:
+        raise ValueError(f"游标与排序方式 {sort_key} 不匹配: {cursor}") from None
+    has_more = len(items) > page_size
+    items = items[:page_size]
+    return {
+        "items": items,
+        "next_cursor": _encode_key(key_func(items[-1])) if has_more else None,
+        "total": counter.count,
+    }
+
+
+class _Counter:
+    """统计迭代过的条目数量，不保存条目本身"""
+
+    def __init__(self, entries: Iterable[FileMetadata]):
+        self._entries = entries
+        self.count = 0
+
+    def __iter__(self) -> Iterator[FileMetadata]:
+        for item in self._entries:
+            self.count += 1
+            yield item
+
+
+def _decode_offset(cursor: str | None) -> int:
+    if cursor is None:
+        return 0
+    try:
+        offset = int(cursor)
+    except ValueError:
+        raise ValueError(f"无效的游标: {cursor}") from None
+    if offset < 0:
+        raise ValueError(f"无效的游标: {cursor}")
+    return offset
+
+
+def _encode_key(key: tuple) -> str:
+    return json.dumps(list(key), ensure_ascii=False)
+
+
+def _decode_key(cursor: str) -> tuple:
+    try:
+        key = json.loads(cursor)
+    except json.JSONDecodeError:
+        raise ValueError(f"无效的游标: {cursor}") from None
+    if not isinstance(key, list):
+        raise ValueError(f"无效的游标: {cursor}")
+    return tuple(key)
@@ -0,0 +1,72 @@
+"""基于 os.scandir 的目录列举引擎
+
+pathlib 的 iterdir() 只返回路径，之后每个子项的 is_file()/is_dir()/resolve()/stat()
+都会再触发系统调用。os.scandir 在读取目录(getdents)时已经拿到了子项的类型(d_type)，
+这里直接复用 DirEntry 缓存的类型信息，并且每个子项最多只做一次 lstat，
+一次遍历就生成 FileMetadata。
+"""
+
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+from .file_type import FileType
+from .file_metadata import FileMetadata
+
+
+def entry_to_metadata(entry: os.DirEntry[str]) -> FileMetadata:
+    """把 DirEntry 转换为 FileMetadata
+
+    普通文件和目录只需要一次 lstat(entry.stat(follow_symlinks=False))；
+    只有符号链接才会额外 readlink，并跟随链接取目标大小。
+
+    Args:
+        entry (os.DirEntry[str]): os.scandir 产生的目录项
+    Returns:
+        FileMetadata: 子项的元信息
+    """
+    if entry.is_symlink():
+        link = os.readlink(entry.path)
+        try:
+            size = entry.stat().st_size  # 跟随链接，与 Path.stat() 保持一致
+        except OSError:
+            size = entry.stat(follow_symlinks=False).st_size  # 断开的链接
+        return {
+            "file_name": entry.name,
+            "full_name": os.path.basename(os.path.realpath(entry.path)),
+            "file_type": FileType.LINK.value,
+            "size": size,
+            "target": os.path.basename(link),
+        }
+    if entry.is_dir(follow_symlinks=False):
+        file_type = FileType.DIRECTORY.value
+    else:
+        file_type = FileType.FILE.value
+    return {
+        "file_name": entry.name,
+        # 当前目录已是 resolve 过的真实路径，非链接子项的真实名称就是它自己
+        "full_name": entry.name,
+        "file_type": file_type,
+        "size": entry.stat(follow_symlinks=False).st_size,
+        "target": None,
+    }
+
+
+def scan_dir(path: Path) -> Iterator[FileMetadata]:
+    """流式遍历目录，逐个产生子项的元信息
+
+    Args:
+        path (Path): 要遍历的目录
+    Yields:
+        FileMetadata: 每个子项的元信息，顺序与文件系统返回的顺序一致
+    Raises:
+        FileNotFoundError: 目录不存在
+        NotADirectoryError: 路径不是目录
+    """
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                yield entry_to_metadata(entry)
+            except FileNotFoundError:
+                # 遍历过程中被删除的子项直接跳过
+                continue
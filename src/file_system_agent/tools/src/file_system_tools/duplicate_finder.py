@@ -0,0 +1,298 @@
+"""查找内容重复的文件
+
+逐级缩小需要读取的范围，大部分文件只需要一次 stat:
+1. 按大小分组，大小唯一的文件不可能重复，不读取内容
+2. 大小相同的文件计算部分哈希(开头和结尾各 PARTIAL_SIZE 字节)
+3. 部分哈希也相同的文件才计算完整哈希
+
+哈希在线程池中计算(文件读取和 hashlib 处理大块数据时都会释放 GIL)。
+结果按 (设备, inode) 持久化到 SQLite，只有 size 和 mtime 都没有变化时才复用，
+再次扫描同一目录时几乎不需要读取文件内容。同一个 inode 的多个硬链接只算一个文件。
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TypedDict
+
+# 部分哈希读取开头和结尾各多少字节
+PARTIAL_SIZE = 64 * 1024
+# 计算完整哈希时每次读取的字节数
+READ_CHUNK = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    partial TEXT,
+    full TEXT,
+    PRIMARY KEY (dev, ino)
+);
+"""
+
+
+class DuplicateGroup(TypedDict):
+    size: int  # 单个文件的大小
+    digest: str
+    paths: list[str]
+    wasted: int  # 删除到只剩一份后可以释放的字节数
+
+
+class DuplicateReport(TypedDict):
+    groups: list[DuplicateGroup]  # 按可释放空间从大到小排列
+    files_scanned: int
+    candidates: int  # 大小与其他文件相同、需要计算哈希的文件数
+    hardlinks_skipped: int
+    bytes_read: int  # 实际读取的字节数，不包括缓存命中
+    cache_hits: int
+    wasted: int  # 所有重复文件可释放的字节数
+
+
+def default_cache_path() -> Path:
+    """哈希缓存默认放在用户缓存目录下，所有根目录共用"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "file-system-agent" / "hashes.sqlite3"
+
+
+class _FileKey(TypedDict):
+    path: str
+    dev: int
+    ino: int
+    size: int
+    mtime_ns: int
+
+
+class HashCache:
+    """按 (设备, inode, 大小, mtime) 缓存文件的部分哈希和完整哈希"""
+
+    def __init__(self, db_path: Path | None = None):
+        """
+        Args:
+            db_path (Path | None): 缓存文件路径，为 None 时使用 default_cache_path()
+        """
+        self._db_path = db_path or default_cache_path()
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get(self, key: _FileKey) -> tuple[str | None, str | None]:
+        """返回 (部分哈希, 完整哈希)，文件大小或 mtime 变化后缓存失效"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT partial, full FROM hashes"
+                " WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?",
+                (key["dev"], key["ino"], key["size"], key["mtime_ns"]),
+            ).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def put_many(self, rows: list[tuple[_FileKey, str | None, str | None]]):
+        """批量写入 (文件, 部分哈希, 完整哈希)，覆盖该 inode 之前的记录"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO hashes (dev, ino, size, mtime_ns, partial, full)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        key["dev"],
+                        key["ino"],
+                        key["size"],
+                        key["mtime_ns"],
+                        partial,
+                        full,
+                    )
+                    for key, partial, full in rows
+                ],
+            )
+
+
+def _iter_files(start: Path, min_size: int):
+    """遍历 start 下的普通文件，不跟随符号链接"""
+    stack = [start]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if st.st_size >= min_size:
+                yield entry.path, st
+
+
+def _partial_hash(path: str, size: int) -> tuple[str, int]:
+    """开头和结尾各 PARTIAL_SIZE 字节的哈希，返回 (哈希, 读取的字节数)"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        head = f.read(PARTIAL_SIZE)
+        h.update(head)
+        read = len(head)
+        if size > PARTIAL_SIZE:
+            f.seek(max(PARTIAL_SIZE, size - PARTIAL_SIZE))
+            tail = f.read(PARTIAL_SIZE)
+            h.update(tail)
+            read += len(tail)
+    return h.hexdigest(), read
+
+
+def _full_hash(path: str) -> tuple[str, int]:
+    """完整内容的哈希，返回 (哈希, 读取的字节数)"""
+    h = hashlib.blake2b(digest_size=32)
+    read = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(READ_CHUNK):
+            h.update(chunk)
+            read += len(chunk)
+    return h.hexdigest(), read
+
+
+def find_duplicates(
+    start: Path,
+    min_size: int = 1,
+    cache: HashCache | None = None,
+    max_workers: int | None = None,
+) -> DuplicateReport:
+    """查找 start 下内容完全相同的文件
+
+    Args:
+        start (Path): 扫描的目录
+        min_size (int): 忽略小于该大小(字节)的文件，默认跳过空文件
+        cache (HashCache | None): 哈希缓存，为 None 时不缓存
+        max_workers (int | None): 计算哈希的线程数
+    Returns:
+        DuplicateReport: 重复文件分组和统计信息
+    """
+    report: DuplicateReport = {
+        "groups": [],
+        "files_scanned": 0,
+        "candidates": 0,
+        "hardlinks_skipped": 0,
+        "bytes_read": 0,
+        "cache_hits": 0,
+        "wasted": 0,
+    }
+    # 1. 按大小分组，同一个 inode 只保留第一次遇到的路径
+    by_size: dict[int, list[_FileKey]] = defaultdict(list)
+    seen: set[tuple[int, int]] = set()
+    for path, st in _iter_files(start, max(min_size, 0)):
+        report["files_scanned"] += 1
+        if (st.st_dev, st.st_ino) in seen:
+            report["hardlinks_skipped"] += 1
+            continue
+        seen.add((st.st_dev, st.st_ino))
+        by_size[st.st_size].append(
+            {
+                "path": path,
+                "dev": st.st_dev,
+                "ino": st.st_ino,
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+            }
+        )
+    candidates = [key for keys in by_size.values() if len(keys) > 1 for key in keys]
+    report["candidates"] = len(candidates)
+    if not candidates:
+        return report
+
+    cached = {
+        key["path"]: cache.get(key) if cache else (None, None) for key in candidates
+    }
+    partial: dict[str, str] = {}
+    full: dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # 2. 部分哈希
+        todo = []
+        for key in candidates:
+            if cached[key["path"]][0] is not None:
+                partial[key["path"]] = cached[key["path"]][0]  # type: ignore[assignment]
+                report["cache_hits"] += 1
+            else:
+                todo.append(key)
+        for key, result in zip(
+            todo, pool.map(lambda k: _try(_partial_hash, k["path"], k["size"]), todo)
+        ):
+            if result is not None:
+                partial[key["path"]], read = result
+                report["bytes_read"] += read
+
+        # 3. 部分哈希相同的文件计算完整哈希；不超过 2*PARTIAL_SIZE 的文件部分哈希已经覆盖全部内容
+        groups: dict[tuple[int, str], list[_FileKey]] = defaultdict(list)
+        for key in candidates:
+            if key["path"] in partial:
+                groups[(key["size"], partial[key["path"]])].append(key)
+        todo = []
+        for (size, digest), keys in groups.items():
+            if len(keys) < 2:
+                continue
+            for key in keys:
+                if size <= 2 * PARTIAL_SIZE:
+                    full[key["path"]] = digest
+                elif cached[key["path"]][1] is not None:
+                    full[key["path"]] = cached[key["path"]][1]  # type: ignore[assignment]
+                else:
+                    todo.append(key)
+        for key, result in zip(
+            todo, pool.map(lambda k: _try(_full_hash, k["path"]), todo)
+        ):
+            if result is not None:
+                full[key["path"]], read = result
+                report["bytes_read"] += read
+
+    if cache is not None:
+        # 只写入本次新计算出哈希的文件
+        rows = []
+        for key in candidates:
+            path = key["path"]
+            old_partial, old_full = cached[path]
+            new_full = full.get(path) if key["size"] > 2 * PARTIAL_SIZE else None
+            if path in partial and (
+                old_partial is None or (new_full is not None and old_full is None)
+            ):
+                rows.append((key, partial[path], new_full or old_full))
+        cache.put_many(rows)
+
+    # 4. 按 (大小, 完整哈希) 分组
+    duplicates: dict[tuple[int, str], list[str]] = defaultdict(list)
+    for key in candidates:
+        if key["path"] in full:
+            duplicates[(key["size"], full[key["path"]])].append(key["path"])
+    for (size, digest), paths in duplicates.items():
+        if len(paths) < 2:
+            continue
+        wasted = size * (len(paths) - 1)
+        report["groups"].append(
+            {"size": size, "digest": digest, "paths": sorted(paths), "wasted": wasted}
+        )
+        report["wasted"] += wasted
+    report["groups"].sort(key=lambda g: (-g["wasted"], g["paths"][0]))
+    return report
+
+
+def _try(func, *args):
+    """文件在扫描后被删除或无权限读取时跳过"""
+    try:
+        return func(*args)
+    except OSError:
+        return None
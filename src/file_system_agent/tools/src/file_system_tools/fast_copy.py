@@ -0,0 +1,305 @@
+"""在内核中完成的文件复制
+
+数据不经过 Python 内存，按以下顺序尝试:
+1. reflink(ioctl FICLONE): btrfs/xfs 等支持写时复制的文件系统上只复制元数据，几乎瞬间完成
+2. os.copy_file_range: 内核内复制，部分文件系统(如 NFS)可以在服务端完成
+3. os.sendfile: 内核内复制，较旧的内核不支持跨文件系统的 copy_file_range 时使用
+4. 分块读写: 以上都不可用时的兜底(比如非 Linux 平台)
+
+复制目录时先按顺序建立目录结构，再在线程池中并发复制文件，符号链接按链接本身复制。
+"""
+
+import errno
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Literal, TypedDict
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore
+
+CopyMethod = Literal["reflink", "copy_file_range", "sendfile", "read_write", "symlink"]
+
+# linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+# 每次系统调用复制的最大字节数
+COPY_BLOCK = 64 * 1024 * 1024
+# 复制目录时最多记录的错误数量
+MAX_ERRORS = 20
+
+# 内核不支持或不适用于当前文件时换下一种方式
+_FALLBACK_ERRNOS = {
+    errno.ENOSYS,
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+    errno.EBADF,
+    errno.ETXTBSY,
+}
+
+
+class CopyStats(TypedDict):
+    files: int
+    dirs: int
+    symlinks: int
+    bytes: int
+    methods: dict[str, int]  # 各复制方式使用的次数
+    errors: list[str]  # 复制失败的条目，最多 MAX_ERRORS 个
+
+
+def _reflink(src_fd: int, dst_fd: int) -> bool:
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+        return True
+    except OSError:
+        return False
+
+
+def _copy_file_range(src_fd: int, dst_fd: int) -> bool:
+    if not hasattr(os, "copy_file_range"):
+        return False
+    copied = 0
+    while True:
+        try:
+            n = os.copy_file_range(src_fd, dst_fd, COPY_BLOCK)
+        except OSError as e:
+            if copied == 0 and e.errno in _FALLBACK_ERRNOS:
+                return False
+            raise
+        if n == 0:
+            return True
+        copied += n
+
+
+def _sendfile(src_fd: int, dst_fd: int) -> bool:
+    if not hasattr(os, "sendfile"):
+        return False
+    offset = 0
+    while True:
+        try:
+            n = os.sendfile(dst_fd, src_fd, offset, COPY_BLOCK)
+        except OSError as e:
+            if offset == 0 and e.errno in _FALLBACK_ERRNOS:
+                return False
+            raise
+        if n == 0:
+            return True
+        offset += n
+
+
+def _same_file(st: os.stat_result, dst: Path, follow_symlinks: bool = True) -> bool:
+    """目标是否存在且与 st 对应的文件是同一个(按 st_dev/st_ino 比较)"""
+    try:
+        dst_st = os.stat(dst, follow_symlinks=follow_symlinks)
+    except OSError:
+        return False
+    return os.path.samestat(st, dst_st)
+
+
+def _copy_data(fsrc: BinaryIO, dst_fd: int) -> CopyMethod:
+    src_fd = fsrc.fileno()
+    if _reflink(src_fd, dst_fd):
+        return "reflink"
+    if _copy_file_range(src_fd, dst_fd):
+        return "copy_file_range"
+    if _sendfile(src_fd, dst_fd):
+        return "sendfile"
+    os.lseek(src_fd, 0, os.SEEK_SET)
+    os.lseek(dst_fd, 0, os.SEEK_SET)
+    os.ftruncate(dst_fd, 0)
+    with open(dst_fd, "wb", closefd=False) as fdst:
+        shutil.copyfileobj(fsrc, fdst, COPY_BLOCK)
+    return "read_write"
+
+
+def _temp_symlink(target: str, dst: Path) -> Path:
+    """在目标所在目录下以随机名字创建符号链接"""
+    while True:
+        tmp = dst.parent / f".{dst.name}.{os.urandom(4).hex()}.tmp"
+        try:
+            os.symlink(target, tmp)
+            return tmp
+        except FileExistsError:
+            continue
+
+
+def copy_file(src: Path, dst: Path, overwrite: bool = False) -> CopyMethod:
+    """复制单个文件(或符号链接本身)，并复制权限和时间戳
+
+    覆盖已有目标时先在目标所在目录写临时文件，完成后用 os.replace 原子替换，
+    目标是符号链接时替换的是链接本身；复制失败时原目标保持不变。
+
+    Args:
+        src (Path): 源文件
+        dst (Path): 目标文件，父目录必须存在
+        overwrite (bool): 目标存在时是否覆盖
+    Returns:
+        CopyMethod: 实际使用的复制方式
+    Raises:
+        FileExistsError: 目标已存在且 overwrite 为 False
+        IsADirectoryError: 源是目录
+        shutil.SameFileError: 目标与源是同一个文件(同一路径、硬链接或指向源的符号链接)
+    """
+    if src.is_symlink():
+        target = os.readlink(src)
+        if not overwrite:
+            os.symlink(target, dst)
+            return "symlink"
+        if _same_file(os.lstat(src), dst, follow_symlinks=False):
+            raise shutil.SameFileError(f"源和目标是同一个文件: {src}")
+        tmp = _temp_symlink(target, dst)
+        try:
+            os.replace(tmp, dst)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return "symlink"
+    if src.is_dir():
+        raise IsADirectoryError(f"是目录: {src}")
+    with open(src, "rb") as fsrc:
+        st = os.fstat(fsrc.fileno())
+        if not overwrite:
+            # O_EXCL 保证目标是本次创建的，失败时可以直接删除
+            dst_fd = os.open(
+                dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, st.st_mode & 0o777
+            )
+            try:
+                method = _copy_data(fsrc, dst_fd)
+            except BaseException:
+                os.close(dst_fd)
+                dst.unlink(missing_ok=True)
+                raise
+            os.close(dst_fd)
+            shutil.copystat(src, dst)
+            return method
+        if _same_file(st, dst):
+            raise shutil.SameFileError(f"源和目标是同一个文件: {src}")
+        dst_fd, tmp_name = tempfile.mkstemp(
+            dir=dst.parent, prefix=f".{dst.name}.", suffix=".tmp"
+        )
+        tmp = Path(tmp_name)
+        try:
+            try:
+                method = _copy_data(fsrc, dst_fd)
+            finally:
+                os.close(dst_fd)
+            shutil.copystat(src, tmp)
+            os.replace(tmp, dst)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+    return method
+
+
+def copy_tree(
+    src: Path,
+    dst: Path,
+    overwrite: bool = False,
+    max_workers: int | None = None,
+) -> CopyStats:
+    """复制文件或整个目录
+
+    Args:
+        src (Path): 源文件或目录
+        dst (Path): 目标路径，复制目录时会创建该目录
+        overwrite (bool): 目标文件已存在时是否覆盖
+        max_workers (int | None): 复制文件的线程池大小
+    Returns:
+        CopyStats: 复制的文件/目录/链接数量、字节数、使用的复制方式以及失败的条目
+    Raises:
+        FileNotFoundError: 源不存在
+        FileExistsError: 复制目录时目标已存在且 overwrite 为 False
+        ValueError: 目标位于源目录之内
+    """
+    stats: CopyStats = {
+        "files": 0,
+        "dirs": 0,
+        "symlinks": 0,
+        "bytes": 0,
+        "methods": {},
+        "errors": [],
+    }
+    if not os.path.lexists(src):
+        raise FileNotFoundError(f"源路径不存在: {src}")
+    if src.is_symlink() or not src.is_dir():
+        _record(stats, dst, copy_file(src, dst, overwrite))
+        return stats
+    if dst.resolve().is_relative_to(src.resolve()):
+        raise ValueError("不能复制到自身的子目录中")
+    if dst.exists() and not overwrite:
+        raise FileExistsError(f"目标已存在: {dst}")
+
+    # 先建立目录结构，收集需要复制的文件
+    pairs: list[tuple[Path, Path]] = []
+    stack = [(src, dst)]
+    while stack:
+        src_dir, dst_dir = stack.pop()
+        try:
+            dst_dir.mkdir(exist_ok=overwrite)
+            stats["dirs"] += 1
+            with os.scandir(src_dir) as it:
+                entries = list(it)
+        except OSError as e:
+            _error(stats, src_dir, e)
+            continue
+        for entry in entries:
+            child_src, child_dst = src_dir / entry.name, dst_dir / entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((child_src, child_dst))
+                else:
+                    pairs.append((child_src, child_dst))
+            except OSError as e:
+                _error(stats, child_src, e)
+
+    def copy_one(pair: tuple[Path, Path]) -> CopyMethod | OSError:
+        try:
+            return copy_file(pair[0], pair[1], overwrite)
+        except OSError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for (s, d), result in zip(pairs, pool.map(copy_one, pairs)):
+            if isinstance(result, OSError):
+                _error(stats, s, result)
+            else:
+                _record(stats, d, result)
+
+    # 文件复制完成后再复制目录的时间戳，否则会被写入文件更新
+    for src_dir, dst_dir in _dirs_bottom_up(src, dst):
+        try:
+            shutil.copystat(src_dir, dst_dir)
+        except OSError:
+            pass
+    return stats
+
+
+def _dirs_bottom_up(src: Path, dst: Path):
+    for root, _, _ in os.walk(src, topdown=False):
+        rel = os.path.relpath(root, src)
+        yield Path(root), dst if rel == "." else dst / rel
+
+
+def _record(stats: CopyStats, dst: Path, method: CopyMethod):
+    stats["methods"][method] = stats["methods"].get(method, 0) + 1
+    if method == "symlink":
+        stats["symlinks"] += 1
+        return
+    stats["files"] += 1
+    try:
+        stats["bytes"] += dst.stat().st_size
+    except OSError:
+        pass
+
+
+def _error(stats: CopyStats, path: Path, error: OSError):
+    if len(stats["errors"]) < MAX_ERRORS:
+        stats["errors"].append(f"{path}: {error.strerror or error}")
@@ -0,0 +1,293 @@
+"""按行/按字节窗口读取文件
+
+通过 mmap 访问文件，只解码需要返回的部分:
+- 按字节读取直接切片
+- 按行读取依赖稀疏的行偏移索引: 每 1MB 记录一个检查点(字节偏移, 之前的换行数)，
+  定位第 N 行时先二分找到检查点，再在该块内查找换行符。
+  索引按 (size, dev, inode, mtime, ctime) 缓存，并且只会建立到目前需要的位置，
+  读取第 1,000,000 行时只统计之前的换行符而不解码之前的内容
+- tail 从文件末尾向前查找换行符，开销只与输出大小有关
+"""
+
+import bisect
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TypedDict
+
+# 稀疏行索引的检查点间隔
+CHUNK_SIZE = 1024 * 1024
+# 一次最多返回的字节数，避免很大的行号或长度把整个大文件读入内存和模型上下文
+MAX_WINDOW_BYTES = 256 * 1024
+
+
+class TextWindow(TypedDict):
+    text: str
+    start_line: int | None  # 窗口的起止行号(1 开始，包含)，按字节读取时为 None
+    end_line: int | None
+    start_byte: int
+    end_byte: int  # 不包含
+    file_size: int
+    truncated: bool  # 请求的范围超过 max_bytes，只返回了开头(tail 为结尾)的部分
+
+
+@dataclass
+class _LineIndex:
+    """稀疏行索引: offsets[i] 处之前共有 lines[i] 个换行符"""
+
+    size: int
+    stamp: tuple[int, int, int, int]  # (st_dev, st_ino, st_mtime_ns, st_ctime_ns)
+    offsets: list[int] = field(default_factory=lambda: [0])
+    lines: list[int] = field(default_factory=lambda: [0])
+
+    @property
+    def complete(self) -> bool:
+        return self.offsets[-1] >= self.size
+
+    def extend(self, mm: mmap.mmap, until_line: int):
+        """把检查点推进到覆盖 until_line 行(从 0 开始)或文件末尾"""
+        while not self.complete and self.lines[-1] <= until_line:
+            start = self.offsets[-1]
+            end = min(start + CHUNK_SIZE, self.size)
+            self.offsets.append(end)
+            self.lines.append(self.lines[-1] + mm[start:end].count(b"\n"))
+
+    def line_start(self, mm: mmap.mmap, line: int) -> int:
+        """返回第 line 行(从 0 开始)的起始字节偏移，超出文件时返回文件大小"""
+        if line <= 0:
+            return 0
+        self.extend(mm, line)
+        # 第 line 行从第 line 个换行符之后开始，找到在该换行符之前的最后一个检查点
+        i = bisect.bisect_left(self.lines, line) - 1
+        pos, seen = self.offsets[i], self.lines[i]
+        while seen < line:
+            nl = mm.find(b"\n", pos)
+            if nl == -1:
+                return self.size
+            pos = nl + 1
+            seen += 1
+        return pos
+
+
+_index_cache: OrderedDict[str, _LineIndex] = OrderedDict()
+_index_lock = threading.Lock()
+_MAX_CACHED_INDEXES = 64
+
+
+def _stamp(st: os.stat_result) -> tuple[int, int, int, int]:
+    """判断文件是否变化的依据
+
+    只比较大小和 mtime 不够: 两次写入落在同一个时钟刻度内、或者 mtime 被还原时，
+    大小不变但行的位置已经改变。atomic_writer 的 os.replace 总会产生新的 inode，
+    原地写入会更新无法被 utime 还原的 ctime。
+    """
+    return st.st_dev, st.st_ino, st.st_mtime_ns, st.st_ctime_ns
+
+
+def _get_index(path: Path, st: os.stat_result) -> _LineIndex:
+    key = str(path)
+    stamp = _stamp(st)
+    with _index_lock:
+        index = _index_cache.get(key)
+        if index is None or index.size != st.st_size or index.stamp != stamp:
+            index = _LineIndex(st.st_size, stamp)
+            _index_cache[key] = index
+        _index_cache.move_to_end(key)
+        while len(_index_cache) > _MAX_CACHED_INDEXES:
+            _index_cache.popitem(last=False)
+        return index
+
+
+def _decode(data: bytes, encoding: str) -> str:
+    return data.decode(encoding, errors="replace")
+
+
+def read_line_range(
+    path: Path,
+    start_line: int,
+    end_line: int,
+    encoding: str = "utf-8",
+    max_bytes: int = MAX_WINDOW_BYTES,
+) -> TextWindow:
+    """读取 [start_line, end_line] 行(1 开始，包含两端)
+
+    范围超过 max_bytes 时只返回开头的完整行(第一行本身就超过时截断该行)，
+    end_line 为实际返回的最后一行
+
+    Args:
+        path (Path): 文件路径
+        start_line (int): 起始行号
+        end_line (int): 结束行号
+        encoding (str): 文本编码
+        max_bytes (int): 最多返回的字节数
+    Returns:
+        TextWindow: 读取到的文本和位置信息
+    Raises:
+        ValueError: 行号不合法
+    """
+    if start_line < 1 or end_line < start_line:
+        raise ValueError(f"无效的行范围: {start_line}-{end_line}")
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if st.st_size == 0:
+            return _empty_window(start_line)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            begin, end = _locate(path, st, mm, start_line, end_line)
+            truncated = end - begin > max_bytes
+            if truncated:
+                cut = mm.rfind(b"\n", begin, begin + max_bytes)
+                end = cut + 1 if cut != -1 else begin + max_bytes
+            data = mm[begin:end]
+    count = data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+    return {
+        "text": _decode(data, encoding),
+        "start_line": start_line,
+        "end_line": start_line + count - 1,
+        "start_byte": begin,
+        "end_byte": end,
+        "file_size": st.st_size,
+        "truncated": truncated,
+    }
+
+
+def _locate(
+    path: Path, st: os.stat_result, mm: mmap.mmap, start_line: int, end_line: int
+) -> tuple[int, int]:
+    index = _get_index(path, st)
+    with _index_lock:
+        return index.line_start(mm, start_line - 1), index.line_start(mm, end_line)
+
+
+def locate_lines(path: Path, start_line: int, end_line: int) -> tuple[int, int]:
+    """返回 [start_line, end_line] 行(1 开始，包含两端)对应的字节范围 [begin, end)
+
+    end_line 可以等于 start_line - 1，此时得到第 start_line 行开头的空范围(用于插入)，
+    超出文件末尾的行对应文件末尾
+
+    Args:
+        path (Path): 文件路径
+        start_line (int): 起始行号
+        end_line (int): 结束行号
+    Returns:
+        tuple[int, int]: 字节范围
+    Raises:
+        ValueError: 行号不合法
+    """
+    if start_line < 1 or end_line < start_line - 1:
+        raise ValueError(f"无效的行范围: {start_line}-{end_line}")
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if st.st_size == 0:
+            return 0, 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _locate(path, st, mm, start_line, end_line)
+
+
+def read_byte_range(
+    path: Path,
+    offset: int,
+    length: int,
+    encoding: str = "utf-8",
+    max_bytes: int = MAX_WINDOW_BYTES,
+) -> TextWindow:
+    """读取 [offset, offset+length) 字节，首尾被截断的多字节字符会被替换
+
+    Args:
+        path (Path): 文件路径
+        offset (int): 起始字节偏移，负数表示从文件末尾倒数
+        length (int): 读取的字节数，最多 max_bytes
+        encoding (str): 文本编码
+        max_bytes (int): 最多返回的字节数
+    Returns:
+        TextWindow: 读取到的文本和位置信息
+    """
+    if length < 0:
+        raise ValueError(f"无效的读取长度: {length}")
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        begin = max(0, size + offset) if offset < 0 else min(offset, size)
+        f.seek(begin)
+        data = f.read(min(length, max_bytes))
+    return {
+        "text": _decode(data, encoding),
+        "start_line": None,
+        "end_line": None,
+        "start_byte": begin,
+        "end_byte": begin + len(data),
+        "file_size": size,
+        "truncated": length > max_bytes and len(data) == max_bytes,
+    }
+
+
+def read_head(
+    path: Path, lines: int, encoding: str = "utf-8", max_bytes: int = MAX_WINDOW_BYTES
+) -> TextWindow:
+    """读取前 lines 行"""
+    return read_line_range(path, 1, max(lines, 1), encoding, max_bytes)
+
+
+def read_tail(
+    path: Path, lines: int, encoding: str = "utf-8", max_bytes: int = MAX_WINDOW_BYTES
+) -> TextWindow:
+    """从文件末尾向前查找换行符，读取最后 lines 行，不需要读取之前的内容
+
+    超过 max_bytes 时只返回结尾的完整行(最后一行本身就超过时截断该行)
+
+    Args:
+        path (Path): 文件路径
+        lines (int): 行数
+        encoding (str): 文本编码
+        max_bytes (int): 最多返回的字节数
+    Returns:
+        TextWindow: 读取到的文本，行号未知时 start_line/end_line 为 None
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0 or lines <= 0:
+            return _empty_window(None, size)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = size
+            # 文件末尾的换行符不算作新的一行
+            pos = size - 1 if mm[size - 1 : size] == b"\n" else size
+            # 只在最后 max_bytes 字节中查找，limit 之前的换行符意味着下一行从 limit 开始
+            limit = max(0, end - max_bytes)
+            begin = 0
+            truncated = False
+            for i in range(lines):
+                nl = mm.rfind(b"\n", max(0, limit - 1), pos)
+                if nl == -1:
+                    if limit > 0:
+                        truncated = True
+                        # 最后一行本身超过上限时截断该行，否则只返回已经找到的完整行
+                        if i == 0:
+                            begin = limit
+                    else:
+                        begin = 0
+                    break
+                begin = nl + 1
+                pos = nl
+            data = mm[begin:end]
+    return {
+        "text": _decode(data, encoding),
+        "start_line": None,
+        "end_line": None,
+        "start_byte": begin,
+        "end_byte": end,
+        "file_size": size,
+        "truncated": truncated,
+    }
+
+
+def _empty_window(start_line: int | None, size: int = 0) -> TextWindow:
+    return {
+        "text": "",
+        "start_line": start_line,
+        "end_line": None if start_line is None else start_line - 1,
+        "start_byte": size,
+        "end_byte": size,
+        "file_size": size,
+        "truncated": False,
+    }
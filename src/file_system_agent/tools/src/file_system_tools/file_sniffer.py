@@ -0,0 +1,192 @@
+"""读取文件前的快速嗅探
+
+只读取文件开头的 SNIFF_SIZE 字节，判断文件是文本还是二进制以及文本编码:
+1. BOM: UTF-8/UTF-16/UTF-32 的字节序标记
+2. 魔数: 常见二进制格式(图片、压缩包、可执行文件等)的文件头
+3. 内容: 含有 NUL 字节或大量控制字符的视为二进制
+4. 编码: 依次尝试 UTF-8、GB18030(兼容 GBK/GB2312)，都失败时按 Latin-1 解码
+
+二进制文件不应该整个读入模型上下文，只返回大小、类型和开头部分的十六进制内容。
+"""
+
+import codecs
+import os
+from pathlib import Path
+from typing import TypedDict
+
+SNIFF_SIZE = 8192
+# 二进制文件描述中默认展示的字节数
+HEX_HEAD_BYTES = 64
+# 控制字符占比超过该值时视为二进制
+MAX_CONTROL_RATIO = 0.1
+
+_BOMS = [
+    # UTF-32 必须在 UTF-16 之前判断，它们的 LE BOM 前缀相同
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+# (偏移, 魔数, 类型描述)
+_MAGIC = [
+    (0, b"\x89PNG\r\n\x1a\n", "PNG 图片"),
+    (0, b"\xff\xd8\xff", "JPEG 图片"),
+    (0, b"GIF87a", "GIF 图片"),
+    (0, b"GIF89a", "GIF 图片"),
+    (0, b"BM", "BMP 图片"),
+    (0, b"%PDF-", "PDF 文档"),
+    (0, b"PK\x03\x04", "ZIP 压缩包(也可能是 docx/xlsx/jar 等)"),
+    (0, b"PK\x05\x06", "ZIP 压缩包(空)"),
+    (0, b"\x1f\x8b", "gzip 压缩文件"),
+    (0, b"BZh", "bzip2 压缩文件"),
+    (0, b"\xfd7zXZ\x00", "xz 压缩文件"),
+    (0, b"(\xb5/\xfd", "zstd 压缩文件"),
+    (0, b"7z\xbc\xaf\x27\x1c", "7z 压缩包"),
+    (0, b"Rar!\x1a\x07", "RAR 压缩包"),
+    (257, b"ustar", "tar 归档"),
+    (0, b"\x7fELF", "ELF 可执行文件/共享库"),
+    (0, b"MZ", "Windows 可执行文件(PE)"),
+    (0, b"\xcf\xfa\xed\xfe", "Mach-O 可执行文件"),
+    (0, b"\xca\xfe\xba\xbe", "Java class 文件或 Mach-O 通用二进制"),
+    (0, b"\x00asm", "WebAssembly 模块"),
+    (0, b"SQLite format 3\x00", "SQLite 数据库"),
+    (0, b"\x93NUMPY", "NumPy 数组文件"),
+    (0, b"PAR1", "Parquet 文件"),
+    (0, b"ID3", "MP3 音频"),
+    (0, b"OggS", "Ogg 音视频"),
+    (0, b"fLaC", "FLAC 音频"),
+    (0, b"\x1aE\xdf\xa3", "Matroska/WebM 视频"),
+    (0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "旧版 Office 文档(doc/xls/ppt)"),
+    (0, b"wOFF", "WOFF 字体"),
+    (0, b"wOF2", "WOFF2 字体"),
+]
+
+# 文本中常见的控制字符: \b \t \n \f \r ESC
+_TEXT_CONTROLS = frozenset(b"\b\t\n\f\r\x1b")
+
+
+class FileSniff(TypedDict):
+    binary: bool
+    encoding: str | None  # 文本文件的编码，二进制文件为 None
+    kind: str | None  # 根据魔数识别出的类型，未识别时为 None
+    size: int
+    head: bytes  # 文件开头的 SNIFF_SIZE 字节
+
+
+def detect_magic(head: bytes) -> str | None:
+    """根据文件头识别常见的二进制格式"""
+    for offset, magic, kind in _MAGIC:
+        if head[offset : offset + len(magic)] == magic:
+            return kind
+    if head[:4] == b"RIFF" and head[8:12] in (b"WEBP", b"WAVE", b"AVI "):
+        return {b"WEBP": "WebP 图片", b"WAVE": "WAV 音频", b"AVI ": "AVI 视频"}[
+            head[8:12]
+        ]
+    if head[4:8] == b"ftyp":
+        return "MP4/MOV 视频"
+    return None
+
+
+def looks_binary(head: bytes) -> bool:
+    """内容是否像二进制数据: 含有 NUL 字节或大量控制字符"""
+    if b"\0" in head:
+        return True
+    controls = sum(1 for b in head if b < 0x20 and b not in _TEXT_CONTROLS)
+    return controls > len(head) * MAX_CONTROL_RATIO
+
+
+def _decodes(head: bytes, encoding: str, complete: bool) -> bool:
+    """head 能否按 encoding 解码，文件没有读完时允许结尾是不完整的多字节字符"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        decoder.decode(head, final=complete)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def detect_encoding(head: bytes, complete: bool = True) -> str:
+    """推断文本编码
+
+    Args:
+        head (bytes): 文件开头的内容
+        complete (bool): head 是否是完整的文件内容
+    Returns:
+        str: 编码名称，可以直接传给 bytes.decode
+    """
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    for encoding in ("utf-8", "gb18030"):
+        if _decodes(head, encoding, complete):
+            return encoding
+    return "latin-1"
+
+
+def sniff_file(path: Path, sample_size: int = SNIFF_SIZE) -> FileSniff:
+    """读取文件开头判断文件类型和编码，不读取文件的其余部分
+
+    Args:
+        path (Path): 文件路径
+        sample_size (int): 读取的字节数
+    Returns:
+        FileSniff: 嗅探结果
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        head = f.read(sample_size)
+    complete = len(head) >= size
+    kind = detect_magic(head)
+    bom = any(head.startswith(bom) for bom, _ in _BOMS)
+    # 带 BOM 的 UTF-16/32 文本中有大量 NUL 字节，不能按内容判断；
+    # 部分魔数很短(比如 "BM"、"MZ")，文本文件也可能以它们开头，所以还要求内容不是 UTF-8 文本
+    binary = not bom and (
+        looks_binary(head)
+        or (kind is not None and not _decodes(head, "utf-8", complete))
+    )
+    return {
+        "binary": binary,
+        "encoding": None if binary else detect_encoding(head, complete),
+        "kind": kind if binary else None,
+        "size": size,
+        "head": head,
+    }
+
+
+def is_wide_encoding(encoding: str) -> bool:
+    """UTF-16/32 中换行符不是单个 b"\\n" 字节，不能按字节查找换行符来定位行"""
+    return encoding.startswith(("utf-16", "utf-32"))
+
+
+def hex_dump(data: bytes, start: int = 0, width: int = 16) -> str:
+    """类似 xxd 的十六进制输出: 偏移、十六进制字节、可打印字符
+
+    Args:
+        data (bytes): 要输出的内容
+        start (int): data 在文件中的起始偏移
+        width (int): 每行的字节数
+    Returns:
+        str: 十六进制文本
+    """
+    lines = []
+    for i in range(0, len(data), width):
+        chunk = data[i : i + width]
+        hex_part = " ".join(f"{b:02x}" for b in chunk)
+        text = "".join(chr(b) if 0x20 <= b < 0x7F else "." for b in chunk)
+        lines.append(f"{start + i:08x}: {hex_part:<{width * 3 - 1}}  {text}")
+    return "\n".join(lines)
+
+
+def read_raw_range(path: Path, offset: int, length: int) -> tuple[int, bytes]:
+    """读取 [offset, offset+length) 的原始字节，offset 为负数时从文件末尾倒数
+
+    Returns:
+        tuple[int, bytes]: 实际的起始偏移和读取到的内容
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        begin = max(0, size + offset) if offset < 0 else min(offset, size)
+        f.seek(begin)
+        return begin, f.read(max(length, 0))
@@ -0,0 +1,311 @@
+"""局部修改文件: 追加、按行替换、应用 unified diff
+
+修改只需要传入变化的部分，未改变的内容按字节原样复制，不需要解码。
+除追加外，所有写入都先写到同一目录下的临时文件，再用 os.replace 原子地替换原文件，
+任何时刻其他进程看到的要么是旧文件，要么是完整的新文件。
+追加直接以 O_APPEND 写入末尾: 通过临时文件追加需要复制整个文件，且追加本身不会破坏已有内容。
+"""
+
+import os
+import re
+import shutil
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, TypedDict
+
+from .file_reader import locate_lines
+
+# 复制未修改部分时每次读取的大小
+COPY_CHUNK = 1024 * 1024
+# 补丁的上下文与文件对不上时，向前后查找的最大行数
+FUZZ_LINES = 100
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchStats(TypedDict):
+    hunks: int
+    added: int
+    removed: int
+
+
+@dataclass
+class _Hunk:
+    old_start: int
+    old_count: int
+    new_count: int
+    context: int = 0  # 上下文行数
+    old_lines: list[str] = field(default_factory=list)
+    new_lines: list[str] = field(default_factory=list)
+    new_no_eol: bool = False  # 新内容的最后一行没有换行符
+
+
+def _real_path(path: Path) -> Path:
+    """写入符号链接时修改其指向的文件，而不是把链接替换成普通文件"""
+    return Path(os.path.realpath(path))
+
+
+def _current_umask() -> int:
+    """读取进程的 umask
+
+    Linux 上从 /proc 读取；其他平台只能先设置再恢复，期间其他线程创建的文件
+    会使用临时的 umask，因此只作为后备。
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+@contextmanager
+def atomic_writer(path: Path) -> Iterator[BinaryIO]:
+    """在同一目录下创建临时文件供写入，正常退出时原子地替换 path，出错时删除临时文件
+
+    Args:
+        path (Path): 目标文件，父目录必须存在
+    Yields:
+        BinaryIO: 临时文件
+    """
+    path = _real_path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            yield out
+            out.flush()
+            os.fsync(out.fileno())
+        if path.exists():
+            shutil.copymode(path, tmp)
+        else:
+            # mkstemp 创建的文件权限为 0600，新文件应与 open() 创建的一样遵循 umask
+            os.chmod(tmp, 0o666 & ~_current_umask())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _copy_range(src: BinaryIO, dst: BinaryIO, start: int, end: int):
+    src.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        chunk = src.read(min(COPY_CHUNK, remaining))
+        if not chunk:
+            break
+        dst.write(chunk)
+        remaining -= len(chunk)
+
+
+def write_text(path: Path, content: str):
+    """原子地用 content 覆盖整个文件"""
+    with atomic_writer(path) as out:
+        out.write(content.encode("utf-8"))
+
+
+def append_text(path: Path, content: str) -> int:
+    """在文件末尾追加内容，文件不存在时创建
+
+    Returns:
+        int: 追加的字节数
+    """
+    data = content.encode("utf-8")
+    with open(path, "ab") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return len(data)
+
+
+def replace_lines(path: Path, start_line: int, end_line: int, content: str) -> int:
+    """把 [start_line, end_line] 行(1 开始，包含两端)替换为 content
+
+    end_line 等于 start_line - 1 时不删除任何行，把 content 插入到第 start_line 行之前；
+    content 为空字符串时删除这些行
+
+    Args:
+        path (Path): 文件路径
+        start_line (int): 起始行号
+        end_line (int): 结束行号
+        content (str): 新内容
+    Returns:
+        int: 被替换的行数
+    Raises:
+        ValueError: 行号不合法
+    """
+    begin, end = locate_lines(path, start_line, end_line)
+    data = content.encode("utf-8")
+    with open(path, "rb") as src:
+        size = os.fstat(src.fileno()).st_size
+        if begin < end:
+            src.seek(begin)
+            removed = src.read(end - begin).count(b"\n") or 1
+        else:
+            removed = 0
+        if data and not data.endswith(b"\n") and end < size:
+            data += b"\n"  # 保持与后面的行分开
+        if data and begin == size and size > 0:
+            src.seek(size - 1)
+            if src.read(1) != b"\n":
+                data = b"\n" + data  # 原文件末尾没有换行符
+        with atomic_writer(path) as out:
+            _copy_range(src, out, 0, begin)
+            out.write(data)
+            _copy_range(src, out, end, size)
+    return removed
+
+
+def parse_unified_diff(diff: str) -> list[_Hunk]:
+    """解析单个文件的 unified diff，忽略 ---/+++ 文件头
+
+    Raises:
+        ValueError: 格式错误或包含多个文件
+    """
+    hunks: list[_Hunk] = []
+    headers = 0
+    current: _Hunk | None = None
+    last_sign = ""
+    for line in diff.splitlines():
+        if line.startswith("--- ") and (current is None or _hunk_done(current)):
+            headers += 1
+            if headers > 1:
+                raise ValueError("补丁包含多个文件，每次只能修改一个文件")
+            current = None
+            continue
+        if line.startswith("+++ ") and current is None:
+            continue
+        m = _HUNK_HEADER.match(line)
+        if m:
+            current = _Hunk(
+                int(m.group(1)),
+                1 if m.group(2) is None else int(m.group(2)),
+                1 if m.group(4) is None else int(m.group(4)),
+            )
+            hunks.append(current)
+            continue
+        if current is None:
+            continue  # diff --git、index 等说明行
+        if line.startswith("\\"):
+            if last_sign in ("+", " "):
+                current.new_no_eol = True
+            continue
+        sign, text = (line[:1], line[1:]) if line else (" ", "")
+        if sign == " ":
+            current.old_lines.append(text)
+            current.new_lines.append(text)
+            current.context += 1
+        elif sign == "-":
+            current.old_lines.append(text)
+        elif sign == "+":
+            current.new_lines.append(text)
+        else:
+            raise ValueError(f"无法解析的补丁行: {line}")
+        last_sign = sign
+    if not hunks:
+        raise ValueError("补丁中没有找到修改块(@@ ... @@)")
+    for hunk in hunks:
+        if not _hunk_done(hunk):
+            raise ValueError(f"修改块 @@ -{hunk.old_start} 的行数与头部不一致")
+    return hunks
+
+
+def _hunk_done(hunk: _Hunk) -> bool:
+    return (
+        len(hunk.old_lines) == hunk.old_count and len(hunk.new_lines) == hunk.new_count
+    )
+
+
+def _read_lines(src: BinaryIO, path: Path, start: int, count: int):
+    """读取从第 start 行开始的 count 行，返回 (字节范围, 去掉换行符的各行, 是否使用 CRLF)"""
+    begin, end = locate_lines(path, start, start + count - 1)
+    src.seek(begin)
+    raw = src.read(end - begin)
+    parts = raw.split(b"\n")
+    if raw.endswith(b"\n") or not raw:
+        parts.pop()
+    crlf = bool(parts) and parts[0].endswith(b"\r")
+    lines = [p.decode("utf-8", errors="replace").rstrip("\r") for p in parts]
+    return (begin, end), lines, crlf
+
+
+def apply_patch(path: Path, diff: str) -> PatchStats:
+    """把 unified diff 应用到文件上
+
+    每个修改块先在头部给出的行号处核对上下文和删除的行，对不上时在前后 FUZZ_LINES 行内查找
+    (与 patch 命令相同，前一个修改块的偏移会带到后面的修改块)。全部核对通过后才写入文件。
+
+    Args:
+        path (Path): 文件路径
+        diff (str): 单个文件的 unified diff
+    Returns:
+        PatchStats: 修改块数量以及增删的行数
+    Raises:
+        ValueError: 补丁格式错误或与文件内容对不上
+    """
+    hunks = parse_unified_diff(diff)
+    edits: list[tuple[int, int, bytes]] = []
+    with open(path, "rb") as src:
+        size = os.fstat(src.fileno()).st_size
+        offset = 0
+        min_line = 1  # 修改块不能与前一个重叠
+        for hunk in hunks:
+            count = len(hunk.old_lines)
+            # 没有旧行时 old_start 表示插入到该行之后
+            expected = hunk.old_start + offset + (1 if count == 0 else 0)
+            found = None
+            for delta in _fuzz_order():
+                start = expected + delta
+                if start < min_line:
+                    continue
+                span, lines, crlf = _read_lines(src, path, start, count)
+                if count == 0 or lines == hunk.old_lines:
+                    found = start, span, crlf
+                    break
+            if found is None:
+                raise ValueError(
+                    f"修改块 @@ -{hunk.old_start} 与文件内容不一致，请重新读取文件后生成补丁"
+                )
+            start, (begin, end), crlf = found
+            offset = start - hunk.old_start - (1 if count == 0 else 0)
+            min_line = start + count
+            newline = "\r\n" if crlf else "\n"
+            text = newline.join(hunk.new_lines)
+            at_eof = end >= size
+            if hunk.new_lines and not (hunk.new_no_eol and at_eof):
+                text += newline
+            data = text.encode("utf-8")
+            if data and begin == size and size > 0:
+                src.seek(size - 1)
+                if src.read(1) != b"\n":
+                    data = newline.encode() + data
+            edits.append((begin, end, data))
+
+        with atomic_writer(path) as out:
+            pos = 0
+            for begin, end, data in edits:
+                _copy_range(src, out, pos, begin)
+                out.write(data)
+                pos = end
+            _copy_range(src, out, pos, size)
+    return {
+        "hunks": len(hunks),
+        "added": sum(h.new_count - h.context for h in hunks),
+        "removed": sum(h.old_count - h.context for h in hunks),
+    }
+
+
+def _fuzz_order() -> Iterator[int]:
+    yield 0
+    for d in range(1, FUZZ_LINES + 1):
+        yield -d
+        yield d
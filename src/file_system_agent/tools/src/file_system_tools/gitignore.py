@@ -0,0 +1,138 @@
+""".gitignore 规则解析与匹配
+
+实现了 gitignore 的常用语义: 注释、! 取反、结尾 / 只匹配目录、
+包含 / 的模式相对 .gitignore 所在目录锚定、* ? [..] 以及 ** 通配。
+"""
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class _Rule:
+    regex: re.Pattern[str]
+    negate: bool
+    dir_only: bool
+    anchored: bool  # 为 True 时匹配相对路径，否则只匹配名称
+
+
+def _translate(pattern: str) -> str:
+    """把 gitignore 通配模式转换为正则表达式"""
+    res = []
+    i, n = 0, len(pattern)
+    while i < n:
+        if pattern.startswith("**/", i):
+            res.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            res.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            res.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            res.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            res.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            j = pattern.find("]", i + 1)
+            if j == -1:
+                res.append(re.escape("["))
+                i += 1
+                continue
+            body = pattern[i + 1 : j]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            res.append(f"[{body}]")
+            i = j + 1
+        elif pattern[i] == "\\" and i + 1 < n:
+            res.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            res.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(res)
+
+
+def parse_gitignore(text: str) -> list[_Rule]:
+    """解析 .gitignore 文件内容
+
+    Args:
+        text (str): 文件内容
+    Returns:
+        list[_Rule]: 按出现顺序排列的规则
+    """
+    rules = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        anchored = "/" in line
+        line = line.lstrip("/")
+        rules.append(
+            _Rule(re.compile(_translate(line), re.DOTALL), negate, dir_only, anchored)
+        )
+    return rules
+
+
+class IgnoreMatcher:
+    """逐层累积各目录的 .gitignore 规则，判断条目是否被忽略"""
+
+    def __init__(self, layers: tuple[tuple[Path, list[_Rule]], ...] = ()):
+        self._layers = layers
+
+    def descend(self, directory: Path) -> "IgnoreMatcher":
+        """进入一个目录，如果其中有 .gitignore 则追加其规则
+
+        Args:
+            directory (Path): 进入的目录
+        Returns:
+            IgnoreMatcher: 包含该目录规则的新匹配器(原匹配器不变)
+        """
+        try:
+            text = (directory / ".gitignore").read_text(
+                encoding="utf-8", errors="replace"
+            )
+        except OSError:
+            return self
+        rules = parse_gitignore(text)
+        if not rules:
+            return self
+        return IgnoreMatcher(self._layers + ((directory, rules),))
+
+    def is_ignored(self, path: Path, is_dir: bool) -> bool:
+        """判断条目是否被忽略，后出现的规则优先(与 git 一致)
+
+        Args:
+            path (Path): 条目的完整路径
+            is_dir (bool): 条目是否为目录
+        Returns:
+            bool: 是否被忽略
+        """
+        if path.name == ".git":
+            return True
+        ignored = False
+        for base, rules in self._layers:
+            try:
+                rel = path.relative_to(base).as_posix()
+            except ValueError:
+                continue
+            for rule in rules:
+                if rule.dir_only and not is_dir:
+                    continue
+                target = rel if rule.anchored else path.name
+                if rule.regex.fullmatch(target):
+                    ignored = not rule.negate
+        return ignored
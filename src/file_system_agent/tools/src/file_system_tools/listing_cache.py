@@ -0,0 +1,301 @@
+"""目录列表缓存
+
+agent 经常在很短的时间内重复列出同一个目录，这里按目录缓存 scandir 的结果。
+缓存失效有两种方式:
+- Linux 上通过 ctypes 调用 inotify，目录内有任何增删改都会使对应缓存失效
+- 其他平台或 inotify 不可用时，退化为比较目录的 mtime
+  (这种方式无法感知已有文件的内容变化，因此列表中的文件大小可能滞后)
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TypedDict
+
+from .file_metadata import FileMetadata
+
+# inotify 相关常量，见 <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class CacheStats(TypedDict):
+    hits: int
+    misses: int
+    invalidations: int
+    cached_dirs: int
+    backend: str
+
+
+class _InotifyWatcher:
+    """基于 ctypes 的最小 inotify 封装，只负责添加/移除监听和读取发生变化的 watch"""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self._fd: int = fd
+        self._finalizer = weakref.finalize(self, os.close, fd)
+
+    def add_watch(self, path: Path) -> int | None:
+        """为目录添加监听，失败(比如超出 max_user_watches)时返回 None"""
+        wd = self._add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        return wd if wd >= 0 else None
+
+    def rm_watch(self, wd: int):
+        self._rm_watch(self._fd, wd)
+
+    def read_changed(self) -> tuple[set[int], bool]:
+        """读取所有待处理事件
+
+        Returns:
+            tuple[set[int], bool]: 发生变化的 watch 描述符集合，以及事件队列是否溢出
+        """
+        changed: set[int] = set()
+        overflow = False
+        while True:
+            try:
+                buf = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _, name_len = _EVENT_HEADER.unpack_from(buf, offset)
+                offset += _EVENT_HEADER.size + name_len
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                else:
+                    changed.add(wd)
+        return changed, overflow
+
+    def close(self):
+        self._finalizer()
+
+
+@dataclass
+class _CachedListing:
+    items: list[FileMetadata]
+    mtime_ns: int
+    wd: int | None  # inotify watch 描述符，为 None 时依赖 mtime 校验
+
+
+class ListingCache:
+    """按目录缓存 FileMetadata 列表，LRU 淘汰"""
+
+    def __init__(
+        self, max_dirs: int = 256, max_entries: int = 20000, use_inotify: bool = True
+    ):
+        """
+        Args:
+            max_dirs (int): 最多缓存的目录数量
+            max_entries (int): 单个目录超过该条目数时不缓存，避免超大目录常驻内存
+            use_inotify (bool): 是否尝试使用 inotify，仅在 Linux 上生效
+        """
+        self._max_dirs = max_dirs
+        self._max_entries = max_entries
+        self._cache: OrderedDict[Path, _CachedListing] = OrderedDict()
+        self._wd_to_path: dict[int, Path] = {}
+        self._lock = threading.RLock()
+        self._watcher: _InotifyWatcher | None = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._watcher = _InotifyWatcher()
+            except (OSError, AttributeError):
+                self._watcher = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._watcher is not None else "mtime"
+
+    def stats(self) -> CacheStats:
+        """返回缓存命中统计"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "cached_dirs": len(self._cache),
+                "backend": self.backend,
+            }
+
+    def iter_listing(
+        self, path: Path, scan: Callable[[Path], Iterator[FileMetadata]]
+    ) -> Iterator[FileMetadata]:
+        """返回目录内容的迭代器，命中缓存时直接使用缓存
+
+        未命中时边扫描边收集，只有迭代器被完整消费时才写入缓存，
+        所以分页只读取一部分时不会缓存残缺的列表。
+
+        Args:
+            path (Path): 目录路径
+            scan (Callable[[Path], Iterator[FileMetadata]]): 未命中时使用的扫描函数
+        Returns:
+            Iterator[FileMetadata]: 目录内容迭代器
+        """
+        with self._lock:
+            cached = self._lookup(path)
+            if cached is not None:
+                self.hits += 1
+                # 返回副本，调用方修改结果不会污染缓存
+                return (item.copy() for item in cached)
+            self.misses += 1
+        return self._scan_and_store(path, scan)
+
+    def invalidate(self, path: Path | None = None):
+        """手动使缓存失效，path 为 None 时清空全部缓存"""
+        with self._lock:
+            if path is None:
+                for p in list(self._cache):
+                    self._drop(p)
+            elif path in self._cache:
+                self._drop(path)
+
+    def close(self):
+        with self._lock:
+            self.invalidate()
+            if self._watcher is not None:
+                self._watcher.close()
+                self._watcher = None
+
+    def _lookup(self, path: Path) -> list[FileMetadata] | None:
+        self._drain_events()
+        entry = self._cache.get(path)
+        if entry is None:
+            return None
+        if entry.wd is None:
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                mtime_ns = -1
+            if mtime_ns != entry.mtime_ns:
+                self._drop(path)
+                return None
+        self._cache.move_to_end(path)
+        return entry.items
+
+    def _scan_and_store(
+        self, path: Path, scan: Callable[[Path], Iterator[FileMetadata]]
+    ) -> Iterator[FileMetadata]:
+        # 先记录 mtime / 添加监听再扫描，扫描期间发生的变化会让这次结果在下次查询时失效
+        wd = self._watch(path)
+        stored = False
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            items: list[FileMetadata] | None = []
+            for item in scan(path):
+                if items is not None:
+                    items.append(item)
+                    if len(items) > self._max_entries:
+                        items = None  # 目录过大，不再收集
+                yield item
+            if items is not None:
+                stored = self._store(path, items, mtime_ns, wd)
+        finally:
+            # 没有写入缓存(目录过大、只读了一部分或扫描出错)时释放监听
+            if not stored:
+                with self._lock:
+                    if wd is not None and self._wd_to_path.get(wd) == path:
+                        self._release_watch(wd)
+
+    def _store(
+        self, path: Path, items: list[FileMetadata], mtime_ns: int, wd: int | None
+    ) -> bool:
+        with self._lock:
+            self._drain_events()
+            if wd is not None and wd not in self._wd_to_path:
+                # 扫描期间目录发生了变化，这次的结果不可信
+                return False
+            if path in self._cache:
+                self._drop(path)
+            self._cache[path] = _CachedListing(items, mtime_ns, wd)
+            if wd is not None:
+                self._wd_to_path[wd] = path
+            while len(self._cache) > self._max_dirs:
+                self._drop(next(iter(self._cache)))
+            return True
+
+    def _watch(self, path: Path) -> int | None:
+        if self._watcher is None:
+            return None
+        with self._lock:
+            wd = self._watcher.add_watch(path)
+            if wd is not None:
+                # 同一个目录重复添加监听会返回同一个 wd，先丢弃旧缓存
+                old = self._wd_to_path.get(wd)
+                if old is not None:
+                    self._drop(old)
+                self._wd_to_path[wd] = path
+            return wd
+
+    def _release_watch(self, wd: int | None):
+        if wd is not None and self._watcher is not None:
+            self._wd_to_path.pop(wd, None)
+            self._watcher.rm_watch(wd)
+
+    def _drop(self, path: Path):
+        entry = self._cache.pop(path, None)
+        if entry is None:
+            return
+        self.invalidations += 1
+        if entry.wd is not None and self._wd_to_path.get(entry.wd) == path:
+            self._release_watch(entry.wd)
+
+    def _drain_events(self):
+        if self._watcher is None:
+            return
+        changed, overflow = self._watcher.read_changed()
+        if overflow:
+            for p in list(self._cache):
+                self._drop(p)
+            return
+        for wd in changed:
+            path = self._wd_to_path.pop(wd, None)
+            if path is None:
+                continue
+            entry = self._cache.pop(path, None)
+            if entry is not None:
+                self.invalidations += 1
+            if self._watcher is not None:
+                self._watcher.rm_watch(wd)
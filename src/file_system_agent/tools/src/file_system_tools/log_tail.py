@@ -0,0 +1,187 @@
+"""日志文件的 tail / follow
+
+- tail: 从文件末尾按块向前读取，凑够最后 N 行(或最后 N 个匹配行)即停止，
+  开销与输出大小成正比，而不是文件大小；带过滤条件时最多向前扫描 max_scan_bytes
+- follow: 返回游标之后新追加的完整行，游标记录 (inode, 字节偏移)，
+  文件被轮转(inode 变化)或截断(大小小于偏移)时从头开始读取
+"""
+
+import os
+import re
+import time
+from pathlib import Path
+from typing import BinaryIO, TypedDict
+
+# 向前读取时每块的大小
+BLOCK_SIZE = 64 * 1024
+# 返回的单行最大长度
+MAX_LINE_CHARS = 1000
+
+
+class TailResult(TypedDict):
+    lines: list[str]
+    cursor: str  # 传给 follow 以获取之后追加的内容
+    file_size: int
+    scanned_bytes: int
+    truncated: bool  # 是否因为扫描/读取上限而没有返回全部结果
+    rotated: bool  # follow 时文件是否被轮转或截断
+
+
+def _compile(pattern: str | None, ignore_case: bool) -> re.Pattern[bytes] | None:
+    if pattern is None:
+        return None
+    try:
+        return re.compile(pattern.encode("utf-8"), re.IGNORECASE if ignore_case else 0)
+    except re.error as e:
+        raise ValueError(f"无效的正则表达式: {e}") from None
+
+
+def _decode_line(line: bytes) -> str:
+    text = line.decode("utf-8", errors="replace").rstrip("\r")
+    if len(text) > MAX_LINE_CHARS:
+        text = text[:MAX_LINE_CHARS] + "..."
+    return text
+
+
+def _read_at(f: BinaryIO, offset: int, size: int) -> bytes:
+    """从 offset 开始读取 size 字节，os.pread 只在 POSIX 上可用，这里用 seek + read"""
+    f.seek(offset)
+    return f.read(size)
+
+
+def _make_cursor(st: os.stat_result, offset: int) -> str:
+    return f"{st.st_ino}:{offset}"
+
+
+def _parse_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        inode, offset = cursor.split(":")
+        return int(inode), int(offset)
+    except ValueError:
+        raise ValueError(f"无效的游标: {cursor}") from None
+
+
+def tail_lines(
+    path: Path,
+    lines: int = 50,
+    pattern: str | None = None,
+    ignore_case: bool = False,
+    max_scan_bytes: int = 64 * 1024 * 1024,
+) -> TailResult:
+    """返回文件最后 lines 行，指定 pattern 时返回最后 lines 个匹配的行
+
+    Args:
+        path (Path): 文件路径
+        lines (int): 返回的行数
+        pattern (str | None): 正则表达式，只返回匹配的行
+        ignore_case (bool): 是否忽略大小写
+        max_scan_bytes (int): 最多从末尾向前扫描的字节数
+    Returns:
+        TailResult: 按文件中的顺序排列的行，以及指向文件末尾的游标
+    Raises:
+        ValueError: 行数或正则表达式无效
+    """
+    if lines < 1:
+        raise ValueError(f"无效的行数: {lines}")
+    regex = _compile(pattern, ignore_case)
+    found: list[bytes] = []
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        size = st.st_size
+        pos = size
+        # 末尾的换行符不算作新的一行
+        if size and _read_at(f, size - 1, 1) == b"\n":
+            pos -= 1
+        carry = b""  # 当前块开头不完整的行，与前一块拼接
+        truncated = False
+        while pos > 0 and len(found) < lines:
+            if size - pos >= max_scan_bytes:
+                truncated = True
+                break
+            begin = max(0, pos - BLOCK_SIZE)
+            block = _read_at(f, begin, pos - begin) + carry
+            pos = begin
+            parts = block.split(b"\n")
+            # 第一段可能是被块边界截断的行，留给下一块
+            carry = parts[0] if pos > 0 else b""
+            complete = parts[1:] if pos > 0 else parts
+            for line in reversed(complete):
+                if regex is None or regex.search(line):
+                    found.append(line)
+                    if len(found) >= lines:
+                        break
+    found.reverse()
+    return {
+        "lines": [_decode_line(line) for line in found],
+        "cursor": _make_cursor(st, size),
+        "file_size": size,
+        "scanned_bytes": size - pos,
+        "truncated": truncated,
+        "rotated": False,
+    }
+
+
+def follow(
+    path: Path,
+    cursor: str,
+    pattern: str | None = None,
+    ignore_case: bool = False,
+    max_lines: int = 200,
+    max_bytes: int = 1024 * 1024,
+    wait_seconds: float = 0.0,
+    poll_interval: float = 0.2,
+) -> TailResult:
+    """返回游标之后追加的完整行
+
+    Args:
+        path (Path): 文件路径
+        cursor (str): tail_lines 或上一次 follow 返回的游标
+        pattern (str | None): 正则表达式，只返回匹配的行
+        ignore_case (bool): 是否忽略大小写
+        max_lines (int): 最多返回的行数，超过时游标停在未返回的行之前
+        max_bytes (int): 最多读取的字节数
+        wait_seconds (float): 没有新内容时最多等待的秒数
+        poll_interval (float): 等待期间检查文件的间隔
+    Returns:
+        TailResult: 新追加的行以及新的游标
+    Raises:
+        ValueError: 游标或正则表达式无效
+    """
+    regex = _compile(pattern, ignore_case)
+    inode, offset = _parse_cursor(cursor)
+    deadline = time.monotonic() + max(0.0, wait_seconds)
+    while True:
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            rotated = st.st_ino != inode or st.st_size < offset
+            start = 0 if rotated else offset
+            if st.st_size > start or time.monotonic() >= deadline:
+                data = _read_at(f, start, min(max_bytes, st.st_size - start))
+                break
+        time.sleep(poll_interval)
+
+    truncated = start + len(data) < st.st_size
+    # 只返回完整的行，最后一行还没写完时留到下一次；
+    # 单行超过 max_bytes 时例外，否则游标永远无法前进
+    parts = data.split(b"\n")
+    rest = parts.pop()
+    separator = 1
+    if not parts and len(rest) >= max_bytes:
+        parts, separator = [rest], 0
+    found: list[bytes] = []
+    consumed = 0
+    for line in parts:
+        if len(found) >= max_lines:
+            truncated = True
+            break
+        consumed += len(line) + separator
+        if regex is None or regex.search(line):
+            found.append(line)
+    return {
+        "lines": [_decode_line(line) for line in found],
+        "cursor": _make_cursor(st, start + consumed),
+        "file_size": st.st_size,
+        "scanned_bytes": consumed,
+        "truncated": truncated,
+        "rotated": rotated,
+    }
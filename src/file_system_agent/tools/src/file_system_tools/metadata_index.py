@@ -0,0 +1,295 @@
+"""根目录文件树的 SQLite 元信息索引
+
+把 --root 下整棵文件树的元信息(名称、父目录、类型、大小、mtime、链接目标)持久化到 SQLite，
+agent 查找文件或统计大文件时只需要一次索引查询，而不是逐层切换目录、列出内容。
+
+增量刷新依据目录的 mtime: 目录内有增删改名时其 mtime 会变化，只重新扫描这些目录；
+mtime 未变的目录直接从索引中取出子目录继续向下检查，每个目录只需一次 stat。
+注意已有文件的内容被修改时所在目录的 mtime 不会变化，所以文件大小可能滞后，
+需要精确大小时请使用 list_directory_contents。
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import TypedDict
+
+from .dir_scanner import entry_to_metadata
+from .file_type import FileType
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,      -- 相对根目录的路径，根目录为空字符串
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    parent_id INTEGER NOT NULL REFERENCES dirs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    file_type TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    target TEXT,
+    UNIQUE (parent_id, name)
+);
+CREATE INDEX IF NOT EXISTS idx_entries_name ON entries(name);
+CREATE INDEX IF NOT EXISTS idx_entries_size ON entries(size);
+"""
+
+
+class IndexedEntry(TypedDict):
+    path: str  # 完整路径
+    file_type: str
+    size: int
+    mtime: float
+    target: str | None
+
+
+class RefreshStats(TypedDict):
+    dirs_checked: int
+    dirs_rescanned: int
+    dirs_removed: int
+    seconds: float
+
+
+def default_index_path(root: Path) -> Path:
+    """索引文件默认放在用户缓存目录下，避免写入根目录本身而改变其 mtime"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    digest = hashlib.sha1(str(root).encode("utf-8")).hexdigest()[:16]
+    return Path(cache_home) / "file-system-agent" / f"index-{digest}.sqlite3"
+
+
+class MetadataIndex:
+    """根目录文件树的 SQLite 元信息索引"""
+
+    def __init__(self, root: Path, db_path: Path | None = None):
+        """
+        Args:
+            root (Path): 要索引的根目录，会被 resolve
+            db_path (Path | None): 索引文件路径，为 None 时使用 default_index_path(root)
+        """
+        self._root = root.resolve()
+        self._db_path = db_path or default_index_path(self._root)
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._last_refresh: float | None = None
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def refresh(self) -> RefreshStats:
+        """增量刷新索引，只重新扫描 mtime 发生变化的目录
+
+        Returns:
+            RefreshStats: 本次刷新检查/重扫/删除的目录数量和耗时
+        """
+        start = time.perf_counter()
+        stats: RefreshStats = {
+            "dirs_checked": 0,
+            "dirs_rescanned": 0,
+            "dirs_removed": 0,
+            "seconds": 0.0,
+        }
+        with self._lock, self._conn:
+            known = {
+                path: (dir_id, mtime_ns)
+                for dir_id, path, mtime_ns in self._conn.execute(
+                    "SELECT id, path, mtime_ns FROM dirs"
+                )
+            }
+            visited: set[str] = set()
+            stack = [""]
+            while stack:
+                rel = stack.pop()
+                stats["dirs_checked"] += 1
+                try:
+                    mtime_ns = os.stat(self._abs(rel)).st_mtime_ns
+                except OSError:
+                    continue
+                visited.add(rel)
+                record = known.get(rel)
+                if record is not None and record[1] == mtime_ns:
+                    stack.extend(self._child_dirs(record[0], rel))
+                    continue
+                stats["dirs_rescanned"] += 1
+                stack.extend(self._rescan(rel, mtime_ns, record))
+            # 本次没有访问到的目录已经被删除或移走，级联删除其子项
+            removed = [(known[path][0],) for path in known.keys() - visited]
+            self._conn.executemany("DELETE FROM dirs WHERE id = ?", removed)
+            stats["dirs_removed"] = len(removed)
+        self._last_refresh = time.monotonic()
+        stats["seconds"] = time.perf_counter() - start
+        return stats
+
+    def refresh_if_stale(self, max_age: float = 30.0) -> RefreshStats | None:
+        """距上次刷新超过 max_age 秒(或从未刷新)时才刷新
+
+        多个会话共享同一个索引时，同时到达的请求只有一个执行刷新，
+        其余的等待它完成后看到索引已经是新的，直接返回
+        """
+        with self._refresh_lock:
+            if (
+                self._last_refresh is not None
+                and time.monotonic() - self._last_refresh < max_age
+            ):
+                return None
+            return self.refresh()
+
+    def search(
+        self,
+        pattern: str,
+        file_type: str | None = None,
+        min_size: int = 0,
+        limit: int = 50,
+    ) -> list[IndexedEntry]:
+        """按文件名查找
+
+        Args:
+            pattern (str): 文件名模式，包含 * ? [ 时按 glob 匹配，否则按子串匹配(不区分大小写)
+            file_type (str | None): 只返回指定类型(file/directory/link)
+            min_size (int): 最小大小(字节)
+            limit (int): 最多返回的条目数
+        Returns:
+            list[IndexedEntry]: 匹配的条目
+        """
+        if any(ch in pattern for ch in "*?["):
+            condition, arg = "e.name GLOB ?", pattern
+        else:
+            escaped = (
+                pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            )
+            condition, arg = "e.name LIKE ? ESCAPE '\\'", f"%{escaped}%"
+        sql = f"{_SELECT} WHERE {condition} AND e.size >= ?"
+        args: list = [arg, min_size]
+        if file_type is not None:
+            sql += " AND e.file_type = ?"
+            args.append(file_type)
+        sql += " ORDER BY d.path, e.name LIMIT ?"
+        args.append(limit)
+        return self._query(sql, args)
+
+    def largest(
+        self, limit: int = 20, file_type: str = FileType.FILE.value, under: str = ""
+    ) -> list[IndexedEntry]:
+        """返回最大的若干条目
+
+        Args:
+            limit (int): 返回条目数
+            file_type (str): 条目类型，默认只统计普通文件
+            under (str): 只统计该相对路径下的条目，空字符串表示整个根目录
+        Returns:
+            list[IndexedEntry]: 按大小从大到小排列的条目
+        """
+        sql = f"{_SELECT} WHERE e.file_type = ?"
+        args: list = [file_type]
+        if under:
+            under = under.strip("/")
+            sql += " AND (d.path = ? OR d.path GLOB ?)"
+            args += [under, _glob_escape(under) + "/*"]
+        sql += " ORDER BY e.size DESC LIMIT ?"
+        args.append(limit)
+        return self._query(sql, args)
+
+    def count(self) -> int:
+        """索引中的条目总数"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def _abs(self, rel: str) -> Path:
+        return self._root / rel if rel else self._root
+
+    def _child_dirs(self, dir_id: int, rel: str) -> list[str]:
+        rows = self._conn.execute(
+            "SELECT name FROM entries WHERE parent_id = ? AND file_type = ?",
+            (dir_id, FileType.DIRECTORY.value),
+        )
+        return [_join(rel, name) for (name,) in rows]
+
+    def _rescan(
+        self, rel: str, mtime_ns: int, record: tuple[int, int] | None
+    ) -> list[str]:
+        """重新扫描一个目录，替换其直接子项，返回需要继续检查的子目录"""
+        rows = []
+        subdirs = []
+        try:
+            with os.scandir(self._abs(rel)) as it:
+                for entry in it:
+                    try:
+                        meta = entry_to_metadata(entry)
+                        # entry_to_metadata 已经 lstat 过，DirEntry 会缓存结果
+                        entry_mtime = entry.stat(follow_symlinks=False).st_mtime_ns
+                    except FileNotFoundError:
+                        continue
+                    rows.append(
+                        (
+                            meta["file_name"],
+                            meta["file_type"],
+                            meta["size"],
+                            entry_mtime,
+                            meta["target"],
+                        )
+                    )
+                    if meta["file_type"] == FileType.DIRECTORY.value:
+                        subdirs.append(_join(rel, meta["file_name"]))
+        except (PermissionError, FileNotFoundError, NotADirectoryError):
+            return []
+        if record is None:
+            dir_id = self._conn.execute(
+                "INSERT INTO dirs (path, mtime_ns) VALUES (?, ?)", (rel, mtime_ns)
+            ).lastrowid
+        else:
+            dir_id = record[0]
+            self._conn.execute(
+                "UPDATE dirs SET mtime_ns = ? WHERE id = ?", (mtime_ns, dir_id)
+            )
+            self._conn.execute("DELETE FROM entries WHERE parent_id = ?", (dir_id,))
+        self._conn.executemany(
+            "INSERT INTO entries (parent_id, name, file_type, size, mtime_ns, target)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            [(dir_id, *row) for row in rows],
+        )
+        return subdirs
+
+    def _query(self, sql: str, args: list) -> list[IndexedEntry]:
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [
+            {
+                "path": str(self._abs(_join(dir_path, name))),
+                "file_type": file_type,
+                "size": size,
+                "mtime": mtime_ns / 1e9,
+                "target": target,
+            }
+            for dir_path, name, file_type, size, mtime_ns, target in rows
+        ]
+
+
+_SELECT = (
+    "SELECT d.path, e.name, e.file_type, e.size, e.mtime_ns, e.target"
+    " FROM entries e JOIN dirs d ON d.id = e.parent_id"
+)
+
+
+def _join(parent: str, name: str) -> str:
+    return f"{parent}/{name}" if parent else name
+
+
+def _glob_escape(text: str) -> str:
+    # sqlite GLOB 使用 [x] 转义特殊字符
+    return "".join(f"[{ch}]" if ch in "*?[" else ch for ch in text)
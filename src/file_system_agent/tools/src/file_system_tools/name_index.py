@@ -0,0 +1,285 @@
+"""基于三元组(trigram)的文件名内存索引
+
+为根目录下所有条目的文件名建立 trigram 倒排表，支持子串、glob、正则三种查找方式:
+- 从查询中提取长度不小于 3 的字面量片段，取其中倒排表最短的 trigram 作为候选集，
+  再逐个校验，候选集通常远小于条目总数
+- 查询中没有可用的字面量时(比如 "*.c" 或很短的子串)，退化为线性扫描所有文件名
+
+索引在第一次查询时建立，之后按目录 mtime 增量更新: 只重新扫描发生变化的目录。
+被删除条目的编号不会复用，倒排表中残留的编号在校验时跳过，残留过多时整体重建。
+"""
+
+import os
+import re
+import threading
+import time
+from array import array
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from pathlib import Path, PurePosixPath
+from typing import Literal
+
+SearchMode = Literal["substring", "glob", "regex"]
+
+_ROOT_ID = -1
+_GLOB_SPECIAL = re.compile(r"\*|\?|\[[^\]]*\]")
+
+
+@dataclass
+class _DirInfo:
+    mtime_ns: int
+    children: dict[str, int] = field(default_factory=dict)  # 名称 -> 条目编号
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class NameIndex:
+    """根目录下所有条目文件名的 trigram 索引"""
+
+    def __init__(self, root: Path):
+        """
+        Args:
+            root (Path): 要索引的根目录，会被 resolve
+        """
+        self._root = root.resolve()
+        self._lock = threading.Lock()
+        self._clear()
+        self._last_refresh: float | None = None
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def __len__(self) -> int:
+        return self._live
+
+    def refresh(self) -> int:
+        """增量更新索引，第一次调用时完整建立索引
+
+        Returns:
+            int: 本次重新扫描的目录数量
+        """
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> int:
+        if self._dead > 10000 and self._dead > self._live:
+            self._clear()  # 残留编号过多，重建以回收倒排表空间
+        rescanned = 0
+        stack: list[tuple[int, Path]] = [(_ROOT_ID, self._root)]
+        while stack:
+            dir_id, path = stack.pop()
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            info = self._dirs.get(dir_id)
+            if info is None or info.mtime_ns != mtime_ns:
+                info = self._rescan(dir_id, path, mtime_ns, info)
+                rescanned += 1
+            stack.extend(
+                (child, path / name)
+                for name, child in info.children.items()
+                if self._is_dir[child]
+            )
+        self._last_refresh = time.monotonic()
+        return rescanned
+
+    def refresh_if_stale(self, max_age: float = 10.0) -> int:
+        """距上次更新超过 max_age 秒(或从未建立)时才更新"""
+        if (
+            self._last_refresh is not None
+            and time.monotonic() - self._last_refresh < max_age
+        ):
+            return 0
+        return self.refresh()
+
+    def search(
+        self,
+        pattern: str,
+        mode: SearchMode = "substring",
+        limit: int = 50,
+        ignore_case: bool = True,
+        under: str = "",
+    ) -> list[str]:
+        """查找文件名
+
+        Args:
+            pattern (str): 查询内容
+            mode (SearchMode): substring 子串匹配文件名; glob 匹配文件名,
+                包含 / 时匹配相对根目录的路径(* 不跨越 /); regex 正则搜索文件名
+            limit (int): 最多返回的条目数
+            ignore_case (bool): 是否忽略大小写
+            under (str): 只返回该相对路径下的条目，空字符串表示整个根目录
+        Returns:
+            list[str]: 匹配条目相对根目录的路径
+        Raises:
+            ValueError: 不支持的查找方式或正则表达式无效
+        """
+
+        def name(i: int) -> str:
+            # 只在持有 self._lock 时调用: refresh 可能整体替换名称列表
+            return (self._lower if ignore_case else self._names)[i]  # type: ignore
+
+        if mode == "substring":
+            needle = pattern.lower() if ignore_case else pattern
+            literals = [pattern]
+
+            def matches(i: int) -> bool:
+                return needle in name(i)
+
+        elif mode == "glob":
+            glob = pattern.lower() if ignore_case else pattern
+            last = pattern.rsplit("/", 1)[-1]
+            literals = _GLOB_SPECIAL.split(last)
+            last_glob = glob.rsplit("/", 1)[-1]
+            if "/" in pattern:
+
+                def matches(i: int) -> bool:
+                    # 先用最后一段匹配文件名，通过后再拼出完整路径匹配
+                    if last_glob != "**" and not fnmatchcase(name(i), last_glob):
+                        return False
+                    path = self._path(i)
+                    path = path.lower() if ignore_case else path
+                    return PurePosixPath(path).full_match(glob)
+
+            else:
+
+                def matches(i: int) -> bool:
+                    return fnmatchcase(name(i), glob)
+
+        elif mode == "regex":
+            try:
+                regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+            except re.error as e:
+                raise ValueError(f"无效的正则表达式: {e}") from None
+            literals = _regex_literals(pattern)
+
+            def matches(i: int) -> bool:
+                return regex.search(self._names[i]) is not None  # type: ignore
+
+        else:
+            raise ValueError(f"不支持的查找方式: {mode}")
+
+        prefix = under.strip("/")
+        results = []
+        with self._lock:
+            for i in self._candidates(literals):
+                if self._names[i] is None or not matches(i):
+                    continue
+                path = self._path(i)
+                if prefix and not path.startswith(prefix + "/"):
+                    continue
+                results.append(path)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def _clear(self):
+        self._names: list[str | None] = []
+        self._lower: list[str | None] = []
+        self._parents = array("i")
+        self._is_dir = bytearray()
+        self._postings: dict[str, array] = {}
+        self._dirs: dict[int, _DirInfo] = {}
+        self._live = 0
+        self._dead = 0
+
+    def _candidates(self, literals: Iterable[str]) -> Iterator[int]:
+        """用字面量中倒排表最短的 trigram 缩小候选范围，没有可用 trigram 时遍历全部"""
+        best: array | None = None
+        for literal in literals:
+            for gram in _trigrams(literal.lower()):
+                posting = self._postings.get(gram)
+                if posting is None:
+                    return iter(())  # 某个 trigram 不存在，不可能有匹配
+                if best is None or len(posting) < len(best):
+                    best = posting
+        if best is None:
+            return iter(range(len(self._names)))
+        return iter(best)
+
+    def _path(self, i: int) -> str:
+        parts = []
+        while i != _ROOT_ID:
+            parts.append(self._names[i])
+            i = self._parents[i]
+        return "/".join(reversed(parts))  # type: ignore
+
+    def _add(self, name: str, parent: int, is_dir: bool) -> int:
+        i = len(self._names)
+        lower = name.lower()
+        self._names.append(name)
+        self._lower.append(lower)
+        self._parents.append(parent)
+        self._is_dir.append(is_dir)
+        for gram in _trigrams(lower):
+            posting = self._postings.get(gram)
+            if posting is None:
+                posting = self._postings[gram] = array("I")
+            posting.append(i)
+        self._live += 1
+        return i
+
+    def _remove(self, i: int):
+        info = self._dirs.pop(i, None)
+        if info is not None:
+            for child in info.children.values():
+                self._remove(child)
+        self._names[i] = None
+        self._lower[i] = None
+        self._live -= 1
+        self._dead += 1
+
+    def _rescan(
+        self, dir_id: int, path: Path, mtime_ns: int, old: _DirInfo | None
+    ) -> _DirInfo:
+        info = _DirInfo(mtime_ns)
+        old_children = old.children if old is not None else {}
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    child = old_children.pop(entry.name, None)
+                    if child is not None and bool(self._is_dir[child]) != is_dir:
+                        self._remove(child)  # 同名条目类型发生了变化
+                        child = None
+                    if child is None:
+                        child = self._add(entry.name, dir_id, is_dir)
+                    info.children[entry.name] = child
+        except OSError:
+            pass
+        for child in old_children.values():
+            self._remove(child)
+        self._dirs[dir_id] = info
+        return info
+
+
+def _regex_literals(pattern: str) -> list[str]:
+    """提取正则中一定会出现的字面量片段(顶层连续的普通字符)，无法解析时返回空列表"""
+    try:
+        from re import _parser  # type: ignore
+    except ImportError:
+        return []
+    try:
+        parsed = _parser.parse(pattern)
+    except Exception:
+        return []
+    literals = []
+    run = []
+    for op, arg in parsed:
+        if op is _parser.LITERAL:
+            run.append(chr(arg))
+            continue
+        if run:
+            literals.append("".join(run))
+            run = []
+    if run:
+        literals.append("".join(run))
+    return literals
@@ -0,0 +1,260 @@
+"""在子进程中运行 Python 脚本
+
+- 墙钟超时: 超时后杀掉整个进程组(脚本启动的子进程也会被结束)
+- 资源限制: 由一个小的启动器调用 setrlimit 后再 exec 脚本，限制虚拟内存和 CPU 时间(仅 POSIX)
+- 输出: stdout 和 stderr 合并后写入固定大小的环形缓冲区，只保留最后的部分，
+  不会因为脚本输出过多而占满内存或模型上下文
+- 同时提供同步和 asyncio 两个版本，异步版本不会阻塞事件循环
+"""
+
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import TypedDict
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore
+
+# 每次从管道读取的大小
+READ_CHUNK = 64 * 1024
+
+
+class RunResult(TypedDict):
+    exit_code: int | None  # 被信号结束时为负的信号编号，超时被杀时为 None
+    timed_out: bool
+    duration: float  # 秒
+    output: str  # 合并后的 stdout/stderr 的最后部分
+    dropped_bytes: int  # 因为超出缓冲区而丢弃的输出字节数
+
+
+class RingBuffer:
+    """只保留最后 capacity 字节的缓冲区"""
+
+    def __init__(self, capacity: int):
+        self._capacity = capacity
+        self._buf = bytearray()
+        self.dropped = 0
+
+    def write(self, data: bytes):
+        self._buf += data
+        excess = len(self._buf) - self._capacity
+        if excess > 0:
+            del self._buf[:excess]
+            self.dropped += excess
+
+    def getvalue(self) -> bytes:
+        return bytes(self._buf)
+
+
+# 在 exec 脚本之前设置资源限制的启动器: python -S -c _LIMIT_LAUNCHER 内存 CPU 命令...
+# 不使用 preexec_fn: 它在 fork 之后、exec 之前运行 Python 代码，父进程有其他线程时
+# 子进程可能因为继承了被锁住的锁而死锁
+_LIMIT_LAUNCHER = """\
+import os, resource, sys
+memory, cpu = sys.argv[1:3]
+if memory:
+    limit = int(memory) * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+if cpu:
+    resource.setrlimit(resource.RLIMIT_CPU, (int(cpu), int(cpu)))
+os.execv(sys.argv[3], sys.argv[3:])
+"""
+
+
+def limit_resources(
+    command: list[str], max_memory_mb: int | None, max_cpu_seconds: int | None
+) -> list[str]:
+    """返回先设置资源限制、再 exec 原命令的命令行
+
+    Args:
+        command (list[str]): 原命令，第一项为 Python 解释器的路径，同时用来运行启动器
+        max_memory_mb (int | None): 虚拟内存上限(MB)
+        max_cpu_seconds (int | None): CPU 时间上限(秒)
+    Returns:
+        list[str]: 新的命令行，不支持 resource 或没有限制时原样返回
+    """
+    if resource is None or (max_memory_mb is None and max_cpu_seconds is None):
+        return command
+    return [
+        command[0],
+        "-S",
+        "-c",
+        _LIMIT_LAUNCHER,
+        "" if max_memory_mb is None else str(max_memory_mb),
+        "" if max_cpu_seconds is None else str(max_cpu_seconds),
+        *command,
+    ]
+
+
+def _command(
+    script: Path,
+    args: list[str] | None,
+    python: str | None,
+    max_memory_mb: int | None,
+    max_cpu_seconds: int | None,
+) -> list[str]:
+    command = [python or sys.executable, str(script), *(args or [])]
+    return limit_resources(command, max_memory_mb, max_cpu_seconds)
+
+
+def _check_timeout(timeout: float):
+    if not timeout > 0:
+        raise ValueError(f"超时时间必须大于0: {timeout}")
+
+
+def _env() -> dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONUNBUFFERED"] = "1"  # 超时被杀时也能拿到已经输出的内容
+    env["PYTHONIOENCODING"] = "utf-8"
+    return env
+
+
+def _kill_group(proc: subprocess.Popen | asyncio.subprocess.Process):
+    """杀掉脚本所在的进程组，不支持进程组的平台上只杀掉脚本进程"""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+        return
+    except (ProcessLookupError, PermissionError):
+        return
+    except AttributeError:
+        pass
+    try:
+        proc.kill()
+    except ProcessLookupError:
+        pass
+
+
+def _result(
+    exit_code: int | None, timed_out: bool, started: float, buffer: RingBuffer
+) -> RunResult:
+    return {
+        "exit_code": exit_code,
+        "timed_out": timed_out,
+        "duration": time.monotonic() - started,
+        "output": buffer.getvalue().decode("utf-8", errors="replace"),
+        "dropped_bytes": buffer.dropped,
+    }
+
+
+def run_script(
+    script: Path,
+    args: list[str] | None = None,
+    timeout: float = 60,
+    max_memory_mb: int | None = 2048,
+    max_cpu_seconds: int | None = None,
+    max_output_bytes: int = 64 * 1024,
+    cwd: Path | None = None,
+    python: str | None = None,
+) -> RunResult:
+    """运行 Python 脚本并等待结束
+
+    Args:
+        script (Path): 脚本路径
+        args (list[str] | None): 命令行参数
+        timeout (float): 墙钟超时秒数
+        max_memory_mb (int | None): 虚拟内存上限(MB)，None 表示不限制
+        max_cpu_seconds (int | None): CPU 时间上限(秒)，默认与 timeout 相同
+        max_output_bytes (int): 保留的输出字节数
+        cwd (Path | None): 工作目录，默认为脚本所在目录
+        python (str | None): Python 解释器，默认为当前解释器
+    Returns:
+        RunResult: 退出码、是否超时、耗时和输出的最后部分
+    Raises:
+        ValueError: timeout 不大于0
+    """
+    _check_timeout(timeout)
+    if max_cpu_seconds is None:
+        max_cpu_seconds = max(1, int(timeout + 0.999))
+    buffer = RingBuffer(max_output_bytes)
+    started = time.monotonic()
+    proc = subprocess.Popen(
+        _command(script, args, python, max_memory_mb, max_cpu_seconds),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        cwd=cwd or script.parent,
+        env=_env(),
+        start_new_session=True,
+    )
+
+    def drain():
+        assert proc.stdout is not None
+        while chunk := proc.stdout.read1(READ_CHUNK):
+            buffer.write(chunk)
+
+    reader = threading.Thread(target=drain, daemon=True)
+    reader.start()
+    timed_out = False
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        _kill_group(proc)
+        proc.wait()
+    # 脚本启动的后台进程可能仍持有管道，等待一小段时间后结束它们
+    reader.join(timeout=1)
+    if reader.is_alive():
+        _kill_group(proc)
+        reader.join(timeout=1)
+    return _result(None if timed_out else proc.returncode, timed_out, started, buffer)
+
+
+async def run_script_async(
+    script: Path,
+    args: list[str] | None = None,
+    timeout: float = 60,
+    max_memory_mb: int | None = 2048,
+    max_cpu_seconds: int | None = None,
+    max_output_bytes: int = 64 * 1024,
+    cwd: Path | None = None,
+    python: str | None = None,
+) -> RunResult:
+    """run_script 的 asyncio 版本，等待期间不阻塞事件循环，参数与 run_script 相同"""
+    _check_timeout(timeout)
+    if max_cpu_seconds is None:
+        max_cpu_seconds = max(1, int(timeout + 0.999))
+    buffer = RingBuffer(max_output_bytes)
+    started = time.monotonic()
+    proc = await asyncio.create_subprocess_exec(
+        *_command(script, args, python, max_memory_mb, max_cpu_seconds),
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        cwd=cwd or script.parent,
+        env=_env(),
+        start_new_session=True,
+    )
+
+    async def drain():
+        assert proc.stdout is not None
+        while chunk := await proc.stdout.read(READ_CHUNK):
+            buffer.write(chunk)
+
+    reader = asyncio.ensure_future(drain())
+    timed_out = False
+    try:
+        await asyncio.wait_for(proc.wait(), timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+        _kill_group(proc)
+        await proc.wait()
+    except asyncio.CancelledError:
+        _kill_group(proc)
+        reader.cancel()
+        raise
+    try:
+        await asyncio.wait_for(asyncio.shield(reader), 1)
+    except asyncio.TimeoutError:
+        _kill_group(proc)
+        try:
+            await asyncio.wait_for(reader, 1)
+        except asyncio.TimeoutError:
+            pass
+    return _result(None if timed_out else proc.returncode, timed_out, started, buffer)
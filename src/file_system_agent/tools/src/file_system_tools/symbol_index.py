@@ -0,0 +1,378 @@
+"""根目录下 Python 源码的符号索引
+
+用 ast 解析 .py 文件，记录类、函数、方法和导入及其行号，持久化到 SQLite。
+回答"某个类在哪里定义""这个文件里有哪些函数"时只需要一次索引查询，不需要读取文件内容。
+
+- 遍历文件时遵循 .gitignore(与内容搜索相同)，虚拟环境、构建目录等通常会被跳过
+- 按文件的 (mtime, size) 判断是否需要重新解析，只解析新增和修改过的文件
+- 需要解析的文件较多时在进程池中并行解析(ast 解析是纯 CPU 计算，线程无法并行)
+"""
+
+import ast
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Literal, TypedDict
+
+from .content_search import iter_search_files
+
+SymbolKind = Literal["class", "function", "method", "import"]
+
+# 超过该大小的 .py 文件通常是生成的代码，不解析
+MAX_SOURCE_SIZE = 5 * 1024 * 1024
+# 需要解析的文件数不少于该值时才使用进程池，文件少时进程启动开销更大
+PARALLEL_THRESHOLD = 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,      -- 相对根目录的路径
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    error TEXT                      -- 语法错误等无法解析的原因
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    qualname TEXT NOT NULL,         -- 如 Outer.method，导入时为被导入的完整名称
+    line INTEGER NOT NULL,
+    end_line INTEGER NOT NULL,
+    signature TEXT                  -- 函数参数列表或类的基类
+);
+CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols(name);
+CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols(file_id);
+"""
+
+
+class Symbol(TypedDict):
+    path: str  # 完整路径
+    kind: SymbolKind
+    name: str
+    qualname: str
+    line: int
+    end_line: int
+    signature: str | None
+
+
+class SymbolRefreshStats(TypedDict):
+    files: int
+    parsed: int
+    removed: int
+    errors: int
+    parallel: bool
+    seconds: float
+
+
+# (kind, name, qualname, line, end_line, signature)
+_Row = tuple[str, str, str, int, int, str | None]
+
+
+def default_symbol_index_path(root: Path) -> Path:
+    """索引文件默认放在用户缓存目录下，避免写入根目录本身"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    digest = hashlib.sha1(str(root).encode("utf-8")).hexdigest()[:16]
+    return Path(cache_home) / "file-system-agent" / f"symbols-{digest}.sqlite3"
+
+
+def _signature(node: ast.AST) -> str | None:
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        signature = f"({ast.unparse(node.args)})"
+        if node.returns is not None:
+            signature += f" -> {ast.unparse(node.returns)}"
+        return ("async " if isinstance(node, ast.AsyncFunctionDef) else "") + signature
+    if isinstance(node, ast.ClassDef) and node.bases:
+        return f"({', '.join(ast.unparse(base) for base in node.bases)})"
+    return None
+
+
+def extract_symbols(source: str | bytes) -> list[_Row]:
+    """解析源码，返回其中的类、函数、方法和导入
+
+    只记录模块级和类中的定义，函数内部定义的嵌套函数和类不记录
+
+    Raises:
+        SyntaxError: 源码无法解析
+    """
+    tree = ast.parse(source)
+    rows: list[_Row] = []
+
+    def visit(body: list[ast.stmt], prefix: str, in_class: bool):
+        for node in body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                module = node.module if isinstance(node, ast.ImportFrom) else None
+                dots = "." * node.level if isinstance(node, ast.ImportFrom) else ""
+                for alias in node.names:
+                    full = (
+                        f"{dots}{module}.{alias.name}" if module else dots + alias.name
+                    )
+                    name = alias.asname or alias.name.split(".")[0]
+                    rows.append(("import", name, full, node.lineno, node.lineno, None))
+            elif isinstance(
+                node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+            ):
+                if isinstance(node, ast.ClassDef):
+                    kind = "class"
+                else:
+                    kind = "method" if in_class else "function"
+                qualname = f"{prefix}{node.name}"
+                end_line = node.end_lineno or node.lineno
+                rows.append(
+                    (kind, node.name, qualname, node.lineno, end_line, _signature(node))
+                )
+                if isinstance(node, ast.ClassDef):
+                    visit(node.body, f"{qualname}.", True)
+            elif isinstance(node, (ast.If, ast.Try, ast.TryStar)):
+                # 条件导入和 try/except ImportError 中的定义
+                for block in (
+                    node.body,
+                    node.orelse,
+                    getattr(node, "finalbody", []),
+                    *(h.body for h in getattr(node, "handlers", [])),
+                ):
+                    visit(block, prefix, in_class)
+
+    visit(tree.body, "", False)
+    return rows
+
+
+def _parse_file(path: str) -> tuple[list[_Row], str | None]:
+    """在工作进程中解析一个文件，返回 (符号, 错误信息)"""
+    try:
+        with open(path, "rb") as f:
+            return extract_symbols(f.read()), None
+    except (SyntaxError, ValueError) as e:
+        return [], f"{type(e).__name__}: {e}"
+    except OSError as e:
+        return [], str(e)
+
+
+def _pool_context():
+    # 有其他线程运行时 fork 不安全，优先使用 forkserver
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+
+
+class SymbolIndex:
+    """根目录下 .py 文件的符号索引"""
+
+    def __init__(
+        self, root: Path, db_path: Path | None = None, max_workers: int | None = None
+    ):
+        """
+        Args:
+            root (Path): 要索引的根目录，会被 resolve
+            db_path (Path | None): 索引文件路径，为 None 时使用 default_symbol_index_path(root)
+            max_workers (int | None): 解析文件的进程数
+        """
+        self._root = root.resolve()
+        self._db_path = db_path or default_symbol_index_path(self._root)
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._last_refresh: float | None = None
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def refresh(self) -> SymbolRefreshStats:
+        """增量刷新: 解析新增和修改过的文件，删除已经不存在的文件
+
+        Returns:
+            SymbolRefreshStats: 文件数、重新解析和删除的文件数以及耗时
+        """
+        start = time.perf_counter()
+        current: dict[str, tuple[int, int]] = {}
+        for path in iter_search_files(
+            self._root, file_glob="*.py", max_file_size=MAX_SOURCE_SIZE
+        ):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            current[path.relative_to(self._root).as_posix()] = (
+                st.st_mtime_ns,
+                st.st_size,
+            )
+        with self._lock:
+            known = {
+                path: (file_id, mtime_ns, size)
+                for file_id, path, mtime_ns, size in self._conn.execute(
+                    "SELECT id, path, mtime_ns, size FROM files"
+                )
+            }
+        changed = [
+            rel
+            for rel, stamp in current.items()
+            if rel not in known or known[rel][1:] != stamp
+        ]
+        removed = [known[rel][0] for rel in known.keys() - current.keys()]
+
+        # 解析在锁外进行，查询不会被长时间阻塞
+        paths = [str(self._root / rel) for rel in changed]
+        parallel = len(paths) >= PARALLEL_THRESHOLD
+        if parallel:
+            with ProcessPoolExecutor(self._max_workers, _pool_context()) as pool:
+                results = list(pool.map(_parse_file, paths, chunksize=16))
+        else:
+            results = [_parse_file(path) for path in paths]
+
+        errors = 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM files WHERE id = ?", [(i,) for i in removed]
+            )
+            for rel, (rows, error) in zip(changed, results):
+                errors += error is not None
+                self._store(rel, current[rel], rows, error)
+        self._last_refresh = time.monotonic()
+        return {
+            "files": len(current),
+            "parsed": len(changed),
+            "removed": len(removed),
+            "errors": errors,
+            "parallel": parallel,
+            "seconds": time.perf_counter() - start,
+        }
+
+    def refresh_if_stale(self, max_age: float = 30.0) -> SymbolRefreshStats | None:
+        """距上次刷新超过 max_age 秒(或从未刷新)时才刷新
+
+        多个会话共享同一个索引时，同时到达的请求只有一个执行刷新，
+        其余的等待它完成后看到索引已经是新的，直接返回
+        """
+        with self._refresh_lock:
+            if (
+                self._last_refresh is not None
+                and time.monotonic() - self._last_refresh < max_age
+            ):
+                return None
+            return self.refresh()
+
+    def _store(
+        self, rel: str, stamp: tuple[int, int], rows: list[_Row], error: str | None
+    ):
+        self._conn.execute("DELETE FROM files WHERE path = ?", (rel,))
+        file_id = self._conn.execute(
+            "INSERT INTO files (path, mtime_ns, size, error) VALUES (?, ?, ?, ?)",
+            (rel, *stamp, error),
+        ).lastrowid
+        self._conn.executemany(
+            "INSERT INTO symbols (file_id, kind, name, qualname, line, end_line, signature)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(file_id, *row) for row in rows],
+        )
+
+    def find(
+        self,
+        name: str,
+        kind: SymbolKind | None = None,
+        limit: int = 50,
+        include_imports: bool = False,
+    ) -> list[Symbol]:
+        """按名称查找符号
+
+        Args:
+            name (str): 名称；包含 "." 时按限定名匹配(如 "MyClass.run")；
+                包含 * ? [ 时按 glob 匹配，否则精确匹配
+            kind (SymbolKind | None): 只查找指定类型
+            limit (int): 最多返回的数量
+            include_imports (bool): kind 为 None 时是否包括导入
+        Returns:
+            list[Symbol]: 匹配的符号，定义在前，按路径和行号排序
+        """
+        column = "s.qualname" if "." in name else "s.name"
+        operator = "GLOB" if any(ch in name for ch in "*?[") else "="
+        sql = f"{_SELECT} WHERE {column} {operator} ?"
+        args: list = [name]
+        if kind is not None:
+            sql += " AND s.kind = ?"
+            args.append(kind)
+        elif not include_imports:
+            sql += " AND s.kind != 'import'"
+        sql += " ORDER BY s.kind = 'import', f.path, s.line LIMIT ?"
+        args.append(limit)
+        return self._query(sql, args)
+
+    def outline(self, path: Path) -> list[Symbol]:
+        """返回一个文件中的符号，按行号排序
+
+        文件在根目录下且索引中的记录已经过期时先重新解析该文件；
+        不在索引中的文件(如被 .gitignore 忽略的)直接解析，不写入索引
+
+        Raises:
+            SyntaxError: 文件无法解析
+        """
+        path = path.resolve()
+        st = path.stat()
+        try:
+            rel = path.relative_to(self._root).as_posix()
+        except ValueError:
+            rel = None
+        if rel is not None:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT mtime_ns, size, error FROM files WHERE path = ?", (rel,)
+                ).fetchone()
+            if row is not None:
+                if tuple(row[:2]) != (st.st_mtime_ns, st.st_size):
+                    rows, error = _parse_file(str(path))
+                    with self._lock, self._conn:
+                        self._store(rel, (st.st_mtime_ns, st.st_size), rows, error)
+                    row = (st.st_mtime_ns, st.st_size, error)
+                if row[2] is not None:
+                    raise SyntaxError(row[2])
+                return self._query(
+                    f"{_SELECT} WHERE f.path = ? ORDER BY s.line, s.rowid", [rel]
+                )
+        rows = extract_symbols(path.read_bytes())
+        return [_to_symbol(str(path), row) for row in rows]
+
+    def count(self) -> tuple[int, int]:
+        """索引中的 (文件数, 符号数)"""
+        with self._lock:
+            files = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            symbols = self._conn.execute("SELECT COUNT(*) FROM symbols").fetchone()[0]
+        return files, symbols
+
+    def _query(self, sql: str, args: list) -> list[Symbol]:
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [_to_symbol(str(self._root / row[0]), row[1:]) for row in rows]
+
+
+_SELECT = (
+    "SELECT f.path, s.kind, s.name, s.qualname, s.line, s.end_line, s.signature"
+    " FROM symbols s JOIN files f ON f.id = s.file_id"
+)
+
+
+def _to_symbol(path: str, row) -> Symbol:
+    kind, name, qualname, line, end_line, signature = row
+    return {
+        "path": path,
+        "kind": kind,
+        "name": name,
+        "qualname": qualname,
+        "line": line,
+        "end_line": end_line,
+        "signature": signature,
+    }
@@ -0,0 +1,427 @@
+"""流式统计 CSV/JSONL 表格数据
+
+按块读取，每块最多 CHUNK_CELLS 个单元格(行数×列数，超过 MAX_COLUMNS 的列在组块前丢弃)，
+每块按列转置后批量聚合，内存占用与文件大小和行宽无关:
+- 数值列: 有 numpy 时把整块转换为 float64 数组，用向量化运算求 min/max/sum；
+  没有 numpy 时退回逐个转换的纯 Python 实现，结果相同
+- 常见值: 每列一个计数器，不同值超过 MAX_DISTINCT 时只保留出现次数最多的一半，
+  此后的常见值和不同值数量都是近似结果
+- 示例值、列数都有上限，超长的值会被截断
+"""
+
+import csv
+import io
+import itertools
+import json
+import math
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterator, Literal, TypedDict
+
+from .file_sniffer import sniff_file
+
+try:
+    import numpy as np
+except ImportError:  # numpy 是可选依赖
+    np = None  # type: ignore
+
+TableFormat = Literal["csv", "jsonl"]
+ColumnType = Literal["integer", "float", "string", "mixed", "empty"]
+
+# 每块最多的单元格数(行数×统计的列数)，宽表的每块行数相应减少
+CHUNK_CELLS = 500_000
+# 每列计数器保留的不同值数量上限
+MAX_DISTINCT = 10_000
+# 最多统计的列数
+MAX_COLUMNS = 500
+# 每列保留的示例值数量
+SAMPLE_COUNT = 3
+# 示例值和常见值的最大长度
+MAX_VALUE_CHARS = 80
+# CSV 中视为空值的内容
+NULL_TOKENS = frozenset(["", "NA", "N/A", "NaN", "nan", "null", "NULL", "None"])
+
+_JSONL_SUFFIXES = {".jsonl", ".ndjson"}
+
+
+class ColumnProfile(TypedDict):
+    name: str
+    type: ColumnType
+    count: int  # 非空值的数量
+    nulls: int
+    numeric: int  # 可以解析为数值的值的数量
+    min: float | None  # 数值部分的统计，没有数值时为 None
+    max: float | None
+    mean: float | None
+    max_length: int  # 非数值部分的最大长度
+    distinct: int  # 不同值的数量，distinct_exact 为 False 时是下限
+    distinct_exact: bool
+    samples: list[str]
+    top: list[tuple[str, int]]  # 出现最多的值及次数，distinct_exact 为 False 时是近似值
+
+
+class TableProfile(TypedDict):
+    format: TableFormat
+    encoding: str
+    rows: int
+    columns: list[ColumnProfile]
+    columns_skipped: int  # 超过 MAX_COLUMNS 而未统计的列数
+    bad_rows: int  # 无法解析的行(JSONL 中不是 JSON 对象的行)
+    bytes_read: int
+    truncated: bool  # 是否因为达到 max_rows 而提前停止
+    seconds: float
+    vectorized: bool  # 是否使用了 numpy
+
+
+def _clip(value: Any) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= MAX_VALUE_CHARS else text[:MAX_VALUE_CHARS] + "..."
+
+
+def _to_float(value: Any) -> float | None:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+class _ColumnStats:
+    """单列的累计统计"""
+
+    def __init__(self, name: str, typed: bool):
+        """
+        Args:
+            name (str): 列名
+            typed (bool): 值是否带类型(JSONL)，为 False 时所有值都是字符串(CSV)
+        """
+        self.name = name
+        self.typed = typed
+        self.count = 0
+        self.nulls = 0
+        self.numeric = 0
+        self.integral = True
+        self.total = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+        self.max_length = 0
+        self.samples: list[str] = []
+        self.counter: Counter[str] = Counter()
+        self.pruned = False
+
+    def add(self, values: list[Any]):
+        """聚合一块数据，None 表示空值"""
+        present = [v for v in values if v is not None]
+        self.nulls += len(values) - len(present)
+        if not present:
+            return
+        self.count += len(present)
+        keys = [_clip(v) for v in present] if self.typed else present
+        for key in keys:
+            if len(self.samples) >= SAMPLE_COUNT:
+                break
+            if _clip(key) not in self.samples:
+                self.samples.append(_clip(key))
+        self.counter.update(keys)
+        if len(self.counter) > MAX_DISTINCT:
+            self.counter = Counter(dict(self.counter.most_common(MAX_DISTINCT // 2)))
+            self.pruned = True
+        numbers, others = self._split_numeric(present)
+        if others:
+            self.max_length = max(self.max_length, max(map(len, others)))
+        if len(numbers):
+            self._add_numbers(numbers)
+        # 含小数点或指数的文本即使数值为整数(如 "1.0")也视为浮点数
+        if self.integral and len(numbers):
+            if self.typed:
+                self.integral = not any(isinstance(v, float) for v in present)
+            else:
+                joined = "\n".join(present)
+                self.integral = not ("." in joined or "e" in joined or "E" in joined)
+
+    def _split_numeric(self, present: list[Any]) -> tuple[Any, list[str]]:
+        """把一块值分成数值和非数值两部分"""
+        if np is not None and not (
+            self.typed and any(isinstance(v, bool) for v in present)
+        ):
+            try:
+                # 整块都是数值时一次转换完成
+                array = np.asarray(present, dtype=np.float64)
+            except (TypeError, ValueError):
+                pass
+            else:
+                finite = np.isfinite(array)
+                if finite.all():
+                    return array, []
+                others = [_clip(v) for v, ok in zip(present, finite) if not ok]
+                return array[finite], others
+        numbers = []
+        others = []
+        if self.typed:
+            for value in present:
+                number = _to_float(value)
+                if number is None:
+                    others.append(_clip(value))
+                else:
+                    numbers.append(number)
+        else:
+            for value in present:
+                try:
+                    number = float(value)
+                except ValueError:
+                    others.append(value)
+                    continue
+                if math.isfinite(number):
+                    numbers.append(number)
+                else:
+                    others.append(value)
+        if np is not None and numbers:
+            return np.asarray(numbers, dtype=np.float64), others
+        return numbers, others
+
+    def _add_numbers(self, numbers: Any):
+        if np is not None:
+            low, high = float(numbers.min()), float(numbers.max())
+            self.total += float(numbers.sum())
+            self.numeric += int(numbers.size)
+            if self.integral and not bool(np.all(numbers == np.trunc(numbers))):
+                self.integral = False
+        else:
+            low, high = min(numbers), max(numbers)
+            self.total += math.fsum(numbers)
+            self.numeric += len(numbers)
+            if self.integral and not all(n.is_integer() for n in numbers):
+                self.integral = False
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def profile(self, top_n: int) -> ColumnProfile:
+        if self.count == 0:
+            kind: ColumnType = "empty"
+        elif self.numeric == self.count:
+            kind = "integer" if self.integral else "float"
+        elif self.numeric == 0:
+            kind = "string"
+        else:
+            kind = "mixed"
+        top = [(_clip(v), n) for v, n in self.counter.most_common(top_n) if n > 1]
+        return {
+            "name": self.name,
+            "type": kind,
+            "count": self.count,
+            "nulls": self.nulls,
+            "numeric": self.numeric,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.numeric if self.numeric else None,
+            "max_length": self.max_length,
+            "distinct": len(self.counter),
+            "distinct_exact": not self.pruned,
+            "samples": self.samples,
+            "top": top,
+        }
+
+
+def detect_table_format(path: Path, head: bytes) -> TableFormat:
+    """根据后缀名判断格式，无法判断时看第一个非空行是否是 JSON 对象"""
+    suffix = path.suffix.lower()
+    if suffix in _JSONL_SUFFIXES:
+        return "jsonl"
+    if suffix in (".csv", ".tsv"):
+        return "csv"
+    return "jsonl" if head.lstrip().startswith(b"{") else "csv"
+
+
+def _csv_chunks(
+    text: io.TextIOBase, head: str, delimiter: str | None, has_header: bool
+) -> tuple[list[str], Iterator[tuple[list[list[str]], int]]]:
+    """返回列名和块的迭代器，每块为 (只保留前 MAX_COLUMNS 列的行, 块中最宽一行的原始列数)"""
+    if delimiter is None:
+        try:
+            delimiter = csv.Sniffer().sniff(head, delimiters=",\t;|").delimiter
+        except csv.Error:
+            delimiter = ","
+    reader = csv.reader(text, delimiter=delimiter)
+    first = next(reader, None)
+    if first is None:
+        return [], iter(())
+    if has_header:
+        names = first
+    else:
+        names = [f"column_{i + 1}" for i in range(len(first))]
+
+    def chunks():
+        chunk: list[list[str]] = []
+        cells = 0
+        width = 0
+        for row in itertools.chain([] if has_header else [first], reader):
+            width = max(width, len(row))
+            if len(row) > MAX_COLUMNS:
+                row = row[:MAX_COLUMNS]
+            chunk.append(row)
+            # 空行也计为一个单元格，避免块无限增长
+            cells += len(row) or 1
+            if cells >= CHUNK_CELLS:
+                yield chunk, width
+                chunk, cells, width = [], 0, 0
+        if chunk:
+            yield chunk, width
+
+    return names, chunks()
+
+
+def profile_table(
+    path: Path,
+    max_rows: int | None = None,
+    delimiter: str | None = None,
+    has_header: bool = True,
+    top_n: int = 5,
+) -> TableProfile:
+    """流式统计 CSV/JSONL 文件
+
+    Args:
+        path (Path): 文件路径
+        max_rows (int | None): 最多统计的行数，None 表示整个文件
+        delimiter (str | None): CSV 分隔符，None 时自动识别(, \\t ; |)
+        has_header (bool): CSV 第一行是否是列名
+        top_n (int): 每列返回的常见值数量
+    Returns:
+        TableProfile: 行数、各列的类型和统计信息
+    Raises:
+        ValueError: 不是文本文件
+    """
+    started = time.perf_counter()
+    sniff = sniff_file(path)
+    if sniff["binary"]:
+        raise ValueError(f"不是文本文件: {path}")
+    encoding = sniff["encoding"] or "utf-8"
+    fmt = detect_table_format(path, sniff["head"])
+    columns: dict[str, _ColumnStats] = {}
+    skipped: set[str] = set()
+    rows = 0
+    bad_rows = 0
+    truncated = False
+
+    def column(name: str, before: int) -> _ColumnStats | None:
+        """取出列的统计，新出现的列之前的 before 行都算作空值"""
+        if name not in columns:
+            if len(columns) >= MAX_COLUMNS:
+                skipped.add(name)
+                return None
+            columns[name] = _ColumnStats(name, typed=fmt == "jsonl")
+            columns[name].nulls = before
+        return columns[name]
+
+    with open(path, "rb") as raw:
+        text = io.TextIOWrapper(raw, encoding=encoding, errors="replace", newline="")
+        if fmt == "csv":
+            head = sniff["head"].decode(encoding, errors="ignore")
+            names, chunks = _csv_chunks(text, head, delimiter, has_header)
+            # 重复的列名加上序号区分
+            seen: Counter[str] = Counter()
+            unique_names = []
+            for name in names:
+                seen[name] += 1
+                unique_names.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+            for chunk, chunk_width in chunks:
+                if max_rows is not None and rows + len(chunk) > max_rows:
+                    chunk = chunk[: max_rows - rows]
+                    truncated = True
+                if not chunk:
+                    break
+                width = max(len(unique_names), chunk_width)
+                for i in range(width):
+                    name = (
+                        unique_names[i] if i < len(unique_names) else f"column_{i + 1}"
+                    )
+                    stats = column(name, rows)
+                    if stats is not None:
+                        stats.add(
+                            [
+                                (
+                                    None
+                                    if i >= len(row) or row[i] in NULL_TOKENS
+                                    else row[i]
+                                )
+                                for row in chunk
+                            ]
+                        )
+                rows += len(chunk)
+                if truncated:
+                    break
+        else:
+            records: list[dict] = []
+            cells = 0
+            # 统计的列，最多 MAX_COLUMNS 个，其余的列在组块前丢弃
+            accepted: dict[str, None] = {}
+
+            def flush(before: int):
+                # 之前出现过但本块中没有出现的列按空值计算
+                names = dict.fromkeys(columns)
+                names.update(dict.fromkeys(k for record in records for k in record))
+                for name in names:
+                    stats = column(name, before)
+                    if stats is not None:
+                        stats.add([_json_value(record.get(name)) for record in records])
+
+            for line in text:
+                if not line.strip():
+                    continue
+                if max_rows is not None and rows >= max_rows:
+                    truncated = True
+                    break
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    bad_rows += 1
+                    continue
+                if not isinstance(record, dict):
+                    bad_rows += 1
+                    continue
+                dropped = False
+                for key in record:
+                    if key in accepted:
+                        continue
+                    if len(accepted) < MAX_COLUMNS:
+                        accepted[key] = None
+                    else:
+                        skipped.add(key)
+                        dropped = True
+                if dropped:
+                    record = {k: v for k, v in record.items() if k in accepted}
+                records.append(record)
+                rows += 1
+                cells += len(record) or 1
+                if cells >= CHUNK_CELLS:
+                    flush(rows - len(records))
+                    records = []
+                    cells = 0
+            if records:
+                flush(rows - len(records))
+        bytes_read = raw.tell()
+    return {
+        "format": fmt,
+        "encoding": encoding,
+        "rows": rows,
+        "columns": [stats.profile(top_n) for stats in columns.values()],
+        "columns_skipped": len(skipped),
+        "bad_rows": bad_rows,
+        "bytes_read": bytes_read,
+        "truncated": truncated,
+        "seconds": time.perf_counter() - started,
+        "vectorized": np is not None,
+    }
+
+
+def _json_value(value: Any) -> Any:
+    """JSON 值转换为统计用的值: 数值保持不变，布尔值和嵌套结构转为文本"""
+    if value is None or (
+        isinstance(value, (str, int, float)) and not isinstance(value, bool)
+    ):
+        return value
+    return json.dumps(value, ensure_ascii=False)
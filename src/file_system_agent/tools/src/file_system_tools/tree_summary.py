@@ -0,0 +1,180 @@
+"""类似 du 的目录树汇总
+
+在线程池中并发扫描子目录(os.scandir 的系统调用会释放 GIL)，一次返回
+总大小、文件数以及最大的若干目录/文件，避免 agent 逐层列目录。
+
+每个目录的直接统计结果按目录 mtime 缓存，重复查询时 mtime 未变的目录只需一次 stat，
+不会重新扫描。与元信息索引相同，已有文件内容变化不会改变目录 mtime，大小可能滞后。
+"""
+
+import heapq
+import os
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TypedDict
+
+
+class SizedPath(TypedDict):
+    path: str
+    size: int
+
+
+class TreeSummary(TypedDict):
+    path: str
+    total_size: int
+    file_count: int
+    dir_count: int
+    truncated: bool  # 是否因为深度或条目数限制而没有扫描完整棵树
+    top_dirs: list[SizedPath]
+    top_files: list[SizedPath]
+
+
+@dataclass
+class _DirStat:
+    """单个目录的直接统计(不含子目录内容)"""
+
+    mtime_ns: int
+    own_size: int = 0
+    file_count: int = 0
+    entry_count: int = 0
+    subdirs: list[str] = field(default_factory=list)
+    top_files: list[tuple[int, str]] = field(default_factory=list)
+
+
+class TreeSummarizer:
+    """并发汇总目录树，并按目录 mtime 缓存每个目录的统计结果"""
+
+    # 每个目录缓存的最大文件数量，也是 top_n 的上限
+    MAX_TOP = 50
+
+    def __init__(self, max_workers: int | None = None, max_cached_dirs: int = 200000):
+        """
+        Args:
+            max_workers (int | None): 线程池大小，None 时使用 ThreadPoolExecutor 的默认值
+            max_cached_dirs (int): 最多缓存的目录数量，超过后清空缓存
+        """
+        self._max_workers = max_workers
+        self._max_cached_dirs = max_cached_dirs
+        self._cache: dict[Path, _DirStat] = {}
+        self._lock = threading.Lock()
+        self.rescanned = 0  # 最近一次 summarize 实际重新扫描的目录数
+
+    def summarize(
+        self,
+        root: Path,
+        max_depth: int = 32,
+        max_entries: int = 1_000_000,
+        top_n: int = 10,
+    ) -> TreeSummary:
+        """汇总 root 下的目录树
+
+        Args:
+            root (Path): 要汇总的目录
+            max_depth (int): 最大扫描深度，root 本身为第 0 层
+            max_entries (int): 最多扫描的条目数，超过后不再向下扩展
+            top_n (int): 返回最大的目录和文件的数量，不超过 MAX_TOP
+        Returns:
+            TreeSummary: 汇总结果
+        """
+        top_n = min(top_n, self.MAX_TOP)
+        self.rescanned = 0
+        order: list[Path] = []  # BFS 顺序，用于自底向上汇总
+        stats: dict[Path, _DirStat] = {}
+        truncated = False
+        entries = 0
+        frontier = [root]
+        depth = 0
+        with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+            while frontier:
+                next_frontier: list[Path] = []
+                for path, dir_stat in zip(frontier, pool.map(self._stat_dir, frontier)):
+                    if dir_stat is None:
+                        continue
+                    order.append(path)
+                    stats[path] = dir_stat
+                    entries += dir_stat.entry_count
+                    next_frontier.extend(path / name for name in dir_stat.subdirs)
+                if next_frontier and (depth >= max_depth or entries >= max_entries):
+                    truncated = True
+                    break
+                frontier = next_frontier
+                depth += 1
+
+        totals: dict[Path, int] = {}
+        file_counts: dict[Path, int] = {}
+        for path in reversed(order):
+            dir_stat = stats[path]
+            totals[path] = dir_stat.own_size + sum(
+                totals.get(path / name, 0) for name in dir_stat.subdirs
+            )
+            file_counts[path] = dir_stat.file_count + sum(
+                file_counts.get(path / name, 0) for name in dir_stat.subdirs
+            )
+
+        top_dirs = heapq.nlargest(
+            top_n, (p for p in order if p != root), key=totals.__getitem__
+        )
+        top_files = heapq.nlargest(
+            top_n,
+            (
+                (size, path / name)
+                for path in order
+                for size, name in stats[path].top_files
+            ),
+        )
+        return {
+            "path": str(root),
+            "total_size": totals.get(root, 0),
+            "file_count": file_counts.get(root, 0),
+            "dir_count": len(order) - 1 if order else 0,
+            "truncated": truncated,
+            "top_dirs": [{"path": str(p), "size": totals[p]} for p in top_dirs],
+            "top_files": [{"path": str(p), "size": size} for size, p in top_files],
+        }
+
+    def _stat_dir(self, path: Path) -> _DirStat | None:
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._cache.get(path)
+        if cached is not None and cached.mtime_ns == mtime_ns:
+            return cached
+        dir_stat = self._scan_dir(path, mtime_ns)
+        if dir_stat is None:
+            return None
+        with self._lock:
+            self.rescanned += 1
+            if len(self._cache) >= self._max_cached_dirs:
+                self._cache.clear()
+            self._cache[path] = dir_stat
+        return dir_stat
+
+    def _scan_dir(self, path: Path, mtime_ns: int) -> _DirStat | None:
+        dir_stat = _DirStat(mtime_ns)
+        files: list[tuple[int, str]] = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    dir_stat.entry_count += 1
+                    try:
+                        # 不跟随符号链接，既不会重复统计也不会跳出根目录
+                        if entry.is_dir(follow_symlinks=False):
+                            dir_stat.subdirs.append(entry.name)
+                            continue
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if stat.S_ISLNK(st.st_mode):
+                        continue
+                    dir_stat.own_size += st.st_size
+                    dir_stat.file_count += 1
+                    files.append((st.st_size, entry.name))
+        except OSError:
+            return None
+        dir_stat.top_files = heapq.nlargest(self.MAX_TOP, files)
+        return dir_stat
@@ -0,0 +1,266 @@
+"""预热的 Python 工作进程池
+
+每次用新的解释器执行脚本都要付出解释器启动和导入模块的开销(导入 numpy/pandas 时
+可达数百毫秒)。进程池预先启动若干工作进程(可以预先导入常用模块)，脚本在已经启动好的
+进程中用 runpy 以全新的全局命名空间执行:
+- 每次运行的全局变量相互隔离，但已导入的模块会保留在 sys.modules 中(这正是节省的部分)
+  脚本所在目录下的模块除外，它们在每次运行后被移除，修改后下次运行即可生效
+- 工作进程运行 max_runs 次，或常驻内存超过 max_rss_mb 后被替换，限制状态累积和内存泄漏
+- 超时的脚本会连同工作进程一起被杀掉，再启动新的工作进程
+- 结果中分别给出等待工作进程启动的时间和脚本执行时间
+
+与 script_runner 不同，工作进程长期存在，因此只限制内存，不限制累计 CPU 时间。
+"""
+
+import asyncio
+import json
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from .script_runner import RunResult, limit_resources
+
+WORKER_SCRIPT = Path(__file__).with_name("_pool_worker.py")
+
+
+class PoolRunResult(RunResult):
+    startup_time: float  # 等待工作进程启动(包括预导入模块)的时间，使用预热的进程时为 0
+    exec_time: float  # 脚本本身的执行时间
+    recycled: bool  # 本次运行后工作进程是否被替换
+
+
+class _Worker:
+    def __init__(self, python: str, preload: list[str], max_memory_mb: int | None):
+        env = dict(os.environ)
+        env["PYTHONIOENCODING"] = "utf-8"
+        self.proc = subprocess.Popen(
+            limit_resources(
+                [python, str(WORKER_SCRIPT), json.dumps(preload)], max_memory_mb, None
+            ),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            text=True,
+            encoding="utf-8",
+            start_new_session=True,
+        )
+        self.runs = 0
+        self.ready = False
+        self._lines: queue.Queue[str | None] = queue.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        assert self.proc.stdout is not None
+        for line in self.proc.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def _receive(self, timeout: float) -> dict | None:
+        """读取一条消息，超时或进程退出时返回 None
+
+        无法解析的消息说明协议已经被破坏，之后的消息也无法对应到请求，
+        此时结束工作进程并返回 None，按进程退出处理。
+        """
+        try:
+            line = self._lines.get(timeout=max(timeout, 0))
+        except queue.Empty:
+            return None
+        if line is None:
+            # 输出已关闭，说明进程正在退出，等待它结束以便读取退出码
+            self.proc.wait()
+            return None
+        try:
+            message = json.loads(line)
+        except ValueError:
+            message = None
+        if not isinstance(message, dict):
+            self.kill()
+            return None
+        return message
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def wait_ready(self, timeout: float) -> float:
+        """等待工作进程启动完成，返回等待的时间"""
+        if self.ready:
+            return 0.0
+        started = time.monotonic()
+        if self._receive(timeout) is None:
+            self.kill()
+            raise RuntimeError("Python 工作进程启动失败或超时")
+        self.ready = True
+        return time.monotonic() - started
+
+    def request(self, payload: dict, timeout: float) -> dict | None:
+        assert self.proc.stdin is not None
+        try:
+            self.proc.stdin.write(json.dumps(payload) + "\n")
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            return None
+        return self._receive(timeout)
+
+    def kill(self):
+        try:
+            os.killpg(self.proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError, AttributeError):
+            self.proc.kill()
+        self.proc.wait()
+
+
+class WorkerPool:
+    """预热的 Python 工作进程池，线程安全"""
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_runs: int = 50,
+        max_rss_mb: float = 512,
+        max_memory_mb: int | None = 2048,
+        preload: tuple[str, ...] = (),
+        python: str | None = None,
+        startup_timeout: float = 60,
+    ):
+        """
+        Args:
+            size (int): 工作进程数量，也是同时运行的脚本数上限
+            max_runs (int): 每个工作进程最多运行的脚本数
+            max_rss_mb (float): 脚本运行结束后常驻内存超过该值(MB)时替换工作进程
+            max_memory_mb (int | None): 工作进程的虚拟内存上限(MB)
+            preload (tuple[str, ...]): 工作进程启动时预先导入的模块，导入失败的会被忽略
+            python (str | None): Python 解释器，默认为当前解释器
+            startup_timeout (float): 等待工作进程启动的最长时间
+        """
+        self._max_runs = max_runs
+        self._max_rss_mb = max_rss_mb
+        self._max_memory_mb = max_memory_mb
+        self._preload = list(preload)
+        self._python = python or sys.executable
+        self._startup_timeout = startup_timeout
+        self._slots = threading.Semaphore(size)
+        self._idle: queue.SimpleQueue[_Worker] = queue.SimpleQueue()
+        self._closed = False
+        # 预先启动，不等待启动完成
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._python, self._preload, self._max_memory_mb)
+
+    def _take(self) -> _Worker:
+        try:
+            worker = self._idle.get_nowait()
+        except queue.Empty:
+            return self._spawn()
+        if not worker.alive:
+            return self._spawn()
+        return worker
+
+    def _release(self, worker: _Worker):
+        if self._closed:
+            worker.kill()
+        else:
+            self._idle.put(worker)
+
+    def run(
+        self,
+        script: Path,
+        args: list[str] | None = None,
+        timeout: float = 60,
+        max_output_bytes: int = 64 * 1024,
+    ) -> PoolRunResult:
+        """在工作进程中运行脚本
+
+        Args:
+            script (Path): 脚本路径
+            args (list[str] | None): 命令行参数(sys.argv[1:])
+            timeout (float): 脚本执行的墙钟超时秒数，不包括等待工作进程启动的时间
+            max_output_bytes (int): 保留的输出字节数
+        Returns:
+            PoolRunResult: 退出码、输出以及启动和执行耗时
+        Raises:
+            ValueError: timeout 不大于0
+            RuntimeError: 进程池已关闭或工作进程无法启动
+        """
+        if not timeout > 0:
+            raise ValueError(f"超时时间必须大于0: {timeout}")
+        if self._closed:
+            raise RuntimeError("进程池已关闭")
+        started = time.monotonic()
+        with self._slots:
+            worker = self._take()
+            startup_time = worker.wait_ready(self._startup_timeout)
+            exec_started = time.monotonic()
+            response = worker.request(
+                {
+                    "script": str(script.resolve()),
+                    "args": args or [],
+                    "max_output_bytes": max_output_bytes,
+                },
+                timeout,
+            )
+            if response is None:
+                # 超时、工作进程在运行中退出(比如调用了 os._exit 或超出内存限制)，
+                # 或者返回了无法解析的结果(此时工作进程已被结束)
+                timed_out = worker.alive
+                if timed_out:
+                    worker.kill()
+                exit_code = None if timed_out else worker.proc.returncode
+                self._release(self._spawn())
+                return {
+                    "exit_code": exit_code,
+                    "timed_out": timed_out,
+                    "duration": time.monotonic() - started,
+                    "output": "",
+                    "dropped_bytes": 0,
+                    "startup_time": startup_time,
+                    "exec_time": time.monotonic() - exec_started,
+                    "recycled": True,
+                }
+            worker.runs += 1
+            recycled = (
+                worker.runs >= self._max_runs or response["rss_mb"] > self._max_rss_mb
+            )
+            if recycled:
+                worker.kill()
+                worker = self._spawn()
+            self._release(worker)
+        return {
+            "exit_code": response["exit_code"],
+            "timed_out": False,
+            "duration": time.monotonic() - started,
+            "output": response["output"],
+            "dropped_bytes": response["dropped_bytes"],
+            "startup_time": startup_time,
+            "exec_time": response["exec_time"],
+            "recycled": recycled,
+        }
+
+    async def run_async(
+        self,
+        script: Path,
+        args: list[str] | None = None,
+        timeout: float = 60,
+        max_output_bytes: int = 64 * 1024,
+    ) -> PoolRunResult:
+        """run 的 asyncio 版本，在线程中等待，不阻塞事件循环"""
+        return await asyncio.to_thread(
+            self.run, script, args, timeout, max_output_bytes
+        )
+
+    def close(self):
+        """结束所有空闲的工作进程，正在运行脚本的进程在运行结束后不再复用"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().kill()
+            except queue.Empty:
+                break
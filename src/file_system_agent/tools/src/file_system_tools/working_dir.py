@@ -1,16 +1,21 @@
+import os
+import stat
+from collections.abc import Iterator
 from pathlib import Path
-from .file_type import FileType
 from .file_metadata import FileMetadata
+from .dir_scanner import scan_dir
+from .listing_cache import CacheStats, ListingCache
 
 
 class WorkingDir:
     """工作目录类，限制了agent的tool的能力范围，防止越权访问文件系统，属于内部工具，使用pathlib管理路径"""
 
-    def __init__(self, root: Path):
+    def __init__(self, root: Path, listing_cache: ListingCache | None = None):
         """建立工作目录，类似与一棵树，建立是提供文件树的树根
 
         Args:
             root (Path): 工作目录的根路径，会被转换成完整路径(resolve)
+            listing_cache (ListingCache | None): 目录列表缓存，为 None 时新建一个
         Raises:
             FileNotFoundError: 路径不存在时抛出
         """
@@ -21,6 +26,9 @@ class WorkingDir:
         self._trace: list[Path] = [
             self._root
         ]  # 记录路径变更轨迹，初始为根目录, stack结构
+        self._listing_cache: ListingCache = (
+            listing_cache if listing_cache is not None else ListingCache()
+        )
 
     def change_to_child_dir(self, target: Path):
         """切换到当前目录下的子目录，但是不可以是符号链接否则或超出权限范围
@@ -31,15 +39,19 @@ class WorkingDir:
             FileNotFoundError: 目标不在当前目录直接子项中
             NotADirectoryError: 目标存在但不是目录
         """
-        # 使用 iterdir() 判断是否为当前目录的直接子项（不跨层）
-        # ipdb.set_trace()
-        if target not in self._now.iterdir():
+        # 只需要一次 lstat 和父目录比较，不再枚举整个当前目录
+        if target.parent != self._now or target.name in ("", ".."):
             print("不存在这个目录")
             raise FileNotFoundError(f"不存在子目录{target.name}")
-        if not target.is_dir():
-            raise NotADirectoryError(f"期望是一个目录，但传入的是文件: {target.name}")
-        if target.is_symlink():
+        try:
+            mode = os.lstat(target).st_mode
+        except FileNotFoundError:
+            print("不存在这个目录")
+            raise FileNotFoundError(f"不存在子目录{target.name}") from None
+        if stat.S_ISLNK(mode):
             raise NotADirectoryError(f"期望是一个目录，但传入的是链接: {target.name}")
+        if not stat.S_ISDIR(mode):
+            raise NotADirectoryError(f"期望是一个目录，但传入的是文件: {target.name}")
         self._now = target  # 更新当前目录
         self._trace.append(self._now)
 
@@ -47,8 +59,18 @@ class WorkingDir:
         if self._now == self._root:
             print("已经是顶层目录")
             return
-        self._now = self._now.resolve().parent
+        # 轨迹栈中保存的就是父目录，无需再 resolve
         self._trace.pop()
+        self._now = self._trace[-1]
+
+    @property
+    def root(self) -> Path:
+        """返回工作目录的根路径
+
+        Returns:
+            Path: 根目录的完整路径
+        """
+        return self._root
 
     @property
     def where(self) -> Path:
@@ -68,30 +90,28 @@ class WorkingDir:
         """
         return self._trace.copy()
 
+    @property
+    def cache_stats(self) -> CacheStats:
+        """返回目录列表缓存的命中统计
+
+        Returns:
+            CacheStats: 命中/未命中/失效次数等信息
+        """
+        return self._listing_cache.stats()
+
+    def iter_dir(self) -> Iterator[FileMetadata]:
+        """流式遍历当前工作目录，逐个产生子项的元信息，适合配合分页使用
+
+        Returns:
+            Iterator[FileMetadata]: 当前目录下子项元信息的迭代器
+        """
+        return self._listing_cache.iter_listing(self._now, scan_dir)
+
     def walk_dir(self) -> list[FileMetadata]:
         """遍历当前工作目录，返回目录内容的元信息列表
 
         Returns:
             list[FileMetadata]: 当前目录下所有子项的元信息列表
         """
-        msg_list: list[FileMetadata] = []  # 存储文件元信息
-        for child in self._now.iterdir():
-            # 判断child的类型
-            if child.is_file():
-                file_type = FileType.FILE.value
-                target = None
-            elif child.is_dir():
-                file_type = FileType.DIRECTORY.value
-                target = None
-            else:
-                file_type = FileType.LINK.value
-                target = child.readlink().name
-            msg: FileMetadata = {
-                "file_name": child.name,
-                "full_name": child.resolve().name,
-                "file_type": file_type,
-                "size": child.stat().st_size,
-                "target": target,
-            }
-            msg_list.append(msg)
-        return msg_list
+        # 使用 scandir 引擎，复用 DirEntry 缓存的类型信息，每个子项最多一次 lstat
+        return list(self.iter_dir())
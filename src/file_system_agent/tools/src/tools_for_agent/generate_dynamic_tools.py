@@ -3,16 +3,47 @@
 """
 
 from ..file_system_tools.working_dir import WorkingDir
+from ..file_system_tools.listing_cache import ListingCache
+from ..file_system_tools.dir_pager import page_entries
+from ..file_system_tools.metadata_index import IndexedEntry, MetadataIndex
+from ..file_system_tools.tree_summary import TreeSummarizer
+from ..file_system_tools.name_index import NameIndex
+from ..file_system_tools.content_search import search_contents
+from ..file_system_tools.duplicate_finder import HashCache, find_duplicates
+from ..file_system_tools.symbol_index import Symbol, SymbolIndex
 from langchain.tools import tool, BaseTool
 from pathlib import Path
 
 
 def generate_working_dir_tool(
     root_path: str,
+    listing_cache: ListingCache | None = None,
+    name_index: NameIndex | None = None,
+    metadata_index: MetadataIndex | None = None,
+    hash_cache: HashCache | None = None,
+    symbol_index: SymbolIndex | None = None,
 ) -> tuple[list[BaseTool] | None, WorkingDir | None]:
-    """生成一个有状态的WorkingDir实例，并将其方法包装为LangChain工具。"""
+    """生成一个有状态的WorkingDir实例，并将其方法包装为LangChain工具。
+
+    多个会话共用同一个根目录时，应当传入共享的缓存和索引: 它们只和根目录有关，
+    每个会话各自打开的话，每个新会话的第一次查询都要重新遍历整个根目录，
+    并且会在同一个 SQLite 文件上互相等待写锁。
+
+    Args:
+        root_path (str): 根目录
+        listing_cache (ListingCache | None): 目录列表缓存，为 None 时新建
+        name_index (NameIndex | None): 文件名索引，为 None 时新建
+        metadata_index (MetadataIndex | None): 元信息索引，为 None 时在第一次查询时打开
+        hash_cache (HashCache | None): 文件哈希缓存，为 None 时在第一次查找重复文件时打开
+        symbol_index (SymbolIndex | None): Python 符号索引，为 None 时在第一次查询时打开
+
+    Returns:
+        tuple: (工具列表, WorkingDir实例)，创建失败时均为 None
+    """
     try:
-        working_dir: WorkingDir = WorkingDir(root=Path(root_path))
+        working_dir: WorkingDir = WorkingDir(
+            root=Path(root_path), listing_cache=listing_cache
+        )
     except Exception as e:
         print(f"无法创建WorkingDir实例: {e}")
         return None, None
@@ -69,26 +100,362 @@ def generate_working_dir_tool(
     tools.append(get_current_directory)
 
     @tool
-    def list_directory_contents() -> str:
-        """列出当前工作目录下的所有文件和子目录
+    def list_directory_contents(
+        page_size: int = 100, cursor: str | None = None, sort_by: str = "none"
+    ) -> str:
+        """分页列出当前工作目录下的文件和子目录
+
+        Args:
+            page_size (int): 每页最多返回的条目数，默认100
+            cursor (str | None): 翻页游标，第一页不传；下一页传入上次结果末尾给出的游标
+            sort_by (str): 排序方式，none(文件系统顺序，最快)/name(名称)/size(从大到小，可用于找最大的N个文件)/type(目录优先)
 
         Returns:
-            str: 当前目录内容的描述字符串
+            str: 当前页目录内容的描述字符串，以及下一页的游标
         """
         try:
-            contents = working_dir.walk_dir()
-            if not contents:
-                return "当前目录为空"
+            page = page_entries(
+                working_dir.iter_dir(),
+                page_size=page_size,
+                cursor=cursor,
+                sort_key=sort_by,  # type: ignore
+            )
+            if not page["items"]:
+                return "当前目录为空" if cursor is None else "没有更多内容"
             result_lines = []
-            for item in contents:
+            for item in page["items"]:
                 line = f"{item['file_type'].upper()}: {item['file_name']} (大小: {item['size']} bytes)"
                 if item["file_type"] == "link" and item["target"]:
                     line += f" -> 指向: {item['target']}"
                 result_lines.append(line)
+            if page["total"] is not None:
+                result_lines.append(f"共 {page['total']} 项")
+            if page["next_cursor"] is not None:
+                result_lines.append(
+                    f"还有更多内容，下一页请传入 cursor={page['next_cursor']}"
+                )
             return "\n".join(result_lines)
         except Exception as e:
             return f"列出目录内容失败: {e}"
 
     tools.append(list_directory_contents)
 
+    # 没有传入共享的元信息索引时，在第一次查询时才建立
+    index: MetadataIndex | None = metadata_index
+
+    def get_index() -> MetadataIndex:
+        nonlocal index
+        if index is None:
+            index = MetadataIndex(working_dir.root)
+        index.refresh_if_stale()
+        return index
+
+    def format_indexed(entries: list[IndexedEntry]) -> str:
+        lines = []
+        for item in entries:
+            line = f"{item['file_type'].upper()}: {item['path']} (大小: {item['size']} bytes)"
+            if item["target"]:
+                line += f" -> 指向: {item['target']}"
+            lines.append(line)
+        return "\n".join(lines)
+
+    @tool
+    def search_files_in_index(
+        pattern: str, file_type: str | None = None, min_size: int = 0, limit: int = 50
+    ) -> str:
+        """在整个根目录的元信息索引中按文件名查找文件或目录，不需要逐层切换目录
+
+        Args:
+            pattern (str): 文件名模式，包含 * ? [ 时按 glob 匹配(如 "*.log")，否则按子串匹配
+            file_type (str | None): 只查找指定类型，file/directory/link，不传表示全部
+            min_size (int): 最小大小(字节)，默认0
+            limit (int): 最多返回的条目数，默认50
+
+        Returns:
+            str: 匹配条目的完整路径和大小，每行一项
+        """
+        try:
+            entries = get_index().search(pattern, file_type, min_size, limit)
+            if not entries:
+                return f"索引中没有匹配 {pattern} 的条目"
+            return format_indexed(entries)
+        except Exception as e:
+            return f"查询索引失败: {e}"
+
+    tools.append(search_files_in_index)
+
+    @tool
+    def largest_files_in_index(limit: int = 20, under: str = "") -> str:
+        """从整个根目录的元信息索引中找出最大的文件
+
+        Args:
+            limit (int): 返回的文件数量，默认20
+            under (str): 只统计根目录下该相对路径(如 "project/build")中的文件，默认整个根目录
+
+        Returns:
+            str: 按大小从大到小排列的文件完整路径和大小，每行一项
+        """
+        try:
+            entries = get_index().largest(limit=limit, under=under)
+            if not entries:
+                return "索引中没有文件"
+            return format_indexed(entries)
+        except Exception as e:
+            return f"查询索引失败: {e}"
+
+    tools.append(largest_files_in_index)
+
+    summarizer = TreeSummarizer()
+
+    @tool
+    def summarize_directory_tree(
+        max_depth: int = 32, max_entries: int = 1000000, top_n: int = 10
+    ) -> str:
+        """递归汇总当前工作目录(类似du)，一次返回总大小、文件数以及最大的子目录和文件
+
+        Args:
+            max_depth (int): 最大扫描深度，默认32
+            max_entries (int): 最多扫描的条目数，默认1000000，超过后结果会被截断
+            top_n (int): 返回最大的子目录和文件的数量，默认10，最多50
+
+        Returns:
+            str: 汇总结果的描述字符串
+        """
+        try:
+            summary = summarizer.summarize(
+                working_dir.where,
+                max_depth=max_depth,
+                max_entries=max_entries,
+                top_n=top_n,
+            )
+            lines = [
+                f"目录: {summary['path']}",
+                f"总大小: {summary['total_size']} bytes, 文件数: {summary['file_count']}, 子目录数: {summary['dir_count']}",
+            ]
+            if summary["truncated"]:
+                lines.append("注意: 达到深度或条目数限制，结果不完整")
+            lines.append("最大的子目录:")
+            lines += [f"  {d['path']} ({d['size']} bytes)" for d in summary["top_dirs"]]
+            lines.append("最大的文件:")
+            lines += [
+                f"  {f['path']} ({f['size']} bytes)" for f in summary["top_files"]
+            ]
+            return "\n".join(lines)
+        except Exception as e:
+            return f"汇总目录失败: {e}"
+
+    tools.append(summarize_directory_tree)
+
+    if name_index is None:
+        name_index = NameIndex(working_dir.root)
+
+    @tool
+    def find_files(
+        pattern: str,
+        mode: str = "substring",
+        limit: int = 50,
+        under_current_dir: bool = False,
+    ) -> str:
+        """在根目录下按文件名查找文件和目录(内存索引，毫秒级返回)
+
+        Args:
+            pattern (str): 查询内容
+            mode (str): substring(子串，忽略大小写)/glob(如 "*.py"，包含 / 时匹配相对根目录的路径，如 "src/**/*.py")/regex(正则搜索文件名)
+            limit (int): 最多返回的条目数，默认50
+            under_current_dir (bool): 是否只在当前工作目录下查找，默认在整个根目录下查找
+
+        Returns:
+            str: 匹配条目的完整路径，每行一项
+        """
+        try:
+            name_index.refresh_if_stale()
+            under = ""
+            if under_current_dir:
+                under = working_dir.where.relative_to(working_dir.root).as_posix()
+                under = "" if under == "." else under
+            paths = name_index.search(
+                pattern,
+                mode=mode,  # type: ignore
+                limit=limit,
+                under=under,
+            )
+            if not paths:
+                return f"没有找到匹配 {pattern} 的文件"
+            return "\n".join(str(working_dir.root / p) for p in paths)
+        except Exception as e:
+            return f"查找文件失败: {e}"
+
+    tools.append(find_files)
+
+    @tool
+    def search_file_contents(
+        pattern: str,
+        fixed_string: bool = False,
+        ignore_case: bool = False,
+        file_glob: str | None = None,
+        max_matches: int = 100,
+        under_current_dir: bool = True,
+    ) -> str:
+        """在文件内容中搜索文本(类似grep)，只返回命中的行和行号，遵循.gitignore并跳过二进制文件
+
+        Args:
+            pattern (str): 要搜索的正则表达式，fixed_string 为 True 时按普通字符串匹配
+            fixed_string (bool): 是否把 pattern 当作普通字符串，默认False
+            ignore_case (bool): 是否忽略大小写，默认False
+            file_glob (str | None): 只搜索文件名匹配该 glob 的文件，如 "*.py"
+            max_matches (int): 最多返回的命中行数，默认100，达到后停止搜索
+            under_current_dir (bool): 为 True(默认)时只搜索当前工作目录，为 False 时搜索整个根目录
+
+        Returns:
+            str: 每行一个命中，格式为 "完整路径:行号: 行内容"
+        """
+        try:
+            start = working_dir.where if under_current_dir else working_dir.root
+            result = search_contents(
+                start,
+                pattern,
+                root=working_dir.root,
+                fixed_string=fixed_string,
+                ignore_case=ignore_case,
+                file_glob=file_glob,
+                max_matches=max_matches,
+            )
+            lines = [
+                f"{m['path']}:{m['line_number']}: {m['line']}"
+                for m in result["matches"]
+            ]
+            summary = f"搜索了 {result['files_scanned']} 个文件，跳过 {result['binary_skipped']} 个二进制文件，命中 {len(lines)} 行"
+            if result["truncated"]:
+                summary += f"(已达到上限 {max_matches}，结果不完整)"
+            return "\n".join(lines + [summary])
+        except Exception as e:
+            return f"搜索文件内容失败: {e}"
+
+    tools.append(search_file_contents)
+
+    # 没有传入共享的哈希缓存时，在第一次查找重复文件时才打开
+
+    @tool
+    def find_duplicate_files(
+        min_size: int = 1, max_groups: int = 20, under_current_dir: bool = True
+    ) -> str:
+        """查找内容完全相同的重复文件，用于清理磁盘空间；先按大小筛选，只读取可能重复的文件，结果会被缓存
+
+        Args:
+            min_size (int): 忽略小于该大小(字节)的文件，默认1(跳过空文件)
+            max_groups (int): 最多返回的重复文件组数，按可释放空间从大到小排列，默认20
+            under_current_dir (bool): 为 True(默认)时只查找当前工作目录，为 False 时查找整个根目录
+
+        Returns:
+            str: 每组重复文件的大小和路径，以及总共可以释放的空间
+        """
+        nonlocal hash_cache
+        try:
+            if hash_cache is None:
+                hash_cache = HashCache()
+            start = working_dir.where if under_current_dir else working_dir.root
+            report = find_duplicates(start, min_size=min_size, cache=hash_cache)
+            lines = [
+                f"扫描了 {report['files_scanned']} 个文件，其中 {report['candidates']} 个与其他文件大小相同，"
+                f"读取了 {report['bytes_read']} bytes(缓存命中 {report['cache_hits']} 个)",
+            ]
+            if not report["groups"]:
+                lines.append("没有发现重复文件")
+                return "\n".join(lines)
+            lines.append(
+                f"共 {len(report['groups'])} 组重复文件，删除多余副本可释放 {report['wasted']} bytes"
+            )
+            for i, group in enumerate(report["groups"][:max_groups], 1):
+                lines.append(
+                    f"第 {i} 组: {len(group['paths'])} 个文件，每个 {group['size']} bytes，可释放 {group['wasted']} bytes"
+                )
+                lines += [f"  {p}" for p in group["paths"]]
+            if len(report["groups"]) > max_groups:
+                lines.append(f"只列出了前 {max_groups} 组")
+            return "\n".join(lines)
+        except Exception as e:
+            return f"查找重复文件失败: {e}"
+
+    tools.append(find_duplicate_files)
+
+    # 没有传入共享的 Python 符号索引时，在第一次查询时才建立
+    def get_symbol_index() -> SymbolIndex:
+        nonlocal symbol_index
+        if symbol_index is None:
+            symbol_index = SymbolIndex(working_dir.root)
+        symbol_index.refresh_if_stale()
+        return symbol_index
+
+    def format_symbol(symbol: Symbol, with_path: bool) -> str:
+        if symbol["kind"] == "import":
+            line = f"import {symbol['qualname']} as {symbol['name']}"
+        else:
+            line = f"{symbol['kind']} {symbol['qualname']}{symbol['signature'] or ''}"
+        position = f"第 {symbol['line']}-{symbol['end_line']} 行"
+        if with_path:
+            return f"{symbol['path']}:{symbol['line']}: {line}"
+        return f"{position}: {line}"
+
+    @tool
+    def find_python_symbol(
+        name: str,
+        kind: str | None = None,
+        limit: int = 30,
+        include_imports: bool = False,
+    ) -> str:
+        """在根目录下所有 Python 文件中查找类、函数、方法的定义位置，不需要逐个读取文件
+
+        Args:
+            name (str): 名称，如 "WorkerPool"；包含 "." 时按限定名查找，如 "WorkerPool.run"；可以使用 glob，如 "*Index"
+            kind (str | None): 只查找指定类型，class/function/method/import
+            limit (int): 最多返回的数量，默认30
+            include_imports (bool): 是否同时返回导入了该名称的位置，默认False
+
+        Returns:
+            str: 每行一个结果，格式为 "完整路径:行号: 类型 名称(参数)"
+        """
+        try:
+            symbols = get_symbol_index().find(
+                name,
+                kind=kind,  # type: ignore
+                limit=limit,
+                include_imports=include_imports,
+            )
+            if not symbols:
+                return f"没有找到名为 {name} 的 Python 符号"
+            return "\n".join(format_symbol(s, with_path=True) for s in symbols)
+        except Exception as e:
+            return f"查找 Python 符号失败: {e}"
+
+    tools.append(find_python_symbol)
+
+    @tool
+    def outline_python_file(file_path: str, include_imports: bool = False) -> str:
+        """列出一个 Python 文件中的类、函数和方法及其行号，不返回文件内容；
+        之后可以让 file_expert 只读取需要的行
+
+        Args:
+            file_path (str): 文件路径，可以是绝对路径或相对当前工作目录的路径
+            include_imports (bool): 是否同时列出导入，默认False
+
+        Returns:
+            str: 每行一个符号，格式为 "第 起始-结束 行: 类型 名称(参数)"，方法按所在类缩进
+        """
+        try:
+            path = Path(file_path)
+            if not path.is_absolute():
+                path = working_dir.where / path
+            symbols = get_symbol_index().outline(path)
+            lines = [
+                ("" if s["kind"] == "import" else "  " * s["qualname"].count("."))
+                + format_symbol(s, with_path=False)
+                for s in symbols
+                if include_imports or s["kind"] != "import"
+            ]
+            return "\n".join(lines) if lines else "文件中没有类或函数定义"
+        except Exception as e:
+            return f"解析 Python 文件失败: {e}"
+
+    tools.append(outline_python_file)
+
     return tools, working_dir
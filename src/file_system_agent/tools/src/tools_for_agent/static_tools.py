@@ -3,45 +3,441 @@
 """提供agent调用的静态工具，不涉及动态的文件树状态，比如写入，读取操作等等, 路径是字符串但是要求绝对路径"""
 
 from langchain.tools import tool
+from langchain_core.tools import StructuredTool
 from pathlib import Path
+from typing import Literal
+import atexit
 import os
+import threading
+
+from ..file_system_tools.archive_reader import (
+    ArchiveListing,
+    list_members,
+    read_member,
+    read_member_lines,
+)
+from ..file_system_tools.bulk_ops import (
+    BulkOperation,
+    BulkReport,
+    ItemResult,
+    expand_glob,
+    run_operations,
+)
+from ..file_system_tools.fast_copy import copy_tree
+from ..file_system_tools.file_reader import (
+    TextWindow,
+    read_byte_range,
+    read_head,
+    read_line_range,
+    read_tail,
+)
+from ..file_system_tools.file_sniffer import (
+    HEX_HEAD_BYTES,
+    FileSniff,
+    detect_encoding,
+    hex_dump,
+    is_wide_encoding,
+    looks_binary,
+    read_raw_range,
+    sniff_file,
+)
+from ..file_system_tools.file_writer import (
+    append_text,
+    apply_patch,
+    replace_lines,
+    write_text,
+)
+from ..file_system_tools.log_tail import TailResult, follow, tail_lines
+from ..file_system_tools.script_runner import RunResult, run_script, run_script_async
+from ..file_system_tools.table_profile import ColumnProfile, profile_table
+from ..file_system_tools.worker_pool import PoolRunResult, WorkerPool
+
+# 不指定读取范围时，超过该大小的文件只返回开头部分
+MAX_FULL_READ = 256 * 1024
+DEFAULT_WINDOW_LINES = 200
+# 二进制文件按字节范围读取时最多展示的字节数
+MAX_HEX_BYTES = 1024
 
 
 @tool
-def read_file(file_path: str) -> str:
-    """读取指定文件的内容
+def read_file(
+    file_path: str,
+    start_line: int | None = None,
+    end_line: int | None = None,
+    offset: int | None = None,
+    length: int | None = None,
+    head: int | None = None,
+    tail: int | None = None,
+) -> str:
+    """读取指定文件的内容，可以只读取部分行或字节，适合大文件
 
     Args:
         file_path (str): 要读取的文件路径
+        start_line (int | None): 起始行号(从1开始，包含)，与 end_line 一起使用
+        end_line (int | None): 结束行号(包含)，不传时读取到 start_line 之后的200行
+        offset (int | None): 起始字节偏移，负数表示从文件末尾倒数，与 length 一起使用
+        length (int | None): 读取的字节数，默认4096
+            每次最多返回 256KB，超出的部分需要分多次读取
+        head (int | None): 只读取前 head 行
+        tail (int | None): 只读取最后 tail 行
 
     Returns:
-        str: 文件内容
+        str: 文件内容；读取部分内容时，第一行会说明读取的范围和文件大小；
+            不是 UTF-8 编码的文本会说明编码；二进制文件只返回大小、类型和开头部分的十六进制内容
 
     Raises:
         FileNotFoundError: 文件无法正常打开
     """
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return f.read()
+        path = Path(file_path)
+        # 先读取文件开头判断类型和编码，二进制文件不需要读取其余部分
+        sniff = sniff_file(path)
+        if sniff["binary"]:
+            return _describe_binary(path, sniff, offset, length)
+        encoding = sniff["encoding"]
+        note = "" if encoding in ("utf-8", "utf-8-sig") else f"[文件编码 {encoding}]\n"
+        if is_wide_encoding(encoding):
+            # UTF-16/32 中换行符不是单个字节，不能按字节定位行，只支持完整读取
+            if sniff["size"] > MAX_FULL_READ:
+                return f"读取文件失败: 文件编码为 {encoding}，超过 {MAX_FULL_READ} bytes 时不支持读取"
+            if any(
+                arg is not None
+                for arg in (start_line, end_line, offset, length, head, tail)
+            ):
+                note += "[该编码不支持按范围读取，返回完整内容]\n"
+            with open(path, "r", encoding=encoding) as f:
+                return note + f.read()
+        if start_line is not None or end_line is not None:
+            start = start_line or 1
+            window = read_line_range(
+                path,
+                start,
+                end_line or start + DEFAULT_WINDOW_LINES - 1,
+                encoding,
+                MAX_FULL_READ,
+            )
+        elif offset is not None or length is not None:
+            window = read_byte_range(
+                path, offset or 0, length or 4096, encoding, MAX_FULL_READ
+            )
+        elif head is not None:
+            window = read_head(path, head, encoding, MAX_FULL_READ)
+        elif tail is not None:
+            window = read_tail(path, tail, encoding, MAX_FULL_READ)
+        elif sniff["size"] > MAX_FULL_READ:
+            window = read_head(path, DEFAULT_WINDOW_LINES, encoding)
+            return (
+                note
+                + f"[文件较大({window['file_size']} bytes)，只返回前 {window['end_line']} 行，"
+                f"请使用 start_line/end_line、offset/length、head 或 tail 读取其余部分]\n"
+                + window["text"]
+            )
+        else:
+            with open(path, "r", encoding=encoding, errors="replace") as f:
+                return note + f.read()
+        return note + _describe_window(window) + "\n" + window["text"]
     except Exception as e:
         return f"读取文件失败: {e}"
 
 
+def _describe_binary(
+    path: Path, sniff: FileSniff, offset: int | None, length: int | None
+) -> str:
+    kind = sniff["kind"] or "未知类型"
+    summary = f"[二进制文件，大小 {sniff['size']} bytes，类型: {kind}]"
+    if offset is None and length is None:
+        data = sniff["head"][:HEX_HEAD_BYTES]
+        return f"{summary}\n前 {len(data)} 字节:\n{hex_dump(data)}"
+    begin, data = read_raw_range(
+        path, offset or 0, min(length or HEX_HEAD_BYTES, MAX_HEX_BYTES)
+    )
+    return (
+        f"{summary}\n字节 {begin}-{begin + len(data)} (最多展示 {MAX_HEX_BYTES} 字节):\n"
+        + hex_dump(data, begin)
+    )
+
+
+def _describe_window(window: TextWindow) -> str:
+    if window["start_line"] is not None:
+        position = f"第 {window['start_line']}-{window['end_line']} 行"
+    else:
+        position = f"字节 {window['start_byte']}-{window['end_byte']}"
+    description = f"[{position}，文件大小 {window['file_size']} bytes]"
+    if window["truncated"]:
+        description += (
+            f"\n[请求的范围超过 {MAX_FULL_READ} bytes，只返回了其中一部分，"
+            f"请缩小范围分多次读取]"
+        )
+    return description
+
+
+# follow 模式最长等待时间，避免阻塞 agent
+MAX_FOLLOW_WAIT = 30
+
+
+@tool
+def tail_file(
+    file_path: str,
+    lines: int = 50,
+    pattern: str | None = None,
+    ignore_case: bool = False,
+    cursor: str | None = None,
+    wait_seconds: float = 0,
+) -> str:
+    """读取文件(通常是日志)最后若干行，或者获取上次读取之后新追加的行，不会读取整个文件
+
+    Args:
+        file_path (str): 文件路径
+        lines (int): 返回最后多少行；传入 cursor 时表示最多返回的新行数
+        pattern (str | None): 正则表达式，只返回匹配的行，如 "ERROR|Exception"
+        ignore_case (bool): pattern 是否忽略大小写
+        cursor (str | None): 上一次调用返回的游标，传入时只返回之后新追加的行
+        wait_seconds (float): 传入 cursor 且没有新内容时最多等待的秒数，不超过30秒
+
+    Returns:
+        str: 第一行是读取情况和下一次使用的游标，之后是各行内容
+    """
+    try:
+        path = Path(file_path)
+        if cursor is None:
+            result = tail_lines(path, lines, pattern, ignore_case)
+            header = f"最后 {len(result['lines'])} 行"
+        else:
+            result = follow(
+                path,
+                cursor,
+                pattern,
+                ignore_case,
+                max_lines=lines,
+                wait_seconds=min(max(wait_seconds, 0), MAX_FOLLOW_WAIT),
+            )
+            header = f"新增 {len(result['lines'])} 行"
+            if result["rotated"]:
+                header += "(文件已被轮转或截断，从头读取)"
+        return _describe_tail(result, header, pattern)
+    except Exception as e:
+        return f"读取文件末尾失败: {e}"
+
+
+def _describe_tail(result: TailResult, header: str, pattern: str | None) -> str:
+    if pattern is not None:
+        header += f"(匹配 {pattern})"
+    header += f"，文件大小 {result['file_size']} bytes，cursor={result['cursor']}"
+    if result["truncated"]:
+        header += "，结果未完整返回"
+    return "\n".join([f"[{header}]", *result["lines"]])
+
+
+@tool
+def list_archive(
+    archive_path: str, pattern: str | None = None, max_members: int = 200
+) -> str:
+    """列出压缩包(zip、tar、tar.gz、tar.bz2、tar.xz)中的文件，不需要解压
+
+    Args:
+        archive_path (str): 压缩包路径
+        pattern (str | None): 只列出名字匹配该 glob 模式的成员，如 "*.py"、"docs/*"
+        max_members (int): 最多列出的成员数
+
+    Returns:
+        str: 第一行是格式和成员统计，之后每行一个成员: 类型、大小、修改时间、名字
+    """
+    try:
+        listing = list_members(Path(archive_path), pattern, max(max_members, 1))
+        return _describe_archive(listing, pattern)
+    except Exception as e:
+        return f"读取压缩包失败: {e}"
+
+
+def _describe_archive(listing: ArchiveListing, pattern: str | None) -> str:
+    header = f"[{listing['format']} 格式，共 {listing['total']} 个成员"
+    if listing["total_size"]:
+        header += f"，解压后共 {listing['total_size']} bytes"
+    if pattern is not None:
+        header += f"，匹配 {pattern} 的有 {listing['matched']} 个"
+    if listing["matched"] > len(listing["members"]):
+        header += f"，只列出前 {len(listing['members'])} 个"
+    lines = [header + "]"]
+    for member in listing["members"]:
+        size = "?" if member["size"] is None else str(member["size"])
+        lines.append(
+            f"{member['type']:<9} {size:>12} {member['mtime'] or '':<19} {member['name']}"
+        )
+    return "\n".join(lines)
+
+
+@tool
+def read_archive_member(
+    archive_path: str,
+    member: str | None = None,
+    start_line: int | None = None,
+    end_line: int | None = None,
+    offset: int | None = None,
+    length: int | None = None,
+) -> str:
+    """读取压缩包中某个文件的内容，边解压边读取，不会解压到磁盘；也可以读取单个 .gz/.bz2/.xz 压缩文件
+
+    Args:
+        archive_path (str): 压缩包路径
+        member (str | None): 压缩包中的文件名(使用 list_archive 返回的名字)，单个压缩文件不需要传
+        start_line (int | None): 起始行号(从1开始，包含)
+        end_line (int | None): 结束行号(包含)，不传时读取到 start_line 之后的200行
+        offset (int | None): 起始字节偏移，负数表示从文件末尾倒数
+        length (int | None): 读取的字节数，默认4096
+
+    Returns:
+        str: 第一行说明读取的成员和范围，之后是内容；二进制内容以十六进制显示
+    """
+    try:
+        path = Path(archive_path)
+        if start_line is not None or end_line is not None:
+            start = start_line or 1
+            lines = read_member_lines(
+                path, member, start, end_line or start + DEFAULT_WINDOW_LINES - 1
+            )
+            header = f"{lines['member']} 第 {start}-{lines['end_line']} 行"
+            data, base, truncated = lines["data"], None, lines["truncated"]
+        else:
+            if offset is None and length is None:
+                # 不指定范围时与 read_file 一样，只返回开头的一部分
+                result = read_member(path, member, 0, MAX_FULL_READ)
+                end = len(result["data"])
+                if result["size"] is None:
+                    truncated = end == MAX_FULL_READ
+                else:
+                    truncated = end < result["size"]
+            else:
+                result = read_member(path, member, offset or 0, length or 4096)
+                end = result["start"] + len(result["data"])
+                truncated = result["truncated"]
+            header = f"{result['member']} 字节 {result['start']}-{end}"
+            if result["size"] is not None:
+                header += f"，大小 {result['size']} bytes"
+            data, base = result["data"], result["start"]
+        if truncated:
+            header += "，内容未完整返回，请指定范围读取其余部分"
+        if looks_binary(data[:8192]):
+            body = hex_dump(data[:MAX_HEX_BYTES], base or 0)
+            return f"[{header}，二进制内容，最多显示 {MAX_HEX_BYTES} 字节]\n{body}"
+        encoding = detect_encoding(data[:8192], complete=False)
+        return f"[{header}]\n" + data.decode(encoding, errors="replace")
+    except Exception as e:
+        return f"读取压缩包失败: {e}"
+
+
+@tool
+def profile_data_file(
+    file_path: str,
+    max_rows: int | None = None,
+    delimiter: str | None = None,
+    has_header: bool = True,
+    top_n: int = 5,
+) -> str:
+    """流式统计 CSV/TSV/JSONL 数据文件，返回行数、各列类型、空值数、最小/最大/平均值和常见值，不会把文件内容读入上下文，适合很大的数据文件
+
+    Args:
+        file_path (str): 数据文件路径
+        max_rows (int | None): 最多统计的行数，不传时统计整个文件
+        delimiter (str | None): CSV 分隔符，不传时自动识别
+        has_header (bool): CSV 第一行是否是列名，默认是
+        top_n (int): 每列返回的常见值数量，默认5
+
+    Returns:
+        str: 第一行是格式、行数和列数，之后每列一段统计信息
+    """
+    try:
+        profile = profile_table(
+            Path(file_path), max_rows, delimiter, has_header, max(top_n, 0)
+        )
+        header = (
+            f"[{profile['format'].upper()}，编码 {profile['encoding']}，{profile['rows']} 行"
+            f"{'(已达到 max_rows，只统计了部分)' if profile['truncated'] else ''}，"
+            f"{len(profile['columns'])} 列，读取 {profile['bytes_read']} bytes，"
+            f"耗时 {profile['seconds']:.2f}s]"
+        )
+        lines = [header]
+        if profile["columns_skipped"]:
+            lines.append(f"列数过多，另有 {profile['columns_skipped']} 列未统计")
+        if profile["bad_rows"]:
+            lines.append(f"{profile['bad_rows']} 行无法解析，已跳过")
+        for i, column in enumerate(profile["columns"], 1):
+            lines += _describe_column(i, column)
+        return "\n".join(lines)
+    except Exception as e:
+        return f"统计数据文件失败: {e}"
+
+
+def _describe_column(index: int, column: ColumnProfile) -> list[str]:
+    parts = [f"{column['type']}", f"非空 {column['count']}", f"空值 {column['nulls']}"]
+    if column["numeric"]:
+        if column["type"] == "mixed":
+            parts.append(f"其中数值 {column['numeric']}")
+        parts.append(
+            f"最小 {column['min']:g}，最大 {column['max']:g}，平均 {column['mean']:g}"
+        )
+    if column["max_length"]:
+        parts.append(f"最长 {column['max_length']} 字符")
+    distinct = column["distinct"]
+    parts.append(
+        f"不同值 {distinct}" if column["distinct_exact"] else f"不同值 ≥{distinct}"
+    )
+    lines = [f"{index}. {column['name']}: " + "，".join(parts)]
+    if column["samples"]:
+        lines.append("   示例: " + " | ".join(column["samples"]))
+    if column["top"]:
+        lines.append(
+            "   常见值: " + " | ".join(f"{value} ({n})" for value, n in column["top"])
+        )
+    return lines
+
+
 @tool
-def write_file(file_path: str, content: str) -> str:
-    """将内容写入指定文件
+def write_file(
+    file_path: str,
+    content: str,
+    mode: Literal["overwrite", "append", "replace_lines", "patch"] = "overwrite",
+    start_line: int | None = None,
+    end_line: int | None = None,
+) -> str:
+    """将内容写入指定文件，修改大文件时只需传入变化的部分
 
     Args:
         file_path (str): 要写入的文件路径
-        content (str): 要写入的内容
+        content (str): 要写入的内容；patch 模式下为 unified diff
+        mode (str): 写入方式:
+            overwrite 用 content 覆盖整个文件;
+            append 追加到文件末尾;
+            replace_lines 把 start_line 到 end_line 行(包含两端)替换为 content,
+                content 为空时删除这些行, end_line = start_line - 1 时插入到 start_line 行之前;
+            patch 把 content 作为 unified diff(@@ -a,b +c,d @@ 格式)应用到文件
+        start_line (int | None): replace_lines 模式的起始行号(从1开始)
+        end_line (int | None): replace_lines 模式的结束行号，默认等于 start_line
 
     Returns:
         str: 写入结果描述
     """
     try:
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(content)
-        return f"成功写入文件: {file_path}"
+        path = Path(file_path)
+        if mode == "overwrite":
+            write_text(path, content)
+            return f"成功写入文件: {file_path}"
+        if mode == "append":
+            size = append_text(path, content)
+            return f"成功追加 {size} 字节到文件: {file_path}"
+        if mode == "replace_lines":
+            if start_line is None:
+                return "写入文件失败: replace_lines 模式需要 start_line"
+            end = start_line if end_line is None else end_line
+            removed = replace_lines(path, start_line, end, content)
+            added = len(content.splitlines())
+            return f"成功把文件 {file_path} 的 {removed} 行替换为 {added} 行(从第 {start_line} 行开始)"
+        if mode == "patch":
+            stats = apply_patch(path, content)
+            return (
+                f"成功应用补丁到文件: {file_path}，"
+                f"{stats['hunks']} 个修改块，新增 {stats['added']} 行，删除 {stats['removed']} 行"
+            )
+        return f"写入文件失败: 不支持的写入方式 {mode}"
     except Exception as e:
         return f"写入文件失败: {e}"
 
@@ -109,20 +505,247 @@ def rename_file(old_path: str, new_path: str) -> str:
 
 
 @tool
-def excute_python(file: str) -> str:
-    """执行指定的Python脚本文件
+def copy_file(source_path: str, target_path: str, overwrite: bool = False) -> str:
+    """复制文件或整个目录，由操作系统内核完成复制，文件内容不会经过模型，二进制文件也可以复制
 
     Args:
-        file (str): 要执行的Python脚本文件路径, 需要是完整的路径
+        source_path (str): 源文件或目录路径
+        target_path (str): 目标路径(不是目标所在目录)，父目录不存在时会自动创建
+        overwrite (bool): 目标已存在时是否覆盖
 
     Returns:
-        None
+        str: 复制结果描述，包括文件数量和大小
+    """
+    try:
+        source = Path(source_path)
+        target = Path(target_path)
+        if not os.path.lexists(source):
+            return f"源文件不存在: {source_path}"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        stats = copy_tree(source, target, overwrite=overwrite)
+        methods = "，".join(f"{name} {n}" for name, n in stats["methods"].items())
+        result = (
+            f"成功复制到: {target_path}，{stats['files']} 个文件，"
+            f"{stats['dirs']} 个目录，{stats['symlinks']} 个链接，"
+            f"共 {stats['bytes']} bytes(复制方式: {methods or '无'})"
+        )
+        if stats["errors"]:
+            result += "\n以下条目复制失败:\n" + "\n".join(stats["errors"])
+        return result
+    except Exception as e:
+        return f"复制文件失败: {e}"
 
-    Raises:
-        Exception: 如果执行过程中出现错误，则抛出异常
+
+# 批量操作结果中最多列出的条目数
+MAX_LISTED_ITEMS = 20
+
+
+@tool
+def bulk_file_operations(
+    operations: list[BulkOperation] | None = None,
+    op: Literal["create", "delete", "move", "copy"] | None = None,
+    base_dir: str | None = None,
+    pattern: str | None = None,
+    target: str | None = None,
+    dry_run: bool = False,
+) -> str:
+    """一次执行一批文件的创建/删除/移动/复制，代替多次调用 add_file、delete_file、rename_file
+
+    有两种用法:
+    1. operations 直接列出每个操作，如 [{"op": "move", "path": "/a/1.jpg", "target": "/b/1.jpg"}]，
+       create 可以带 "content"
+    2. op + base_dir + pattern 用 glob 选出文件，move/copy 的目标由 target 模板生成，
+       模板可以使用 {name} {stem} {suffix} {parent} 以及按修改时间的 {date} {year} {month}，
+       如 "/photos/{date}/{name}"；target 不含占位符时视为目标目录
+
+    Args:
+        operations (list[BulkOperation] | None): 操作列表，路径都是绝对路径
+        op (str | None): glob 用法的操作类型
+        base_dir (str | None): glob 用法的起始目录(绝对路径)
+        pattern (str | None): glob 模式，如 "*.jpg"、"**/*.log"
+        target (str | None): glob 用法中 move/copy 的目标模板
+        dry_run (bool): 为 True 时只检查并返回执行计划，不修改任何文件
+
+    Returns:
+        str: 成功/失败数量、失败原因，dry_run 时还包括计划执行的操作
+    """
+    try:
+        if operations is None:
+            if op is None or base_dir is None or pattern is None:
+                return "批量操作失败: 需要 operations，或者 op、base_dir 和 pattern"
+            operations = expand_glob(op, Path(base_dir), pattern, target)
+        if not operations:
+            return "没有需要执行的操作"
+        report = run_operations(operations, dry_run=dry_run)
+        return _describe_bulk_report(report)
+    except Exception as e:
+        return f"批量操作失败: {e}"
+
+
+def _describe_bulk_report(report: BulkReport) -> str:
+    results = report["results"]
+    counts: dict[str, int] = {}
+    for item in results:
+        if item["ok"]:
+            counts[item["op"]] = counts.get(item["op"], 0) + 1
+    by_op = "，".join(f"{name} {n}" for name, n in counts.items())
+    if report["dry_run"]:
+        lines = [
+            f"执行计划(未执行): 共 {len(results)} 个操作，可以执行 {report['succeeded']} 个"
+            f"({by_op or '无'})，不能执行 {report['failed']} 个"
+        ]
+    else:
+        lines = [
+            f"批量操作完成: 共 {len(results)} 个操作，成功 {report['succeeded']} 个"
+            f"({by_op or '无'})，失败 {report['failed']} 个"
+        ]
+
+    def describe(item: ItemResult) -> str:
+        text = f"{item['op']} {item['path']}"
+        if item["target"]:
+            text += f" -> {item['target']}"
+        return text
+
+    failed = [item for item in results if not item["ok"]]
+    if failed:
+        lines.append("失败:" if not report["dry_run"] else "不能执行:")
+        lines.extend(
+            f"  {describe(item)}: {item['error']}" for item in failed[:MAX_LISTED_ITEMS]
+        )
+        if len(failed) > MAX_LISTED_ITEMS:
+            lines.append(f"  ...另外 {len(failed) - MAX_LISTED_ITEMS} 个")
+    if report["dry_run"]:
+        planned = [item for item in results if item["ok"]]
+        if planned:
+            lines.append("计划执行:")
+            lines.extend(f"  {describe(item)}" for item in planned[:MAX_LISTED_ITEMS])
+            if len(planned) > MAX_LISTED_ITEMS:
+                lines.append(f"  ...另外 {len(planned) - MAX_LISTED_ITEMS} 个")
+    return "\n".join(lines)
+
+
+# 脚本运行时间上限，避免模型传入过大的超时时间
+MAX_SCRIPT_TIMEOUT = 600
+# 预热进程池中工作进程的内存上限(MB)，也是 excute_python 的默认内存上限
+POOL_MAX_MEMORY_MB = 2048
+
+_POOL_MEMORY_ERROR = (
+    "执行Python脚本失败: reuse_interpreter=True 时工作进程的内存上限固定为 "
+    f"{POOL_MAX_MEMORY_MB}MB，不能使用 max_memory_mb={{}}；"
+    "需要其他内存上限时请去掉 reuse_interpreter"
+)
+
+_worker_pool: WorkerPool | None = None
+_worker_pool_lock = threading.Lock()
+
+
+def _get_worker_pool() -> WorkerPool:
+    """第一次使用时创建预热进程池，环境变量 FILE_SYSTEM_AGENT_PRELOAD 可以指定预先导入的模块(逗号分隔)"""
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            preload = os.environ.get("FILE_SYSTEM_AGENT_PRELOAD", "")
+            _worker_pool = WorkerPool(
+                max_memory_mb=POOL_MAX_MEMORY_MB,
+                preload=tuple(
+                    name.strip() for name in preload.split(",") if name.strip()
+                ),
+            )
+            atexit.register(_worker_pool.close)
+        return _worker_pool
+
+
+def _excute_python(
+    file: str,
+    args: list[str] | None = None,
+    timeout_seconds: float = 60,
+    max_memory_mb: int = POOL_MAX_MEMORY_MB,
+    reuse_interpreter: bool = False,
+) -> str:
+    """在独立的子进程中执行指定的Python脚本文件，返回退出码、耗时和输出的最后部分
+
+    Args:
+        file (str): 要执行的Python脚本文件路径, 需要是完整的路径
+        args (list[str] | None): 传给脚本的命令行参数
+        timeout_seconds (float): 超时秒数，超时后脚本会被终止，不超过600秒
+        max_memory_mb (int): 脚本可使用的内存上限(MB)，reuse_interpreter 为 True 时只能使用默认值
+        reuse_interpreter (bool): 在预先启动的Python进程中执行，省去启动解释器和导入模块的时间，
+            适合反复执行的小脚本；全局变量不会保留到下一次，但已导入的模块会保留
+
+    Returns:
+        str: 执行结果，包括退出码、耗时以及 stdout/stderr 的最后部分
     """
     try:
-        os.system(f'python "{file}"')
-        return f"成功执行Python脚本: {file}"
+        script = Path(file)
+        if not script.is_file():
+            return f"执行Python脚本失败: 文件不存在 {file}"
+        timeout = min(timeout_seconds, MAX_SCRIPT_TIMEOUT)
+        if reuse_interpreter:
+            if max_memory_mb != POOL_MAX_MEMORY_MB:
+                return _POOL_MEMORY_ERROR.format(max_memory_mb)
+            result = _get_worker_pool().run(script, args, timeout)
+        else:
+            result = run_script(script, args, timeout, max_memory_mb)
+        return _describe_run(file, result)
+    except Exception as e:
+        return f"执行Python脚本失败: {e}"
+
+
+async def _aexcute_python(
+    file: str,
+    args: list[str] | None = None,
+    timeout_seconds: float = 60,
+    max_memory_mb: int = POOL_MAX_MEMORY_MB,
+    reuse_interpreter: bool = False,
+) -> str:
+    try:
+        script = Path(file)
+        if not script.is_file():
+            return f"执行Python脚本失败: 文件不存在 {file}"
+        timeout = min(timeout_seconds, MAX_SCRIPT_TIMEOUT)
+        if reuse_interpreter:
+            if max_memory_mb != POOL_MAX_MEMORY_MB:
+                return _POOL_MEMORY_ERROR.format(max_memory_mb)
+            result = await _get_worker_pool().run_async(script, args, timeout)
+        else:
+            result = await run_script_async(script, args, timeout, max_memory_mb)
+        return _describe_run(file, result)
     except Exception as e:
         return f"执行Python脚本失败: {e}"
+
+
+def _describe_run(file: str, result: RunResult | PoolRunResult) -> str:
+    duration = f"{result['duration']:.2f}s"
+    if "exec_time" in result:
+        duration += (
+            f"，其中等待解释器启动 {result['startup_time']:.2f}s，"
+            f"执行 {result['exec_time']:.2f}s"
+        )
+    if result["timed_out"]:
+        header = f"执行Python脚本超时，已终止: {file}(用时 {duration})"
+    elif result["exit_code"] == 0:
+        header = f"成功执行Python脚本: {file}(退出码 0，用时 {duration})"
+    elif result["exit_code"] is not None and result["exit_code"] < 0:
+        header = (
+            f"执行Python脚本失败: {file} 被信号 {-result['exit_code']} 终止"
+            f"(用时 {duration}，可能超出了内存或CPU时间限制)"
+        )
+    else:
+        header = (
+            f"执行Python脚本失败: {file}(退出码 {result['exit_code']}，用时 {duration})"
+        )
+    if not result["output"]:
+        return header + "\n(没有输出)"
+    if result["dropped_bytes"]:
+        header += (
+            f"\n输出过长，省略了前 {result['dropped_bytes']} 字节，以下是最后部分:"
+        )
+    else:
+        header += "\n输出:"
+    return header + "\n" + result["output"]
+
+
+# 同时提供同步和异步实现，在异步调用 agent 时执行脚本不会阻塞事件循环
+excute_python = StructuredTool.from_function(
+    func=_excute_python, coroutine=_aexcute_python, name="excute_python"
+)
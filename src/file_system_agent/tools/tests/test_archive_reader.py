@@ -0,0 +1,123 @@
+# type: ignore
+"""
+测试 archive_reader 压缩包流式读取
+"""
+
+import bz2
+import gzip
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from ..src.file_system_tools.archive_reader import (
+    detect_format,
+    list_members,
+    read_member,
+    read_member_lines,
+)
+
+CONTENT = "".join(f"line {i}\n" for i in range(1, 1001)).encode()
+
+
+@pytest.fixture
+def archives(tmp_path):
+    """同样内容的 zip、tar.gz、tar.xz、gz、bz2"""
+    paths = {}
+    paths["zip"] = tmp_path / "pkg.zip"
+    with zipfile.ZipFile(paths["zip"], "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("pkg/", "")
+        zf.writestr("pkg/data.txt", CONTENT)
+        zf.writestr("pkg/readme.md", b"# readme\n")
+    for mode, suffix in (("w:gz", "tar.gz"), ("w:xz", "tar.xz")):
+        path = tmp_path / f"pkg.{suffix}"
+        with tarfile.open(path, mode) as tar:
+            for name, data in (("pkg/data.txt", CONTENT), ("pkg/readme.md", b"#\n")):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        paths[suffix] = path
+    paths["gz"] = tmp_path / "data.txt.gz"
+    paths["gz"].write_bytes(gzip.compress(CONTENT))
+    paths["bz2"] = tmp_path / "data.txt.bz2"
+    paths["bz2"].write_bytes(bz2.compress(CONTENT))
+    return paths
+
+
+class TestListMembers:
+    """测试列出成员"""
+
+    def test_formats(self, archives):
+        assert detect_format(archives["zip"]) == "zip"
+        assert detect_format(archives["tar.gz"]) == "tar"
+        assert detect_format(archives["tar.xz"]) == "tar"
+        assert detect_format(archives["gz"]) == "gz"
+        assert detect_format(archives["bz2"]) == "bz2"
+
+    def test_not_archive(self, tmp_path):
+        path = tmp_path / "plain.txt"
+        path.write_text("hello")
+        with pytest.raises(ValueError):
+            detect_format(path)
+
+    def test_zip(self, archives):
+        listing = list_members(archives["zip"])
+        assert listing["total"] == 3
+        assert listing["total_size"] == len(CONTENT) + 9
+        kinds = {m["name"]: m["type"] for m in listing["members"]}
+        assert kinds["pkg/"] == "directory"
+        assert kinds["pkg/data.txt"] == "file"
+
+    def test_tar_pattern_and_limit(self, archives):
+        listing = list_members(archives["tar.gz"], pattern="*.txt")
+        assert listing["matched"] == 1
+        assert listing["members"][0]["size"] == len(CONTENT)
+        listing = list_members(archives["tar.gz"], max_members=1)
+        assert listing["total"] == 2 and len(listing["members"]) == 1
+
+    def test_single_compressed_file(self, archives):
+        listing = list_members(archives["gz"])
+        assert [m["name"] for m in listing["members"]] == ["data.txt"]
+        assert listing["members"][0]["size"] is None
+
+
+class TestReadMember:
+    """测试读取成员内容"""
+
+    @pytest.mark.parametrize("kind", ["zip", "tar.gz", "tar.xz", "gz", "bz2"])
+    def test_lines(self, archives, kind):
+        member = None if kind in ("gz", "bz2") else "pkg/data.txt"
+        result = read_member_lines(archives[kind], member, 999, 1005)
+        assert result["data"] == b"line 999\nline 1000\n"
+        assert result["end_line"] == 1000
+
+    def test_byte_range(self, archives):
+        result = read_member(archives["tar.gz"], "pkg/data.txt", 7, 6)
+        assert result["data"] == b"line 2"
+        assert result["start"] == 7
+
+    def test_negative_offset(self, archives):
+        result = read_member(archives["zip"], "pkg/data.txt", -10, 100)
+        assert result["data"] == b"line 1000\n"
+        with pytest.raises(ValueError):
+            read_member(archives["gz"], None, -10, 100)
+
+    def test_lines_truncated(self, archives):
+        result = read_member_lines(archives["zip"], "pkg/data.txt", 1, 1000, 20)
+        assert result["truncated"]
+        assert len(result["data"]) == 20
+
+    def test_missing_member(self, archives):
+        with pytest.raises(KeyError):
+            read_member(archives["tar.gz"], "pkg/missing.txt")
+        with pytest.raises(KeyError):
+            read_member(archives["zip"], "pkg/missing.txt")
+
+    def test_directory_member(self, archives):
+        with pytest.raises(IsADirectoryError):
+            read_member(archives["zip"], "pkg/")
+
+    def test_zip_requires_member_when_ambiguous(self, archives):
+        with pytest.raises(ValueError):
+            read_member(archives["zip"])
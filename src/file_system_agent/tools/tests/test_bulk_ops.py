@@ -0,0 +1,179 @@
+# type: ignore
+"""
+测试 bulk_ops 批量文件操作
+"""
+
+import os
+import time
+
+import pytest
+
+from ..src.file_system_tools.bulk_ops import expand_glob, run_operations
+
+
+@pytest.fixture
+def photos(tmp_path):
+    for i in range(5):
+        path = tmp_path / f"img_{i}.jpg"
+        path.write_text(str(i))
+        day = time.mktime((2024, 1, 1 + i % 2, 12, 0, 0, 0, 0, -1))
+        os.utime(path, (day, day))
+    (tmp_path / "notes.txt").write_text("notes")
+    return tmp_path
+
+
+class TestRun:
+    """测试执行操作"""
+
+    def test_mixed(self, tmp_path):
+        (tmp_path / "a.txt").write_text("a")
+        (tmp_path / "b.txt").write_text("b")
+        report = run_operations(
+            [
+                {
+                    "op": "create",
+                    "path": str(tmp_path / "new" / "c.txt"),
+                    "content": "c",
+                },
+                {
+                    "op": "copy",
+                    "path": str(tmp_path / "a.txt"),
+                    "target": str(tmp_path / "x" / "a.txt"),
+                },
+                {
+                    "op": "move",
+                    "path": str(tmp_path / "b.txt"),
+                    "target": str(tmp_path / "y" / "b.txt"),
+                },
+            ]
+        )
+        assert report["succeeded"] == 3 and report["failed"] == 0
+        assert (tmp_path / "new" / "c.txt").read_text() == "c"
+        assert (tmp_path / "x" / "a.txt").read_text() == "a"
+        assert (tmp_path / "a.txt").exists()
+        assert not (tmp_path / "b.txt").exists()
+
+        report = run_operations([{"op": "delete", "path": str(tmp_path / "a.txt")}])
+        assert report["succeeded"] == 1
+        assert not (tmp_path / "a.txt").exists()
+
+    def test_per_item_errors(self, tmp_path):
+        (tmp_path / "a.txt").write_text("a")
+        (tmp_path / "exists.txt").write_text("keep")
+        report = run_operations(
+            [
+                {
+                    "op": "move",
+                    "path": str(tmp_path / "a.txt"),
+                    "target": str(tmp_path / "exists.txt"),
+                },
+                {"op": "delete", "path": str(tmp_path / "missing.txt")},
+                {"op": "delete", "path": str(tmp_path)},
+                {"op": "create", "path": "relative.txt"},
+                {"op": "chmod", "path": str(tmp_path / "a.txt")},
+            ]
+        )
+        assert report["succeeded"] == 0
+        errors = [r["error"] for r in report["results"]]
+        assert errors == [
+            "目标已存在",
+            "源路径不存在",
+            "不能批量删除目录",
+            "路径必须是绝对路径",
+            "不支持的操作: chmod",
+        ]
+        assert (tmp_path / "exists.txt").read_text() == "keep"
+
+    def test_conflicting_paths(self, tmp_path):
+        """同一路径出现在多个操作中时全部跳过"""
+        (tmp_path / "a.txt").write_text("a")
+        report = run_operations(
+            [
+                {
+                    "op": "copy",
+                    "path": str(tmp_path / "a.txt"),
+                    "target": str(tmp_path / "b.txt"),
+                },
+                {"op": "delete", "path": str(tmp_path / "a.txt")},
+            ]
+        )
+        assert report["failed"] == 2
+        assert (tmp_path / "a.txt").exists()
+
+    def test_nested_paths(self, tmp_path):
+        """一个操作的路径是另一个操作路径的上级目录时，两个操作都跳过"""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "x.txt").write_text("x")
+        (tmp_path / "other.txt").write_text("o")
+        report = run_operations(
+            [
+                {
+                    "op": "move",
+                    "path": str(tmp_path / "a"),
+                    "target": str(tmp_path / "b"),
+                },
+                {"op": "delete", "path": str(tmp_path / "a" / "x.txt")},
+                # 目标位于另一个操作的目标之下同样冲突
+                {"op": "create", "path": str(tmp_path / "b" / "new.txt")},
+                {"op": "delete", "path": str(tmp_path / "other.txt")},
+            ]
+        )
+        assert [r["ok"] for r in report["results"]] == [False, False, False, True]
+        assert "包含关系" in report["results"][0]["error"]
+        assert (tmp_path / "a" / "x.txt").exists()
+        assert not (tmp_path / "b").exists()
+
+    def test_dry_run(self, tmp_path):
+        (tmp_path / "a.txt").write_text("a")
+        report = run_operations(
+            [{"op": "delete", "path": str(tmp_path / "a.txt")}], dry_run=True
+        )
+        assert report["dry_run"] and report["succeeded"] == 1
+        assert (tmp_path / "a.txt").exists()
+
+    def test_copy_into_itself(self, tmp_path):
+        (tmp_path / "d").mkdir()
+        report = run_operations(
+            [
+                {
+                    "op": "copy",
+                    "path": str(tmp_path / "d"),
+                    "target": str(tmp_path / "d" / "sub"),
+                }
+            ]
+        )
+        assert report["failed"] == 1
+
+
+class TestGlob:
+    """测试 glob 展开和目标模板"""
+
+    def test_dated_folders(self, photos):
+        operations = expand_glob(
+            "move", photos, "*.jpg", str(photos / "{date}" / "{name}")
+        )
+        assert len(operations) == 5
+        report = run_operations(operations)
+        assert report["succeeded"] == 5
+        assert sorted(os.listdir(photos / "2024-01-01")) == [
+            "img_0.jpg",
+            "img_2.jpg",
+            "img_4.jpg",
+        ]
+        assert sorted(os.listdir(photos / "2024-01-02")) == ["img_1.jpg", "img_3.jpg"]
+
+    def test_target_directory(self, photos):
+        operations = expand_glob("copy", photos, "*.txt", str(photos / "backup"))
+        assert operations == [
+            {
+                "op": "copy",
+                "path": str(photos / "notes.txt"),
+                "target": str(photos / "backup" / "notes.txt"),
+            }
+        ]
+
+    def test_missing_target(self, photos):
+        with pytest.raises(ValueError):
+            expand_glob("move", photos, "*.jpg")
+        with pytest.raises(ValueError):
+            expand_glob("move", photos, "*.jpg", "/x/{unknown}")
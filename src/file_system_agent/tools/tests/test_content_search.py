@@ -0,0 +1,156 @@
+# type: ignore
+"""
+测试 content_search 内容搜索和 gitignore 匹配
+"""
+
+import pytest
+
+from ..src.file_system_tools import content_search
+from ..src.file_system_tools.content_search import iter_search_files, search_contents
+from ..src.file_system_tools.gitignore import IgnoreMatcher
+
+
+@pytest.fixture
+def repo(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "build").mkdir()
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".gitignore").write_text("build/\n*.log\n!keep.log\n/top.txt\n")
+    (tmp_path / "src" / "a.py").write_text(
+        "import os\n\ndef main():\n    return 'TODO'\n"
+    )
+    (tmp_path / "src" / "b.txt").write_text("nothing here\nTODO: later\n")
+    (tmp_path / "src" / "top.txt").write_text("TODO nested top\n")
+    (tmp_path / "top.txt").write_text("TODO ignored\n")
+    (tmp_path / "build" / "out.py").write_text("TODO ignored\n")
+    (tmp_path / "app.log").write_text("TODO ignored\n")
+    (tmp_path / "keep.log").write_text("TODO kept\n")
+    (tmp_path / ".git" / "HEAD").write_text("TODO ignored\n")
+    (tmp_path / "image.bin").write_bytes(b"\x89PNG\0\0TODO")
+    return tmp_path
+
+
+class TestGitIgnore:
+    """测试 .gitignore 规则"""
+
+    def test_rules(self, repo):
+        """测试目录规则、通配、取反和锚定"""
+        matcher = IgnoreMatcher().descend(repo)
+
+        assert matcher.is_ignored(repo / "build", is_dir=True)
+        assert not matcher.is_ignored(repo / "build", is_dir=False)
+        assert matcher.is_ignored(repo / "app.log", is_dir=False)
+        assert not matcher.is_ignored(repo / "keep.log", is_dir=False)
+        assert matcher.is_ignored(repo / "top.txt", is_dir=False)
+        assert not matcher.is_ignored(repo / "src" / "top.txt", is_dir=False)
+        assert matcher.is_ignored(repo / ".git", is_dir=True)
+
+    def test_double_star(self, tmp_path):
+        """测试 ** 通配"""
+        (tmp_path / ".gitignore").write_text("docs/**/*.tmp\n")
+        matcher = IgnoreMatcher().descend(tmp_path)
+
+        assert matcher.is_ignored(tmp_path / "docs" / "a" / "b" / "x.tmp", False)
+        assert matcher.is_ignored(tmp_path / "docs" / "x.tmp", False)
+        assert not matcher.is_ignored(tmp_path / "other" / "x.tmp", False)
+
+    def test_files_walk(self, repo):
+        """测试遍历时应用忽略规则"""
+        files = {p.relative_to(repo).as_posix() for p in iter_search_files(repo)}
+        assert files == {
+            ".gitignore",
+            "keep.log",
+            "image.bin",
+            "src/a.py",
+            "src/b.txt",
+            "src/top.txt",
+        }
+
+    def test_parent_gitignore_applies(self, repo):
+        """测试从子目录开始搜索时，根目录的 .gitignore 依然生效"""
+        (repo / "src" / "debug.log").write_text("x")
+        files = {p.name for p in iter_search_files(repo / "src", root=repo)}
+        assert "debug.log" not in files
+
+
+class TestSearchContents:
+    """测试内容搜索"""
+
+    def test_matches_with_line_numbers(self, repo):
+        """测试返回命中行及行号，跳过二进制文件和被忽略的文件"""
+        result = search_contents(repo, "TODO")
+
+        found = {
+            (m["path"].removeprefix(str(repo) + "/"), m["line_number"], m["line"])
+            for m in result["matches"]
+        }
+        assert found == {
+            ("keep.log", 1, "TODO kept"),
+            ("src/a.py", 4, "    return 'TODO'"),
+            ("src/b.txt", 2, "TODO: later"),
+            ("src/top.txt", 1, "TODO nested top"),
+        }
+        assert result["binary_skipped"] == 1
+        assert result["truncated"] is False
+
+    def test_fixed_string_and_ignore_case(self, repo):
+        """测试普通字符串匹配和忽略大小写"""
+        result = search_contents(repo, "main()", fixed_string=True)
+        assert [m["line_number"] for m in result["matches"]] == [3]
+
+        result = search_contents(repo, "todo", ignore_case=True, file_glob="*.py")
+        assert len(result["matches"]) == 1
+
+    def test_non_ascii_pattern(self, tmp_path):
+        """非 ASCII 的字符类和忽略大小写按字符匹配"""
+        (tmp_path / "a.txt").write_text("第一行\n待办: 修复\nÄPFEL\n", encoding="utf-8")
+
+        result = search_contents(tmp_path, "[待办]+:")
+        assert [(m["line_number"], m["line"]) for m in result["matches"]] == [
+            (2, "待办: 修复")
+        ]
+        result = search_contents(tmp_path, "äpfel", ignore_case=True)
+        assert [m["line_number"] for m in result["matches"]] == [3]
+        result = search_contents(tmp_path, "第.行")
+        assert [m["line_number"] for m in result["matches"]] == [1]
+
+    def test_max_matches(self, tmp_path):
+        """测试达到命中上限后提前停止"""
+        for i in range(20):
+            (tmp_path / f"{i}.txt").write_text("hit\n" * 50)
+
+        result = search_contents(tmp_path, "hit", max_matches=30, max_workers=2)
+
+        assert len(result["matches"]) == 30
+        assert result["truncated"] is True
+
+    def test_exactly_max_matches(self, tmp_path):
+        """命中数恰好等于上限时不算截断"""
+        for i in range(3):
+            (tmp_path / f"{i}.txt").write_text("hit\n" * 10)
+
+        result = search_contents(tmp_path, "hit", max_matches=30, max_workers=2)
+        assert len(result["matches"]) == 30
+        assert result["truncated"] is False
+
+        result = search_contents(tmp_path, "hit", max_matches=10, max_workers=1)
+        assert len(result["matches"]) == 10
+        assert result["truncated"] is True
+
+    def test_line_numbers_across_chunks(self, tmp_path, monkeypatch):
+        """换行符分块统计时行号仍然正确，超长行被截断"""
+        monkeypatch.setattr(content_search, "COUNT_CHUNK", 7)
+        (tmp_path / "a.txt").write_text(
+            "x\n" * 100 + "hit\n" + "y\n" * 50 + "hit" * 500
+        )
+
+        result = search_contents(tmp_path, "hit")
+
+        assert [m["line_number"] for m in result["matches"]] == [101, 152]
+        assert result["matches"][1]["line"].endswith("...")
+        assert len(result["matches"][1]["line"]) == content_search.MAX_LINE_CHARS + 3
+
+    def test_invalid_regex(self, repo):
+        """测试无效正则抛出 ValueError"""
+        with pytest.raises(ValueError, match="无效的正则表达式"):
+            search_contents(repo, "(")
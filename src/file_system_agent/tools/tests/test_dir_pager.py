@@ -0,0 +1,83 @@
+# type: ignore
+"""
+测试 dir_pager 目录分页
+"""
+
+import pytest
+
+from ..src.file_system_tools.dir_pager import page_entries
+
+
+def make_entries(count):
+    """生成 count 个文件元信息，大小各不相同"""
+    for i in range(count):
+        yield {
+            "file_name": f"f{i:03d}",
+            "full_name": f"f{i:03d}",
+            "file_type": "directory" if i % 5 == 0 else "file",
+            "size": (i * 37) % 101,
+            "target": None,
+        }
+
+
+class TestPageEntries:
+    """测试分页逻辑"""
+
+    def test_unsorted_pages(self):
+        """测试不排序时按 offset 翻页，且能遍历到全部条目"""
+        seen = []
+        cursor = None
+        while True:
+            page = page_entries(make_entries(23), page_size=10, cursor=cursor)
+            seen.extend(item["file_name"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == [f"f{i:03d}" for i in range(23)]
+        assert page["total"] == 23
+
+    def test_unsorted_stops_early(self):
+        """测试不排序时只消费一页所需的条目"""
+        entries = make_entries(1000)
+        page_entries(entries, page_size=10)
+        assert len(list(entries)) == 1000 - 11
+
+    @pytest.mark.parametrize("sort_key", ["name", "size", "type"])
+    def test_sorted_pages_cover_everything(self, sort_key):
+        """测试排序翻页结果与完整排序一致"""
+        seen = []
+        cursor = None
+        while True:
+            page = page_entries(
+                make_entries(57), page_size=8, cursor=cursor, sort_key=sort_key
+            )
+            seen.extend(page["items"])
+            assert page["total"] == 57
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert len(seen) == 57
+        assert len({item["file_name"] for item in seen}) == 57
+        if sort_key == "size":
+            sizes = [item["size"] for item in seen]
+            assert sizes == sorted(sizes, reverse=True)
+        if sort_key == "type":
+            assert seen[0]["file_type"] == "directory"
+            assert seen[-1]["file_type"] == "file"
+
+    def test_largest_n(self):
+        """测试按大小排序的第一页就是最大的 N 项"""
+        page = page_entries(make_entries(200), page_size=3, sort_key="size")
+        expected = sorted(make_entries(200), key=lambda x: -x["size"])[:3]
+        assert [x["size"] for x in page["items"]] == [x["size"] for x in expected]
+
+    def test_invalid_arguments(self):
+        """测试非法参数会抛出 ValueError"""
+        with pytest.raises(ValueError):
+            page_entries(make_entries(3), page_size=0)
+        with pytest.raises(ValueError, match="不支持的排序方式"):
+            page_entries(make_entries(3), sort_key="mtime")
+        with pytest.raises(ValueError, match="无效的游标"):
+            page_entries(make_entries(3), cursor="abc")
+        with pytest.raises(ValueError, match="不匹配"):
+            page_entries(make_entries(3), cursor='["f001"]', sort_key="size")
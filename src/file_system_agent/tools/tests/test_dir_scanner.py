@@ -0,0 +1,60 @@
+# type: ignore
+"""
+测试 dir_scanner 目录列举引擎
+"""
+
+import pytest
+from pathlib import Path
+
+from ..src.file_system_tools.dir_scanner import scan_dir
+
+
+class TestScanDir:
+    """测试 scan_dir 生成的元信息"""
+
+    def test_scan_types(self, tmp_path):
+        """测试文件和目录的类型判断"""
+        (tmp_path / "a.txt").write_text("hello")
+        (tmp_path / "sub").mkdir()
+
+        result = {item["file_name"]: item for item in scan_dir(tmp_path)}
+
+        assert result["a.txt"]["file_type"] == "file"
+        assert result["a.txt"]["size"] == 5
+        assert result["a.txt"]["full_name"] == "a.txt"
+        assert result["sub"]["file_type"] == "directory"
+        assert result["sub"]["target"] is None
+
+    def test_scan_symlink(self, tmp_path):
+        """测试符号链接会被识别为 link，大小跟随目标"""
+        real = tmp_path / "real.txt"
+        real.write_text("content")
+        try:
+            (tmp_path / "link.txt").symlink_to(real)
+        except OSError:
+            pytest.skip("无法创建符号链接，可能是权限问题")
+
+        result = {item["file_name"]: item for item in scan_dir(tmp_path)}
+
+        assert result["link.txt"]["file_type"] == "link"
+        assert result["link.txt"]["target"] == "real.txt"
+        assert result["link.txt"]["full_name"] == "real.txt"
+        assert result["link.txt"]["size"] == len("content")
+
+    def test_scan_broken_symlink(self, tmp_path):
+        """测试断开的符号链接不会导致遍历失败"""
+        try:
+            (tmp_path / "broken").symlink_to(tmp_path / "missing")
+        except OSError:
+            pytest.skip("无法创建符号链接，可能是权限问题")
+
+        result = list(scan_dir(tmp_path))
+
+        assert len(result) == 1
+        assert result[0]["file_type"] == "link"
+        assert result[0]["target"] == "missing"
+
+    def test_scan_nonexistent_dir(self, tmp_path):
+        """测试遍历不存在的目录会抛出 FileNotFoundError"""
+        with pytest.raises(FileNotFoundError):
+            list(scan_dir(Path(tmp_path / "nowhere")))
@@ -4,15 +4,10 @@
 """
 
 import pytest
-import sys
 import os
 from pathlib import Path
 
-# 添加项目路径到 sys.path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
-
-from ..src.file_system_tools.working_dir import WorkingDir  # noqa: E402
+from ..src.file_system_tools.working_dir import WorkingDir
 
 
 class TestWorkingDirInit:
@@ -103,6 +98,24 @@ class TestChangeToChildDir:
             # Windows 上可能没有权限创建符号链接，跳过此测试
             pytest.skip("无法创建符号链接，可能是权限问题")
 
+    def test_change_to_non_direct_child(self, tmp_path):
+        """测试跨层级或向上跳转的路径，应该抛出 FileNotFoundError"""
+        nested = tmp_path / "a" / "b"
+        nested.mkdir(parents=True)
+        (tmp_path / "a" / "c").mkdir()
+
+        wd = WorkingDir(tmp_path)
+
+        with pytest.raises(FileNotFoundError, match="不存在子目录"):
+            wd.change_to_child_dir(nested)
+
+        wd.change_to_child_dir(tmp_path / "a")
+        with pytest.raises(FileNotFoundError, match="不存在子目录"):
+            wd.change_to_child_dir(wd.where / "..")
+        with pytest.raises(FileNotFoundError, match="不存在子目录"):
+            wd.change_to_child_dir(wd.where / "b" / ".." / "c")
+        assert wd.where == tmp_path / "a"
+
     def test_change_to_nested_child(self, tmp_path):
         """测试连续切换到嵌套的子目录"""
         # 创建嵌套目录结构
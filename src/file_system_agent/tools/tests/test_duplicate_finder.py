@@ -0,0 +1,95 @@
+# type: ignore
+"""
+测试 duplicate_finder 重复文件查找
+"""
+
+import os
+
+import pytest
+
+from ..src.file_system_tools.duplicate_finder import (
+    PARTIAL_SIZE,
+    HashCache,
+    find_duplicates,
+)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """包含小文件、大文件重复以及大小相同但内容不同的文件"""
+    root = tmp_path / "root"
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "one.txt").write_bytes(b"same content")
+    (root / "a" / "two.txt").write_bytes(b"same content")
+    (root / "a" / "b" / "other.txt").write_bytes(b"diff content")
+    big = os.urandom(3 * PARTIAL_SIZE)
+    (root / "big1.bin").write_bytes(big)
+    (root / "a" / "big2.bin").write_bytes(big)
+    # 开头和结尾相同、中间不同，需要完整哈希才能区分
+    changed = bytearray(big)
+    changed[len(big) // 2] ^= 0xFF
+    (root / "a" / "b" / "big3.bin").write_bytes(bytes(changed))
+    (root / "empty1").write_bytes(b"")
+    (root / "empty2").write_bytes(b"")
+    (root / "unique.dat").write_bytes(b"x" * 999)
+    return root
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HashCache(tmp_path / "hashes.sqlite3")
+    yield cache
+    cache.close()
+
+
+def group_names(report):
+    return [sorted(os.path.basename(p) for p in g["paths"]) for g in report["groups"]]
+
+
+class TestFindDuplicates:
+    """测试重复文件分组"""
+
+    def test_groups(self, tree):
+        report = find_duplicates(tree)
+        assert group_names(report) == [["big1.bin", "big2.bin"], ["one.txt", "two.txt"]]
+        assert report["wasted"] == 3 * PARTIAL_SIZE + len(b"same content")
+        # 空文件被忽略，大小唯一的文件不参与哈希
+        assert report["files_scanned"] == 7
+        assert report["candidates"] == 6
+
+    def test_partial_hash_avoids_full_read(self, tree):
+        """大小相同但开头不同的大文件只读取部分内容"""
+        (tree / "a" / "big2.bin").write_bytes(os.urandom(3 * PARTIAL_SIZE))
+        (tree / "a" / "b" / "big3.bin").unlink()
+        report = find_duplicates(tree)
+        assert group_names(report) == [["one.txt", "two.txt"]]
+        assert report["bytes_read"] <= 4 * 2 * PARTIAL_SIZE
+
+    def test_min_size(self, tree):
+        report = find_duplicates(tree, min_size=1000)
+        assert group_names(report) == [["big1.bin", "big2.bin"]]
+
+    def test_hardlinks_are_not_duplicates(self, tree):
+        os.link(tree / "unique.dat", tree / "a" / "unique_link.dat")
+        report = find_duplicates(tree)
+        assert report["hardlinks_skipped"] == 1
+        assert all("unique.dat" not in names for names in group_names(report))
+
+
+class TestHashCache:
+    """测试哈希缓存"""
+
+    def test_rerun_uses_cache(self, tree, cache):
+        first = find_duplicates(tree, cache=cache)
+        assert first["bytes_read"] > 0
+        second = find_duplicates(tree, cache=cache)
+        assert second["bytes_read"] == 0
+        assert second["cache_hits"] == first["candidates"]
+        assert group_names(second) == group_names(first)
+
+    def test_modified_file_is_rehashed(self, tree, cache):
+        find_duplicates(tree, cache=cache)
+        (tree / "a" / "two.txt").write_bytes(b"new! content")
+        report = find_duplicates(tree, cache=cache)
+        assert group_names(report) == [["big1.bin", "big2.bin"]]
+        assert report["bytes_read"] > 0
@@ -0,0 +1,153 @@
+# type: ignore
+"""
+测试 fast_copy 文件和目录复制
+"""
+
+import errno
+import os
+import shutil
+
+import pytest
+
+from ..src.file_system_tools import fast_copy
+from ..src.file_system_tools.fast_copy import copy_file, copy_tree
+
+
+@pytest.fixture
+def tree(tmp_path):
+    src = tmp_path / "src"
+    (src / "sub" / "deep").mkdir(parents=True)
+    (src / "a.bin").write_bytes(bytes(range(256)) * 1000)
+    (src / "sub" / "b.txt").write_text("hello")
+    (src / "sub" / "deep" / "empty").write_bytes(b"")
+    (src / "link").symlink_to("a.bin")
+    os.chmod(src / "sub" / "b.txt", 0o640)
+    return src
+
+
+class TestCopyFile:
+    """测试单个文件复制"""
+
+    def test_binary(self, tree, tmp_path):
+        method = copy_file(tree / "a.bin", tmp_path / "a.bin")
+        assert method in ("reflink", "copy_file_range", "sendfile", "read_write")
+        assert (tmp_path / "a.bin").read_bytes() == (tree / "a.bin").read_bytes()
+
+    def test_metadata(self, tree, tmp_path):
+        copy_file(tree / "sub" / "b.txt", tmp_path / "b.txt")
+        assert os.stat(tmp_path / "b.txt").st_mode & 0o777 == 0o640
+        assert (
+            os.stat(tmp_path / "b.txt").st_mtime_ns
+            == os.stat(tree / "sub" / "b.txt").st_mtime_ns
+        )
+
+    def test_symlink(self, tree, tmp_path):
+        assert copy_file(tree / "link", tmp_path / "link") == "symlink"
+        assert os.readlink(tmp_path / "link") == "a.bin"
+
+    def test_overwrite(self, tree, tmp_path):
+        (tmp_path / "b.txt").write_text("old content that is longer")
+        with pytest.raises(FileExistsError):
+            copy_file(tree / "sub" / "b.txt", tmp_path / "b.txt")
+        copy_file(tree / "sub" / "b.txt", tmp_path / "b.txt", overwrite=True)
+        assert (tmp_path / "b.txt").read_text() == "hello"
+
+    def test_same_file(self, tree, tmp_path):
+        """目标就是源文件(同一路径、硬链接或符号链接)时拒绝复制，不能清空源文件"""
+        src = tree / "sub" / "b.txt"
+        os.link(src, tmp_path / "hard.txt")
+        (tmp_path / "soft.txt").symlink_to(src)
+        for dst in (src, tmp_path / "hard.txt", tmp_path / "soft.txt"):
+            with pytest.raises(shutil.SameFileError):
+                copy_file(src, dst, overwrite=True)
+        with pytest.raises(shutil.SameFileError):
+            copy_file(tree / "link", tree / "link", overwrite=True)
+        assert src.read_text() == "hello"
+        assert os.readlink(tree / "link") == "a.bin"
+
+    def test_overwrite_symlink_dst(self, tree, tmp_path):
+        """目标是符号链接时替换链接本身，不写入链接指向的文件"""
+        victim = tmp_path / "victim.txt"
+        victim.write_text("keep me")
+        (tmp_path / "dst").symlink_to(victim)
+        copy_file(tree / "sub" / "b.txt", tmp_path / "dst", overwrite=True)
+        assert not (tmp_path / "dst").is_symlink()
+        assert (tmp_path / "dst").read_text() == "hello"
+        assert victim.read_text() == "keep me"
+
+    def test_overwrite_file_with_symlink(self, tree, tmp_path):
+        out = tmp_path / "out"
+        out.mkdir()
+        (out / "link").write_text("old")
+        assert copy_file(tree / "link", out / "link", overwrite=True) == "symlink"
+        assert os.readlink(out / "link") == "a.bin"
+        assert os.listdir(out) == ["link"]
+
+    def test_overwrite_failure_keeps_dst(self, tree, tmp_path, monkeypatch):
+        """复制失败时保留原目标，也不留下临时文件"""
+
+        def broken(*args):
+            raise OSError(errno.EIO, "io error")
+
+        out = tmp_path / "out"
+        out.mkdir()
+        (out / "b.txt").write_text("original")
+        monkeypatch.setattr(fast_copy, "_copy_data", broken)
+        with pytest.raises(OSError):
+            copy_file(tree / "sub" / "b.txt", out / "b.txt", overwrite=True)
+        assert (out / "b.txt").read_text() == "original"
+        assert os.listdir(out) == ["b.txt"]
+
+    def test_fallback(self, tree, tmp_path, monkeypatch):
+        """内核复制不可用时退回到分块读写"""
+
+        def unsupported(*args):
+            raise OSError(errno.ENOSYS, "not supported")
+
+        monkeypatch.setattr(fast_copy, "_reflink", lambda *args: False)
+        monkeypatch.setattr(os, "copy_file_range", unsupported, raising=False)
+        monkeypatch.setattr(os, "sendfile", unsupported, raising=False)
+        assert copy_file(tree / "a.bin", tmp_path / "a.bin") == "read_write"
+        assert (tmp_path / "a.bin").read_bytes() == (tree / "a.bin").read_bytes()
+
+
+class TestCopyTree:
+    """测试目录复制"""
+
+    def test_recursive(self, tree, tmp_path):
+        dst = tmp_path / "dst"
+        stats = copy_tree(tree, dst)
+        assert stats["files"] == 3
+        assert stats["dirs"] == 3
+        assert stats["symlinks"] == 1
+        assert stats["bytes"] == 256 * 1000 + 5
+        assert stats["errors"] == []
+        assert (dst / "sub" / "b.txt").read_text() == "hello"
+        assert (dst / "sub" / "deep" / "empty").exists()
+        assert os.readlink(dst / "link") == "a.bin"
+
+    def test_existing_target(self, tree, tmp_path):
+        (tmp_path / "dst").mkdir()
+        with pytest.raises(FileExistsError):
+            copy_tree(tree, tmp_path / "dst")
+
+    def test_into_itself(self, tree):
+        with pytest.raises(ValueError):
+            copy_tree(tree, tree / "sub" / "copy")
+
+    def test_same_file(self, tree, tmp_path):
+        src = tree / "sub" / "b.txt"
+        with pytest.raises(shutil.SameFileError):
+            copy_tree(src, src, overwrite=True)
+        # 目标目录中已有源文件的硬链接，逐个文件检查，记录错误而不是清空源文件
+        dst = tmp_path / "dst"
+        (dst / "sub").mkdir(parents=True)
+        os.link(src, dst / "sub" / "b.txt")
+        stats = copy_tree(tree, dst, overwrite=True)
+        assert len(stats["errors"]) == 1 and "b.txt" in stats["errors"][0]
+        assert src.read_text() == "hello"
+        assert (dst / "a.bin").read_bytes() == (tree / "a.bin").read_bytes()
+
+    def test_missing(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            copy_tree(tmp_path / "missing", tmp_path / "dst")
@@ -0,0 +1,176 @@
+# type: ignore
+"""
+测试 file_reader 按行/按字节窗口读取
+"""
+
+import os
+
+import pytest
+
+from ..src.file_system_tools import file_reader
+from ..src.file_system_tools.file_reader import (
+    read_byte_range,
+    read_head,
+    read_line_range,
+    read_tail,
+)
+from ..src.file_system_tools.file_writer import replace_lines
+
+
+@pytest.fixture
+def numbered(tmp_path):
+    path = tmp_path / "numbered.txt"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 1001)))
+    return path
+
+
+class TestLineRange:
+    """测试按行读取"""
+
+    def test_middle(self, numbered):
+        window = read_line_range(numbered, 10, 12)
+        assert window["text"] == "line 10\nline 11\nline 12\n"
+        assert window["start_line"] == 10
+        assert window["end_line"] == 12
+        assert window["file_size"] == numbered.stat().st_size
+
+    def test_past_end(self, numbered):
+        """超出文件末尾时只返回实际存在的行"""
+        window = read_line_range(numbered, 999, 2000)
+        assert window["text"] == "line 999\nline 1000\n"
+        assert window["end_line"] == 1000
+        assert read_line_range(numbered, 5000, 5001)["text"] == ""
+
+    def test_across_checkpoints(self, tmp_path, monkeypatch):
+        """目标行跨越多个索引检查点时仍然正确"""
+        monkeypatch.setattr(file_reader, "CHUNK_SIZE", 64)
+        path = tmp_path / "long.txt"
+        path.write_text("".join(f"{i}\n" for i in range(5000)))
+        assert read_line_range(path, 4001, 4002)["text"] == "4000\n4001\n"
+        assert read_line_range(path, 2, 2)["text"] == "1\n"
+
+    def test_no_trailing_newline(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("a\nb")
+        window = read_line_range(path, 2, 5)
+        assert window["text"] == "b"
+        assert window["end_line"] == 2
+
+    def test_invalid(self, numbered):
+        with pytest.raises(ValueError):
+            read_line_range(numbered, 0, 3)
+        with pytest.raises(ValueError):
+            read_line_range(numbered, 5, 3)
+
+    def test_index_invalidated(self, tmp_path):
+        """文件变化后不会使用旧的行索引"""
+        path = tmp_path / "a.txt"
+        path.write_text("a\nb\nc\n")
+        assert read_line_range(path, 3, 3)["text"] == "c\n"
+        path.write_text("xx\nyy\nzz\nww\n")
+        os.utime(path, ns=(1, 1))
+        assert read_line_range(path, 3, 3)["text"] == "zz\n"
+
+    def test_same_size_and_mtime(self, tmp_path, monkeypatch):
+        """大小和 mtime 都不变(同一时钟刻度内的两次写入)时也不会使用旧的行索引"""
+        monkeypatch.setattr(file_reader, "CHUNK_SIZE", 64)
+        path = tmp_path / "a.txt"
+        path.write_text("".join(f"{i:04d}\n" for i in range(1000)))
+        assert read_line_range(path, 995, 995)["text"] == "0994\n"
+        st = path.stat()
+        # 替换第 1 行，总大小不变但多了一行，然后还原 mtime
+        replace_lines(path, 1, 1, "00\n0\n")
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert path.stat().st_size == st.st_size
+        assert read_line_range(path, 995, 995)["text"] == "0993\n"
+        # 原地写入同样会被发现
+        with open(path, "r+b") as f:
+            f.write(b"0\n00\n")
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert read_line_range(path, 2, 2)["text"] == "00\n"
+
+    def test_bounded(self, numbered):
+        """范围超过 max_bytes 时只返回开头的完整行"""
+        window = read_line_range(numbered, 1, 10**9, max_bytes=20)
+        assert window["text"] == "line 1\nline 2\n"
+        assert window["end_line"] == 2
+        assert window["truncated"]
+        assert not read_line_range(numbered, 1, 2, max_bytes=14)["truncated"]
+
+    def test_bounded_long_line(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("x" * 100 + "\n")
+        window = read_line_range(path, 1, 1, max_bytes=10)
+        assert window["text"] == "x" * 10
+        assert window["truncated"]
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty.txt"
+        path.write_text("")
+        assert read_line_range(path, 1, 10)["text"] == ""
+        assert read_tail(path, 10)["text"] == ""
+
+
+class TestByteRange:
+    """测试按字节读取"""
+
+    def test_offset(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_bytes(b"0123456789")
+        window = read_byte_range(path, 2, 3)
+        assert window["text"] == "234"
+        assert (window["start_byte"], window["end_byte"]) == (2, 5)
+
+    def test_negative_offset(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_bytes(b"0123456789")
+        assert read_byte_range(path, -4, 100)["text"] == "6789"
+        assert read_byte_range(path, 50, 10)["text"] == ""
+
+    def test_bounded(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_bytes(b"0123456789")
+        window = read_byte_range(path, 0, 10**12, max_bytes=4)
+        assert window["text"] == "0123"
+        assert window["truncated"]
+        assert not read_byte_range(path, 8, 100, max_bytes=4)["truncated"]
+
+    def test_split_multibyte(self, tmp_path):
+        """截断的多字节字符被替换而不是抛出异常"""
+        path = tmp_path / "a.txt"
+        path.write_text("中文", encoding="utf-8")
+        assert read_byte_range(path, 1, 5)["text"].endswith("文")
+
+
+class TestHeadTail:
+    """测试 head/tail"""
+
+    def test_head(self, numbered):
+        assert read_head(numbered, 2)["text"] == "line 1\nline 2\n"
+
+    def test_tail(self, numbered):
+        window = read_tail(numbered, 2)
+        assert window["text"] == "line 999\nline 1000\n"
+        assert window["end_byte"] == numbered.stat().st_size
+
+    def test_tail_more_than_file(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("a\nb")
+        assert read_tail(path, 10)["text"] == "a\nb"
+        assert read_tail(path, 1)["text"] == "b"
+
+    def test_tail_bounded(self, numbered):
+        """超过 max_bytes 时只返回结尾的完整行"""
+        window = read_tail(numbered, 100, max_bytes=20)
+        assert window["text"] == "line 999\nline 1000\n"
+        assert window["truncated"]
+        window = read_tail(numbered, 2, max_bytes=19)
+        assert window["text"] == "line 999\nline 1000\n"
+        assert not window["truncated"]
+
+    def test_tail_bounded_long_line(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("a\n" + "x" * 100)
+        window = read_tail(path, 3, max_bytes=10)
+        assert window["text"] == "x" * 10
+        assert window["truncated"]
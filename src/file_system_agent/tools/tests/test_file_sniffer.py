@@ -0,0 +1,91 @@
+# type: ignore
+"""
+测试 file_sniffer 文件类型和编码嗅探
+"""
+
+import codecs
+
+from ..src.file_system_tools.file_sniffer import (
+    detect_encoding,
+    hex_dump,
+    read_raw_range,
+    sniff_file,
+)
+
+
+class TestSniffFile:
+    """测试文本/二进制判断"""
+
+    def test_utf8_text(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("你好\nhello\n", encoding="utf-8")
+        sniff = sniff_file(path)
+        assert not sniff["binary"]
+        assert sniff["encoding"] == "utf-8"
+
+    def test_gbk_text(self, tmp_path):
+        path = tmp_path / "gbk.txt"
+        path.write_bytes("中文内容，GBK 编码\n".encode("gbk"))
+        sniff = sniff_file(path)
+        assert not sniff["binary"]
+        assert sniff["encoding"] == "gb18030"
+
+    def test_utf16_bom_is_text(self, tmp_path):
+        path = tmp_path / "u16.txt"
+        path.write_bytes(codecs.BOM_UTF16_LE + "abc\n".encode("utf-16-le"))
+        sniff = sniff_file(path)
+        assert not sniff["binary"]
+        assert sniff["encoding"] == "utf-16"
+
+    def test_png(self, tmp_path):
+        path = tmp_path / "img.png"
+        path.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 100)
+        sniff = sniff_file(path)
+        assert sniff["binary"]
+        assert sniff["kind"] == "PNG 图片"
+        assert sniff["size"] == 108
+
+    def test_short_magic_in_text(self, tmp_path):
+        """以 "BM" 开头的文本文件不是 BMP 图片"""
+        path = tmp_path / "cars.txt"
+        path.write_text("BMW 和奔驰\n", encoding="utf-8")
+        sniff = sniff_file(path)
+        assert not sniff["binary"]
+        assert sniff["kind"] is None
+
+    def test_only_reads_head(self, tmp_path):
+        path = tmp_path / "big.bin"
+        path.write_bytes(b"\x00" * 100_000)
+        sniff = sniff_file(path, sample_size=1024)
+        assert sniff["binary"]
+        assert len(sniff["head"]) == 1024
+        assert sniff["size"] == 100_000
+
+
+class TestDetectEncoding:
+    """测试编码推断"""
+
+    def test_truncated_multibyte(self):
+        """样本结尾截断的多字节字符不影响判断"""
+        data = "你好".encode("utf-8")[:-1]
+        assert detect_encoding(data, complete=False) == "utf-8"
+
+    def test_utf8_bom(self):
+        assert detect_encoding(codecs.BOM_UTF8 + b"abc") == "utf-8-sig"
+
+    def test_latin1_fallback(self):
+        assert detect_encoding(b"\xfe\xfa\x80\xff") == "latin-1"
+
+
+class TestHexDump:
+    """测试十六进制输出"""
+
+    def test_format(self):
+        dump = hex_dump(b"AB\x00", start=16)
+        assert dump.startswith("00000010: 41 42 00")
+        assert dump.endswith("AB.")
+
+    def test_read_raw_range(self, tmp_path):
+        path = tmp_path / "data.bin"
+        path.write_bytes(bytes(range(10)))
+        assert read_raw_range(path, -3, 10) == (7, b"\x07\x08\x09")
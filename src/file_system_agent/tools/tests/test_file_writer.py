@@ -0,0 +1,167 @@
+# type: ignore
+"""
+测试 file_writer 的追加、按行替换和补丁
+"""
+
+import os
+
+import pytest
+
+from ..src.file_system_tools.file_writer import (
+    append_text,
+    apply_patch,
+    atomic_writer,
+    replace_lines,
+    write_text,
+)
+
+
+@pytest.fixture
+def numbered(tmp_path):
+    path = tmp_path / "numbered.txt"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 11)))
+    return path
+
+
+def lines_of(path):
+    return path.read_text().splitlines()
+
+
+class TestAtomicWrite:
+    """测试原子写入"""
+
+    def test_overwrite_keeps_mode(self, tmp_path):
+        path = tmp_path / "run.sh"
+        path.write_text("old")
+        os.chmod(path, 0o755)
+        write_text(path, "new")
+        assert path.read_text() == "new"
+        assert os.stat(path).st_mode & 0o777 == 0o755
+
+    def test_new_file_mode(self, tmp_path):
+        """新文件的权限与 open() 创建的文件一致，而不是 mkstemp 的 0600"""
+        expected = tmp_path / "expected.txt"
+        expected.write_text("")
+        path = tmp_path / "new.txt"
+        write_text(path, "new")
+        assert path.read_text() == "new"
+        assert os.stat(path).st_mode & 0o777 == os.stat(expected).st_mode & 0o777
+
+    def test_new_file_mode_follows_umask(self, tmp_path):
+        old = os.umask(0o027)
+        try:
+            write_text(tmp_path / "new.txt", "new")
+        finally:
+            os.umask(old)
+        assert os.stat(tmp_path / "new.txt").st_mode & 0o777 == 0o640
+
+    def test_failure_keeps_original(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("original")
+        with pytest.raises(RuntimeError):
+            with atomic_writer(path) as out:
+                out.write(b"partial")
+                raise RuntimeError
+        assert path.read_text() == "original"
+        assert os.listdir(tmp_path) == ["a.txt"]
+
+    def test_symlink_target(self, tmp_path):
+        """写入符号链接时修改目标文件，链接保持不变"""
+        target = tmp_path / "target.txt"
+        target.write_text("old")
+        link = tmp_path / "link.txt"
+        link.symlink_to(target)
+        write_text(link, "new")
+        assert link.is_symlink()
+        assert target.read_text() == "new"
+
+    def test_append(self, tmp_path):
+        path = tmp_path / "a.log"
+        assert append_text(path, "a\n") == 2
+        append_text(path, "b\n")
+        assert path.read_text() == "a\nb\n"
+
+
+class TestReplaceLines:
+    """测试按行替换"""
+
+    def test_replace(self, numbered):
+        assert replace_lines(numbered, 3, 4, "three\nfour\nfour and a half") == 2
+        assert lines_of(numbered)[1:6] == [
+            "line 2",
+            "three",
+            "four",
+            "four and a half",
+            "line 5",
+        ]
+
+    def test_delete_and_insert(self, numbered):
+        replace_lines(numbered, 2, 9, "")
+        assert lines_of(numbered) == ["line 1", "line 10"]
+        replace_lines(numbered, 2, 1, "inserted")
+        assert lines_of(numbered) == ["line 1", "inserted", "line 10"]
+
+    def test_past_end(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("a\nb")
+        replace_lines(path, 5, 5, "c\n")
+        assert path.read_text() == "a\nb\nc\n"
+
+    def test_invalid(self, numbered):
+        with pytest.raises(ValueError):
+            replace_lines(numbered, 5, 3, "x")
+
+
+class TestPatch:
+    """测试应用 unified diff"""
+
+    def test_apply(self, numbered):
+        diff = (
+            "--- a/numbered.txt\n"
+            "+++ b/numbered.txt\n"
+            "@@ -2,3 +2,3 @@\n"
+            " line 2\n"
+            "-line 3\n"
+            "+line three\n"
+            " line 4\n"
+            "@@ -9,2 +9,3 @@\n"
+            " line 9\n"
+            "+line 9.5\n"
+            " line 10\n"
+        )
+        stats = apply_patch(numbered, diff)
+        assert stats == {"hunks": 2, "added": 2, "removed": 1}
+        result = lines_of(numbered)
+        assert result[2] == "line three"
+        assert result[-3:] == ["line 9", "line 9.5", "line 10"]
+
+    def test_offset(self, numbered):
+        """行号有偏差时在附近找到上下文"""
+        diff = "@@ -1,2 +1,2 @@\n line 5\n-line 6\n+six\n"
+        apply_patch(numbered, diff)
+        assert lines_of(numbered)[5] == "six"
+
+    def test_mismatch_keeps_file(self, numbered):
+        before = numbered.read_text()
+        with pytest.raises(ValueError):
+            apply_patch(numbered, "@@ -2,1 +2,1 @@\n-not here\n+x\n")
+        assert numbered.read_text() == before
+
+    def test_no_newline_at_end(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("a\nb")
+        diff = "@@ -2 +2,2 @@\n-b\n\\ No newline at end of file\n+b\n+c\n\\ No newline at end of file\n"
+        apply_patch(path, diff)
+        assert path.read_text() == "a\nb\nc"
+
+    def test_crlf(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_bytes(b"a\r\nb\r\n")
+        apply_patch(path, "@@ -1,2 +1,2 @@\n a\n-b\n+c\n")
+        assert path.read_bytes() == b"a\r\nc\r\n"
+
+    def test_invalid(self, numbered):
+        with pytest.raises(ValueError):
+            apply_patch(numbered, "not a diff")
+        with pytest.raises(ValueError):
+            apply_patch(numbered, "@@ -1,2 +1,2 @@\n line 1\n")
@@ -0,0 +1,123 @@
+# type: ignore
+"""
+测试 ListingCache 目录列表缓存
+"""
+
+import os
+import sys
+
+import pytest
+
+from ..src.file_system_tools.dir_scanner import scan_dir
+from ..src.file_system_tools.listing_cache import ListingCache
+from ..src.file_system_tools.working_dir import WorkingDir
+
+
+def names(cache, path):
+    return {item["file_name"] for item in cache.iter_listing(path, scan_dir)}
+
+
+@pytest.fixture(params=["inotify", "mtime"])
+def cache(request):
+    """分别测试 inotify 和 mtime 两种失效方式"""
+    if request.param == "inotify" and not sys.platform.startswith("linux"):
+        pytest.skip("inotify 仅在 Linux 上可用")
+    c = ListingCache(use_inotify=request.param == "inotify")
+    if c.backend != request.param:
+        pytest.skip("当前环境无法使用 inotify")
+    yield c
+    c.close()
+
+
+class TestListingCache:
+    """测试缓存命中与失效"""
+
+    def test_hit_after_full_listing(self, tmp_path, cache):
+        """测试完整遍历后再次遍历命中缓存"""
+        (tmp_path / "a.txt").touch()
+
+        assert names(cache, tmp_path) == {"a.txt"}
+        assert names(cache, tmp_path) == {"a.txt"}
+
+        stats = cache.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+        assert stats["cached_dirs"] == 1
+
+    def test_invalidate_on_create_and_delete(self, tmp_path, cache):
+        """测试目录内新增或删除文件后缓存失效"""
+        (tmp_path / "a.txt").touch()
+        names(cache, tmp_path)
+
+        (tmp_path / "b.txt").touch()
+        # mtime 的精度有限，确保目录 mtime 一定发生变化
+        os.utime(tmp_path, ns=(0, 1))
+        assert names(cache, tmp_path) == {"a.txt", "b.txt"}
+
+        (tmp_path / "a.txt").unlink()
+        os.utime(tmp_path, ns=(0, 2))
+        assert names(cache, tmp_path) == {"b.txt"}
+        assert cache.stats()["hits"] == 0
+
+    def test_partial_iteration_not_cached(self, tmp_path, cache):
+        """测试只消费了一部分的迭代器不会写入缓存"""
+        for i in range(5):
+            (tmp_path / f"{i}.txt").touch()
+
+        it = cache.iter_listing(tmp_path, scan_dir)
+        next(it)
+        it.close()
+
+        assert cache.stats()["cached_dirs"] == 0
+        assert len(names(cache, tmp_path)) == 5
+
+    def test_large_dir_not_cached(self, tmp_path):
+        """测试超过 max_entries 的目录不会被缓存"""
+        for i in range(5):
+            (tmp_path / f"{i}.txt").touch()
+        cache = ListingCache(max_entries=3)
+
+        assert len(names(cache, tmp_path)) == 5
+        assert cache.stats()["cached_dirs"] == 0
+        cache.close()
+
+    def test_lru_eviction(self, tmp_path, cache):
+        """测试超过 max_dirs 时淘汰最久未使用的目录"""
+        cache._max_dirs = 2
+        dirs = []
+        for name in ["a", "b", "c"]:
+            d = tmp_path / name
+            d.mkdir()
+            dirs.append(d)
+            names(cache, d)
+
+        assert cache.stats()["cached_dirs"] == 2
+        names(cache, dirs[0])
+        assert cache.stats()["misses"] == 4
+
+    def test_cached_items_are_copies(self, tmp_path, cache):
+        """测试修改返回结果不会影响缓存"""
+        (tmp_path / "a.txt").touch()
+        names(cache, tmp_path)
+
+        item = next(cache.iter_listing(tmp_path, scan_dir))
+        item["file_name"] = "changed"
+
+        assert names(cache, tmp_path) == {"a.txt"}
+
+
+class TestWorkingDirCache:
+    """测试 WorkingDir 接入缓存后的行为"""
+
+    def test_walk_dir_uses_cache(self, tmp_path):
+        """测试重复 walk_dir 命中缓存，修改目录后结果更新"""
+        (tmp_path / "a.txt").touch()
+        wd = WorkingDir(tmp_path)
+
+        assert len(wd.walk_dir()) == 1
+        assert len(wd.walk_dir()) == 1
+        assert wd.cache_stats["hits"] == 1
+
+        (tmp_path / "b.txt").touch()
+        os.utime(tmp_path, ns=(0, 1))
+        assert len(wd.walk_dir()) == 2
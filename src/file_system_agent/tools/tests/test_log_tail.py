@@ -0,0 +1,101 @@
+# type: ignore
+"""
+测试 log_tail 的 tail 和 follow
+"""
+
+import os
+
+import pytest
+
+from ..src.file_system_tools import log_tail
+from ..src.file_system_tools.log_tail import follow, tail_lines
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text(
+        "".join(
+            f"{'ERROR' if i % 100 == 0 else 'INFO'} message {i}\n"
+            for i in range(1, 5001)
+        )
+    )
+    return path
+
+
+class TestTail:
+    """测试从末尾读取"""
+
+    def test_last_lines(self, log):
+        result = tail_lines(log, 3)
+        assert result["lines"] == [
+            "INFO message 4998",
+            "INFO message 4999",
+            "ERROR message 5000",
+        ]
+        assert result["scanned_bytes"] < log.stat().st_size
+
+    def test_across_blocks(self, log, monkeypatch):
+        """行跨越块边界时能正确拼接"""
+        monkeypatch.setattr(log_tail, "BLOCK_SIZE", 7)
+        result = tail_lines(log, 3)
+        assert result["lines"][0] == "INFO message 4998"
+
+    def test_pattern(self, log):
+        result = tail_lines(log, 2, pattern="^ERROR")
+        assert result["lines"] == ["ERROR message 4900", "ERROR message 5000"]
+
+    def test_more_than_file(self, tmp_path):
+        path = tmp_path / "a.log"
+        path.write_text("a\nb")
+        assert tail_lines(path, 10)["lines"] == ["a", "b"]
+        path.write_text("")
+        assert tail_lines(path, 10)["lines"] == []
+
+    def test_scan_limit(self, log):
+        result = tail_lines(log, 5, pattern="never", max_scan_bytes=1024)
+        assert result["lines"] == []
+        assert result["truncated"]
+
+    def test_invalid(self, log):
+        with pytest.raises(ValueError):
+            tail_lines(log, 0)
+        with pytest.raises(ValueError):
+            tail_lines(log, 1, pattern="(")
+
+
+class TestFollow:
+    """测试追踪新增内容"""
+
+    def test_appended(self, log):
+        cursor = tail_lines(log, 1)["cursor"]
+        assert follow(log, cursor)["lines"] == []
+        with open(log, "a") as f:
+            f.write("new 1\nnew 2\npartial")
+        result = follow(log, cursor)
+        assert result["lines"] == ["new 1", "new 2"]
+        # 未写完的行留到下一次
+        with open(log, "a") as f:
+            f.write(" line\n")
+        assert follow(log, result["cursor"])["lines"] == ["partial line"]
+
+    def test_max_lines(self, log):
+        cursor = tail_lines(log, 1)["cursor"]
+        with open(log, "a") as f:
+            f.write("a\nb\nc\n")
+        first = follow(log, cursor, max_lines=2)
+        assert first["lines"] == ["a", "b"]
+        assert first["truncated"]
+        assert follow(log, first["cursor"])["lines"] == ["c"]
+
+    def test_rotated(self, log):
+        cursor = tail_lines(log, 1)["cursor"]
+        os.replace(log, log.with_suffix(".1"))
+        log.write_text("fresh\n")
+        result = follow(log, cursor)
+        assert result["rotated"]
+        assert result["lines"] == ["fresh"]
+
+    def test_invalid_cursor(self, log):
+        with pytest.raises(ValueError):
+            follow(log, "nonsense")
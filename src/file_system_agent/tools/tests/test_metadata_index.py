@@ -0,0 +1,122 @@
+# type: ignore
+"""
+测试 MetadataIndex 元信息索引
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ..src.file_system_tools.metadata_index import MetadataIndex
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """创建一个小型文件树，索引文件放在树外"""
+    root = tmp_path / "root"
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "logs").mkdir()
+    (root / "README.md").write_text("readme")
+    (root / "src" / "main.py").write_text("x" * 100)
+    (root / "src" / "pkg" / "util.py").write_text("x" * 10)
+    (root / "logs" / "app.log").write_text("x" * 1000)
+    return root
+
+
+@pytest.fixture
+def index(tree, tmp_path):
+    idx = MetadataIndex(tree, db_path=tmp_path / "index.sqlite3")
+    yield idx
+    idx.close()
+
+
+class TestMetadataIndex:
+    """测试索引的建立、查询和增量刷新"""
+
+    def test_initial_build(self, index, tree):
+        """测试首次刷新会扫描所有目录"""
+        stats = index.refresh()
+        assert stats["dirs_rescanned"] == 4
+        assert index.count() == 7
+
+    def test_search_substring_and_glob(self, index, tree):
+        """测试子串匹配和 glob 匹配"""
+        index.refresh()
+
+        paths = {item["path"] for item in index.search("util")}
+        assert paths == {str(tree / "src" / "pkg" / "util.py")}
+
+        py_files = {item["path"] for item in index.search("*.py", file_type="file")}
+        assert py_files == {
+            str(tree / "src" / "main.py"),
+            str(tree / "src" / "pkg" / "util.py"),
+        }
+
+        assert index.search("%") == []
+
+    def test_largest(self, index, tree):
+        """测试按大小排序以及 under 过滤"""
+        index.refresh()
+
+        largest = index.largest(limit=2)
+        assert [item["path"] for item in largest] == [
+            str(tree / "logs" / "app.log"),
+            str(tree / "src" / "main.py"),
+        ]
+
+        under_src = index.largest(under="src")
+        assert [item["size"] for item in under_src] == [100, 10]
+
+    def test_incremental_refresh(self, index, tree):
+        """测试增量刷新只重新扫描 mtime 变化的目录"""
+        index.refresh()
+
+        stats = index.refresh()
+        assert stats["dirs_rescanned"] == 0
+        assert stats["dirs_checked"] == 4
+
+        (tree / "src" / "pkg" / "new.txt").write_text("new")
+        os.utime(tree / "src" / "pkg", ns=(0, 1))
+        stats = index.refresh()
+        assert stats["dirs_rescanned"] == 1
+        assert index.search("new.txt")
+
+    def test_removed_directory(self, index, tree):
+        """测试删除目录后其子项从索引中移除"""
+        index.refresh()
+
+        (tree / "logs" / "app.log").unlink()
+        (tree / "logs").rmdir()
+        stats = index.refresh()
+
+        assert stats["dirs_removed"] == 1
+        assert index.search("app.log") == []
+        assert index.count() == 5
+
+    def test_persisted_between_instances(self, tree, tmp_path):
+        """测试索引持久化，重新打开后无需重新扫描"""
+        db = tmp_path / "persist.sqlite3"
+        first = MetadataIndex(tree, db_path=db)
+        first.refresh()
+        first.close()
+
+        second = MetadataIndex(tree, db_path=db)
+        stats = second.refresh()
+        assert stats["dirs_rescanned"] == 0
+        assert second.count() == 7
+        second.close()
+
+    def test_concurrent_refresh_if_stale(self, index):
+        """多个会话同时查询时只刷新一次"""
+        refreshes = []
+        original = index.refresh
+
+        def counting_refresh():
+            refreshes.append(1)
+            return original()
+
+        index.refresh = counting_refresh
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda _: index.refresh_if_stale(), range(8)))
+        assert len(refreshes) == 1
@@ -0,0 +1,115 @@
+# type: ignore
+"""
+测试 NameIndex 文件名索引
+"""
+
+import os
+import shutil
+
+import pytest
+
+from ..src.file_system_tools.name_index import NameIndex
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "src" / "main.py").touch()
+    (tmp_path / "src" / "pkg" / "Utils.py").touch()
+    (tmp_path / "src" / "pkg" / "data.json").touch()
+    (tmp_path / "docs" / "main.md").touch()
+    return tmp_path
+
+
+class TestNameIndex:
+    """测试建立索引、三种查找方式和增量更新"""
+
+    def test_build(self, tree):
+        """测试首次更新会索引所有条目"""
+        index = NameIndex(tree)
+        assert index.refresh() == 4
+        assert len(index) == 7
+
+    def test_substring(self, tree):
+        """测试子串查找默认忽略大小写"""
+        index = NameIndex(tree)
+        index.refresh()
+
+        assert sorted(index.search("main")) == ["docs/main.md", "src/main.py"]
+        assert index.search("utils") == ["src/pkg/Utils.py"]
+        assert index.search("utils", ignore_case=False) == []
+        assert index.search("nothing") == []
+        # 少于三个字符时退化为线性扫描
+        assert sorted(index.search("py")) == ["src/main.py", "src/pkg/Utils.py"]
+
+    def test_glob(self, tree):
+        """测试 glob 匹配文件名和相对路径"""
+        index = NameIndex(tree)
+        index.refresh()
+
+        assert sorted(index.search("*.py", mode="glob")) == [
+            "src/main.py",
+            "src/pkg/Utils.py",
+        ]
+        assert index.search("src/*.py", mode="glob") == ["src/main.py"]
+        assert index.search("src/**/*.json", mode="glob") == ["src/pkg/data.json"]
+
+    def test_regex(self, tree):
+        """测试正则查找"""
+        index = NameIndex(tree)
+        index.refresh()
+
+        assert sorted(index.search(r"^main\.(py|md)$", mode="regex")) == [
+            "docs/main.md",
+            "src/main.py",
+        ]
+        with pytest.raises(ValueError, match="无效的正则表达式"):
+            index.search("(", mode="regex")
+
+    def test_under_and_limit(self, tree):
+        """测试限定子目录和返回数量"""
+        index = NameIndex(tree)
+        index.refresh()
+
+        assert index.search("main", under="docs") == ["docs/main.md"]
+        assert len(index.search("a", limit=2)) == 2
+
+    def test_incremental_update(self, tree):
+        """测试增量更新新增和删除条目"""
+        index = NameIndex(tree)
+        index.refresh()
+        assert index.refresh() == 0
+
+        (tree / "docs" / "guide.md").touch()
+        os.utime(tree / "docs", ns=(0, 1))
+        shutil.rmtree(tree / "src" / "pkg")
+        os.utime(tree / "src", ns=(0, 1))
+
+        assert index.refresh() == 2
+        assert index.search("guide") == ["docs/guide.md"]
+        assert index.search("utils") == []
+        assert len(index) == 5
+
+    def test_rebuild_before_search_takes_lock(self, tree):
+        """查找等待锁期间索引被重建，查找使用重建后的名称列表"""
+        index = NameIndex(tree)
+        index.refresh()
+        lock = index._lock
+
+        class RebuildFirst:
+            def __enter__(self):
+                shutil.rmtree(tree / "src")
+                (tree / "docs" / "zz_main.txt").touch()
+                index._clear()
+                index._refresh()
+                return lock.__enter__()
+
+            def __exit__(self, *exc):
+                return lock.__exit__(*exc)
+
+        index._lock = RebuildFirst()
+        assert sorted(index.search("main")) == [
+            "docs/main.md",
+            "docs/zz_main.txt",
+        ]
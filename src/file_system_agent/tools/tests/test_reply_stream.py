@@ -0,0 +1,156 @@
+# type: ignore
+"""
+测试后端流式回复的事件翻译
+"""
+
+import json
+from types import SimpleNamespace
+
+from ...backend.streaming import AgentEventTranslator, ReplyTextExtractor, format_sse
+
+
+def feed_all(extractor, fragments):
+    return "".join(extractor.feed(f) for f in fragments)
+
+
+class TestReplyTextExtractor:
+    """测试从不完整 JSON 中增量解析回复文本"""
+
+    def test_char_by_char(self):
+        reply = '第一行\n引号"和\\反斜杠 \U0001f600 end'
+        payload = json.dumps({"with_file_system": True, "reply": reply})
+        extractor = ReplyTextExtractor()
+        assert feed_all(extractor, list(payload)) == reply
+        assert extractor.done
+        assert extractor.text == reply
+
+    def test_ascii_escaped_payload(self):
+        reply = "中文\t和 emoji \U0001f4c1"
+        payload = json.dumps({"reply": reply, "with_file_system": False})
+        extractor = ReplyTextExtractor()
+        # 每 3 个字符一段，转义序列会被截断在片段之间
+        fragments = [payload[i : i + 3] for i in range(0, len(payload), 3)]
+        assert feed_all(extractor, fragments) == reply
+
+    def test_waits_for_key(self):
+        extractor = ReplyTextExtractor()
+        assert extractor.feed('{"rep') == ""
+        assert extractor.feed('ly": "he') == "he"
+        assert extractor.feed('llo", "x": "ignored"}') == "llo"
+        assert extractor.feed("more") == ""
+
+
+def model_chunk(run_id, *calls):
+    chunk = SimpleNamespace(tool_call_chunks=list(calls))
+    return {"event": "on_chat_model_stream", "run_id": run_id, "data": {"chunk": chunk}}
+
+
+def translate_all(translator, events):
+    return [item for event in events for item in translator.translate(event)]
+
+
+class TestAgentEventTranslator:
+    """测试 astream_events 事件的翻译"""
+
+    def test_tokens_only_from_reply_tool(self):
+        translator = AgentEventTranslator()
+        events = [
+            model_chunk("m1", {"name": "find_files", "args": '{"pattern', "index": 0}),
+            model_chunk("m1", {"name": None, "args": '": "reply"}', "index": 0}),
+            model_chunk(
+                "m2", {"name": "AgentReply", "args": '{"reply": "你', "index": 0}
+            ),
+            model_chunk("m2", {"name": None, "args": '好"', "index": 0}),
+            model_chunk(
+                "m2", {"name": None, "args": ', "with_file_system": false}', "index": 0}
+            ),
+            # 没有工具调用的普通文本片段
+            {
+                "event": "on_chat_model_stream",
+                "run_id": "m3",
+                "data": {"chunk": SimpleNamespace(content="内部思考")},
+            },
+        ]
+        assert translate_all(translator, events) == [
+            ("token", {"text": "你"}),
+            ("token", {"text": "好"}),
+        ]
+
+    def test_tool_events_and_final(self):
+        translator = AgentEventTranslator()
+        events = [
+            {
+                "event": "on_tool_start",
+                "name": "file_expert",
+                "run_id": "t1",
+                "data": {},
+            },
+            {"event": "on_tool_end", "name": "file_expert", "run_id": "t1", "data": {}},
+            {
+                "event": "on_chain_end",
+                "run_id": "c1",
+                "parent_ids": ["root"],
+                "data": {"output": 1},
+            },
+            {
+                "event": "on_chain_end",
+                "run_id": "root",
+                "parent_ids": [],
+                "data": {"output": {"messages": []}},
+            },
+        ]
+        result = translate_all(translator, events)
+        assert result[0] == (
+            "tool_start",
+            {"name": "file_expert", "run_id": "t1", "depth": 0},
+        )
+        name, data = result[1]
+        assert name == "tool_end" and data["seconds"] >= 0 and not data["error"]
+        assert result[2:] == [("final", {"messages": []})]
+
+    def test_plain_text_and_nested_runs(self):
+        """CLI 模式直接转发文本，工具内部的模型输出不转发，内部工具带有嵌套深度"""
+        translator = AgentEventTranslator(reply_tool=None)
+
+        def text_chunk(run_id, content, parents):
+            return {
+                "event": "on_chat_model_stream",
+                "run_id": run_id,
+                "parent_ids": parents,
+                "data": {"chunk": SimpleNamespace(content=content)},
+            }
+
+        def tool(kind, name, run_id, parents):
+            return {
+                "event": kind,
+                "name": name,
+                "run_id": run_id,
+                "parent_ids": parents,
+            }
+
+        events = [
+            text_chunk("m1", "先看看", ["root"]),
+            tool("on_tool_start", "file_expert", "t1", ["root"]),
+            text_chunk("m2", "子agent输出", ["root", "t1", "sub"]),
+            tool("on_tool_start", "read_file", "t2", ["root", "t1", "sub"]),
+            tool("on_tool_error", "read_file", "t2", ["root", "t1", "sub"]),
+            tool("on_tool_end", "file_expert", "t1", ["root"]),
+            text_chunk("m3", [{"type": "text", "text": "完成"}], ["root"]),
+        ]
+        result = translate_all(translator, events)
+        assert [(n, d.get("text") or d["name"]) for n, d in result] == [
+            ("token", "先看看"),
+            ("tool_start", "file_expert"),
+            ("tool_start", "read_file"),
+            ("tool_end", "read_file"),
+            ("tool_end", "file_expert"),
+            ("token", "完成"),
+        ]
+        assert [d["depth"] for n, d in result if n != "token"] == [0, 1, 1, 0]
+        assert result[3][1]["error"]
+
+
+def test_format_sse():
+    assert (
+        format_sse("token", {"text": "中"}) == 'event: token\ndata: {"text": "中"}\n\n'
+    )
@@ -0,0 +1,119 @@
+# type: ignore
+"""
+测试 script_runner 子进程脚本执行
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+from ..src.file_system_tools.script_runner import (
+    RingBuffer,
+    run_script,
+    run_script_async,
+)
+
+
+def write_script(tmp_path, body, name="script.py"):
+    path = tmp_path / name
+    path.write_text(body, encoding="utf-8")
+    return path
+
+
+class TestRingBuffer:
+    """测试环形缓冲区"""
+
+    def test_keeps_tail(self):
+        buffer = RingBuffer(5)
+        buffer.write(b"abc")
+        buffer.write(b"defg")
+        assert buffer.getvalue() == b"cdefg"
+        assert buffer.dropped == 2
+
+
+class TestRunScript:
+    """测试同步执行"""
+
+    def test_output_and_exit_code(self, tmp_path):
+        script = write_script(
+            tmp_path,
+            "import sys\nprint('你好')\nprint('err', file=sys.stderr)\nsys.exit(3)\n",
+        )
+        result = run_script(script)
+        assert result["exit_code"] == 3
+        assert not result["timed_out"]
+        assert "你好" in result["output"] and "err" in result["output"]
+
+    def test_args_and_cwd(self, tmp_path):
+        script = write_script(
+            tmp_path, "import os, sys\nprint(sys.argv[1:], os.getcwd())\n"
+        )
+        result = run_script(script, ["a b", "c"])
+        assert result["exit_code"] == 0
+        assert f"['a b', 'c'] {tmp_path}" in result["output"]
+
+    def test_timeout(self, tmp_path):
+        script = write_script(
+            tmp_path, "import time\nprint('started', flush=True)\ntime.sleep(30)\n"
+        )
+        result = run_script(script, timeout=0.5)
+        assert result["timed_out"]
+        assert result["exit_code"] is None
+        assert result["duration"] < 10
+        assert "started" in result["output"]
+
+    def test_output_is_bounded(self, tmp_path):
+        script = write_script(
+            tmp_path, "for i in range(100000):\n    print(i)\nprint('last')\n"
+        )
+        result = run_script(script, max_output_bytes=1000)
+        assert result["output"].endswith("last\n")
+        assert len(result["output"]) <= 1000
+        assert result["dropped_bytes"] > 0
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="需要 setrlimit")
+    def test_memory_limit(self, tmp_path):
+        script = write_script(tmp_path, "data = bytearray(512 * 1024 * 1024)\n")
+        result = run_script(script, max_memory_mb=256)
+        assert result["exit_code"] != 0
+        assert "MemoryError" in result["output"]
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="需要 setrlimit")
+    def test_limits_applied_to_script(self, tmp_path):
+        script = write_script(
+            tmp_path,
+            "import resource, sys\n"
+            "print(resource.getrlimit(resource.RLIMIT_AS)[0], resource.getrlimit(resource.RLIMIT_CPU)[0])\n"
+            "print(sys.argv[1:])\n",
+        )
+        result = run_script(script, ["x"], max_memory_mb=300, max_cpu_seconds=7)
+        assert result["output"] == f"{300 * 1024 * 1024} 7\n['x']\n"
+
+    def test_invalid_timeout(self, tmp_path):
+        script = write_script(tmp_path, "pass\n")
+        for timeout in (0, -1):
+            with pytest.raises(ValueError):
+                run_script(script, timeout=timeout)
+            with pytest.raises(ValueError):
+                asyncio.run(run_script_async(script, timeout=timeout))
+
+
+class TestRunScriptAsync:
+    """测试异步执行"""
+
+    def test_concurrent(self, tmp_path):
+        """多个脚本同时运行，总耗时接近单个脚本"""
+        script = write_script(tmp_path, "import time\ntime.sleep(0.5)\nprint('ok')\n")
+
+        async def main():
+            return await asyncio.gather(*(run_script_async(script) for _ in range(4)))
+
+        results = asyncio.run(main())
+        assert all(r["exit_code"] == 0 and r["output"] == "ok\n" for r in results)
+        assert max(r["duration"] for r in results) < 1.9
+
+    def test_timeout(self, tmp_path):
+        script = write_script(tmp_path, "import time\ntime.sleep(30)\n")
+        result = asyncio.run(run_script_async(script, timeout=0.5))
+        assert result["timed_out"]
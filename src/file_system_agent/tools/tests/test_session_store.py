@@ -0,0 +1,76 @@
+# type: ignore
+"""
+测试后端 SessionStore 会话存储
+"""
+
+import pytest
+
+from ...backend.sessions import SessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_store(clock, **kwargs):
+    return SessionStore(lambda sid: {"id": sid, "history": []}, clock=clock, **kwargs)
+
+
+class TestSessionStore:
+    """测试会话的创建、复用和淘汰"""
+
+    def test_reuse(self, clock):
+        store = make_store(clock)
+        first = store.get("a")
+        first["history"].append("hello")
+        assert store.get("a") is first
+        assert store.get("b") is not first
+        assert store.stats()["created"] == 2
+
+    def test_lru_eviction(self, clock):
+        store = make_store(clock, max_sessions=2)
+        store.get("a")
+        store.get("b")
+        store.get("a")  # a 变为最近使用
+        store.get("c")
+        assert "a" in store and "c" in store
+        assert "b" not in store
+        assert store.stats()["evicted_lru"] == 1
+
+    def test_idle_eviction(self, clock):
+        store = make_store(clock, ttl=10)
+        old = store.get("a")
+        clock.now = 5
+        store.get("b")
+        clock.now = 12
+        assert store.evict_idle() == 1
+        assert "a" not in store and "b" in store
+        # 过期后同一个 id 重新创建，之前的状态被丢弃
+        assert store.get("a") is not old
+        assert store.stats()["evicted_idle"] == 1
+
+    def test_access_refreshes_ttl(self, clock):
+        store = make_store(clock, ttl=10)
+        session = store.get("a")
+        for clock.now in (8, 16, 24):
+            assert store.get("a") is session
+
+    def test_discard(self, clock):
+        store = make_store(clock)
+        store.get("a")
+        store.discard("a")
+        store.discard("missing")
+        assert len(store) == 0
+
+    def test_invalid_capacity(self, clock):
+        with pytest.raises(ValueError):
+            make_store(clock, max_sessions=0)
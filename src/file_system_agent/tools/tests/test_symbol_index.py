@@ -0,0 +1,156 @@
+# type: ignore
+"""
+测试 SymbolIndex Python 符号索引
+"""
+
+import os
+
+import pytest
+
+from ..src.file_system_tools import symbol_index as symbol_index_module
+from ..src.file_system_tools.symbol_index import SymbolIndex, extract_symbols
+
+SOURCE = """
+import os
+from .utils import helper as h
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Base:
+    pass
+
+
+class Worker(Base):
+    def run(self, job: str) -> bool:
+        def inner():
+            pass
+        return True
+
+    async def stop(self):
+        pass
+
+
+def main(argv=None):
+    pass
+"""
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "root"
+    (root / "pkg").mkdir(parents=True)
+    (root / "pkg" / "worker.py").write_text(SOURCE)
+    (root / "pkg" / "broken.py").write_text("def oops(:\n")
+    (root / "build").mkdir()
+    (root / "build" / "worker.py").write_text("class Worker:\n    pass\n")
+    (root / ".gitignore").write_text("build/\n")
+    return root
+
+
+@pytest.fixture
+def index(tree, tmp_path):
+    idx = SymbolIndex(tree, db_path=tmp_path / "symbols.sqlite3")
+    yield idx
+    idx.close()
+
+
+class TestExtractSymbols:
+    """测试从源码中提取符号"""
+
+    def test_symbols(self):
+        rows = {(kind, qualname) for kind, _, qualname, *_ in extract_symbols(SOURCE)}
+        assert ("class", "Worker") in rows
+        assert ("method", "Worker.run") in rows
+        assert ("method", "Worker.stop") in rows
+        assert ("function", "main") in rows
+        assert ("import", ".utils.helper") in rows
+        # try 块中的导入也会被记录，函数内部的定义不记录
+        assert ("import", "numpy") in rows
+        assert not any(q.endswith("inner") for _, q in rows)
+
+    def test_signature_and_lines(self):
+        rows = {row[2]: row for row in extract_symbols(SOURCE)}
+        _, _, _, line, end_line, signature = rows["Worker.run"]
+        assert signature == "(self, job: str) -> bool"
+        assert end_line - line == 3
+        assert rows["Worker"][5] == "(Base)"
+        assert rows["Worker.stop"][5].startswith("async ")
+
+
+class TestSymbolIndex:
+    """测试索引的建立、查询和增量刷新"""
+
+    def test_find(self, index, tree):
+        stats = index.refresh()
+        # build/ 被 .gitignore 忽略
+        assert stats["files"] == 2
+        assert stats["errors"] == 1
+        found = index.find("Worker")
+        assert [(s["path"], s["line"]) for s in found] == [
+            (str(tree / "pkg" / "worker.py"), 15)
+        ]
+        assert [s["qualname"] for s in index.find("Worker.run")] == ["Worker.run"]
+        assert {s["name"] for s in index.find("*", kind="class")} == {"Base", "Worker"}
+        assert index.find("h") == []
+        assert [s["qualname"] for s in index.find("h", include_imports=True)] == [
+            ".utils.helper"
+        ]
+
+    def test_incremental_refresh(self, index, tree):
+        index.refresh()
+        assert index.refresh()["parsed"] == 0
+        path = tree / "pkg" / "worker.py"
+        path.write_text(SOURCE + "\ndef added():\n    pass\n")
+        os.utime(path, ns=(1, 1))
+        stats = index.refresh()
+        assert stats["parsed"] == 1
+        assert index.find("added")
+        (tree / "pkg" / "broken.py").unlink()
+        assert index.refresh()["removed"] == 1
+
+    def test_persisted(self, index, tree, tmp_path):
+        index.refresh()
+        reopened = SymbolIndex(tree, db_path=tmp_path / "symbols.sqlite3")
+        try:
+            assert reopened.refresh()["parsed"] == 0
+            assert reopened.find("main")
+        finally:
+            reopened.close()
+
+    def test_parallel(self, index, tree, monkeypatch):
+        monkeypatch.setattr(symbol_index_module, "PARALLEL_THRESHOLD", 1)
+        for i in range(5):
+            (tree / "pkg" / f"mod{i}.py").write_text(f"def func{i}():\n    pass\n")
+        stats = index.refresh()
+        assert stats["parallel"]
+        assert stats["parsed"] == 7
+        assert index.find("func4")
+
+
+class TestOutline:
+    """测试单个文件的符号列表"""
+
+    def test_outline_updates_stale_file(self, index, tree):
+        index.refresh()
+        path = tree / "pkg" / "worker.py"
+        names = [s["qualname"] for s in index.outline(path) if s["kind"] != "import"]
+        assert names == ["Base", "Worker", "Worker.run", "Worker.stop", "main"]
+        path.write_text("def only():\n    pass\n")
+        os.utime(path, ns=(2, 2))
+        assert [s["qualname"] for s in index.outline(path)] == ["only"]
+        # 刷新前查询也能看到修改后的结果
+        assert index.find("only")
+
+    def test_outline_ignored_file(self, index, tree):
+        index.refresh()
+        symbols = index.outline(tree / "build" / "worker.py")
+        assert [s["qualname"] for s in symbols] == ["Worker"]
+
+    def test_outline_syntax_error(self, index, tree):
+        index.refresh()
+        with pytest.raises(SyntaxError):
+            index.outline(tree / "pkg" / "broken.py")
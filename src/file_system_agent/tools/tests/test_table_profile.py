@@ -0,0 +1,148 @@
+# type: ignore
+"""
+测试 table_profile 流式表格统计
+"""
+
+import json
+
+import pytest
+
+from ..src.file_system_tools import table_profile
+from ..src.file_system_tools.table_profile import profile_table
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """分别使用 numpy 和纯 Python 实现"""
+    if request.param == "numpy":
+        if table_profile.np is None:
+            pytest.skip("没有安装 numpy")
+    else:
+        monkeypatch.setattr(table_profile, "np", None)
+    # 使用较小的块，覆盖跨块合并
+    monkeypatch.setattr(table_profile, "CHUNK_CELLS", 20)
+    return request.param
+
+
+def columns(profile):
+    return {c["name"]: c for c in profile["columns"]}
+
+
+class TestCsv:
+    """测试 CSV 统计"""
+
+    def test_profile(self, tmp_path, backend):
+        path = tmp_path / "data.csv"
+        rows = ["id,price,city,note"]
+        for i in range(1, 101):
+            price = "" if i % 10 == 0 else f"{i * 1.5}"
+            rows.append(f"{i},{price},{'北京' if i % 3 else '上海'},n{i % 4}")
+        path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+
+        profile = profile_table(path)
+        assert profile["format"] == "csv"
+        assert profile["rows"] == 100
+        assert profile["vectorized"] == (backend == "numpy")
+        cols = columns(profile)
+        assert cols["id"]["type"] == "integer"
+        assert (cols["id"]["min"], cols["id"]["max"]) == (1, 100)
+        assert cols["id"]["mean"] == pytest.approx(50.5)
+        assert cols["price"]["type"] == "float"
+        assert cols["price"]["nulls"] == 10
+        assert cols["city"]["type"] == "string"
+        assert cols["city"]["top"][0] == ("北京", 67)
+        assert cols["note"]["distinct"] == 4
+
+    def test_mixed_and_delimiter(self, tmp_path, backend):
+        path = tmp_path / "data.txt"
+        path.write_text("a;b\n1;x\nfoo;y\n3;\n", encoding="utf-8")
+        profile = profile_table(path)
+        cols = columns(profile)
+        assert cols["a"]["type"] == "mixed"
+        assert cols["a"]["numeric"] == 2
+        assert cols["a"]["max"] == 3
+        assert cols["b"]["nulls"] == 1
+
+    def test_gbk_and_no_header(self, tmp_path, backend):
+        path = tmp_path / "data.csv"
+        path.write_bytes("张三,18\n李四,20\n".encode("gbk"))
+        profile = profile_table(path, has_header=False)
+        assert profile["encoding"] == "gb18030"
+        assert profile["rows"] == 2
+        cols = columns(profile)
+        assert cols["column_1"]["samples"] == ["张三", "李四"]
+        assert cols["column_2"]["mean"] == 19
+
+    def test_max_rows(self, tmp_path, backend):
+        path = tmp_path / "data.csv"
+        path.write_text("n\n" + "".join(f"{i}\n" for i in range(50)))
+        profile = profile_table(path, max_rows=20)
+        assert profile["rows"] == 20
+        assert profile["truncated"]
+        assert columns(profile)["n"]["max"] == 19
+
+    def test_distinct_is_bounded(self, tmp_path, monkeypatch, backend):
+        monkeypatch.setattr(table_profile, "MAX_DISTINCT", 10)
+        path = tmp_path / "data.csv"
+        path.write_text("v\n" + "".join(f"k{i}\n" for i in range(100)) + "k1\n" * 50)
+        column = columns(profile_table(path))["v"]
+        assert not column["distinct_exact"]
+        assert column["distinct"] <= 10
+        assert column["top"][0][0] == "k1"
+
+    def test_wide_rows(self, tmp_path, monkeypatch, backend):
+        """超过 MAX_COLUMNS 的列只计数，块按单元格数切分"""
+        monkeypatch.setattr(table_profile, "MAX_COLUMNS", 3)
+        path = tmp_path / "wide.csv"
+        path.write_text(
+            "a,b,c,d,e\n" + "".join(f"{i},{i},{i},x,y\n" for i in range(10)) + "1,2\n"
+        )
+        profile = profile_table(path)
+        assert profile["rows"] == 11
+        assert [c["name"] for c in profile["columns"]] == ["a", "b", "c"]
+        assert profile["columns_skipped"] == 2
+        cols = columns(profile)
+        assert cols["a"]["max"] == 9
+        assert cols["c"]["nulls"] == 1
+
+
+class TestJsonl:
+    """测试 JSONL 统计"""
+
+    def test_profile(self, tmp_path, backend):
+        path = tmp_path / "events.jsonl"
+        records = [{"id": i, "ok": i % 2 == 0, "score": i / 2} for i in range(20)]
+        # 后出现的列，之前的行算作空值
+        records.append({"id": 20, "tags": ["a", "b"]})
+        lines = [json.dumps(r) for r in records] + ["not json", "[1, 2]", ""]
+        path.write_text("\n".join(lines) + "\n")
+
+        profile = profile_table(path)
+        assert profile["format"] == "jsonl"
+        assert profile["rows"] == 21
+        assert profile["bad_rows"] == 2
+        cols = columns(profile)
+        assert cols["id"]["type"] == "integer"
+        assert cols["ok"]["type"] == "string"
+        assert cols["score"]["type"] == "float"
+        assert cols["score"]["nulls"] == 1
+        assert cols["tags"]["nulls"] == 20
+        assert cols["tags"]["samples"] == ['["a", "b"]']
+
+    def test_wide_records(self, tmp_path, monkeypatch, backend):
+        monkeypatch.setattr(table_profile, "MAX_COLUMNS", 2)
+        path = tmp_path / "wide.jsonl"
+        records = [{"a": i, "b": i, "c": i} for i in range(10)] + [{"d": 1, "a": 10}]
+        path.write_text("".join(json.dumps(r) + "\n" for r in records))
+        profile = profile_table(path)
+        assert [c["name"] for c in profile["columns"]] == ["a", "b"]
+        assert profile["columns_skipped"] == 2
+        assert columns(profile)["a"]["max"] == 10
+        assert columns(profile)["b"]["nulls"] == 1
+
+
+def test_binary_file_rejected(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"\x00\x01" * 100)
+    with pytest.raises(ValueError):
+        profile_table(path)
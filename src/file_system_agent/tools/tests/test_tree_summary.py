@@ -0,0 +1,76 @@
+# type: ignore
+"""
+测试 TreeSummarizer 目录树汇总
+"""
+
+import os
+
+import pytest
+
+from ..src.file_system_tools.tree_summary import TreeSummarizer
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """root/a(100+50) root/a/deep(1000) root/b(10) root/top.bin(5)"""
+    (tmp_path / "a" / "deep").mkdir(parents=True)
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a" / "x.bin").write_bytes(b"x" * 100)
+    (tmp_path / "a" / "y.bin").write_bytes(b"x" * 50)
+    (tmp_path / "a" / "deep" / "big.bin").write_bytes(b"x" * 1000)
+    (tmp_path / "b" / "small.bin").write_bytes(b"x" * 10)
+    (tmp_path / "top.bin").write_bytes(b"x" * 5)
+    return tmp_path
+
+
+class TestTreeSummarizer:
+    """测试汇总结果、限制和缓存"""
+
+    def test_totals(self, tree):
+        """测试总大小、文件数和最大的目录/文件"""
+        summary = TreeSummarizer(max_workers=4).summarize(tree, top_n=2)
+
+        assert summary["total_size"] == 1165
+        assert summary["file_count"] == 5
+        assert summary["dir_count"] == 3
+        assert summary["truncated"] is False
+        assert summary["top_dirs"] == [
+            {"path": str(tree / "a"), "size": 1150},
+            {"path": str(tree / "a" / "deep"), "size": 1000},
+        ]
+        assert summary["top_files"][0] == {
+            "path": str(tree / "a" / "deep" / "big.bin"),
+            "size": 1000,
+        }
+
+    def test_depth_limit(self, tree):
+        """测试深度限制会截断结果"""
+        summary = TreeSummarizer().summarize(tree, max_depth=1)
+
+        assert summary["truncated"] is True
+        assert summary["total_size"] == 165
+
+    def test_symlinks_not_followed(self, tree):
+        """测试符号链接不会被跟随或重复统计"""
+        try:
+            (tree / "loop").symlink_to(tree)
+        except OSError:
+            pytest.skip("无法创建符号链接，可能是权限问题")
+
+        summary = TreeSummarizer().summarize(tree)
+        assert summary["total_size"] == 1165
+
+    def test_cache_only_rescans_changed_dirs(self, tree):
+        """测试重复汇总时只重新扫描 mtime 变化的目录"""
+        summarizer = TreeSummarizer()
+        summarizer.summarize(tree)
+        assert summarizer.rescanned == 4
+
+        summarizer.summarize(tree)
+        assert summarizer.rescanned == 0
+
+        (tree / "b" / "new.bin").write_bytes(b"x" * 20)
+        os.utime(tree / "b", ns=(0, 1))
+        summary = summarizer.summarize(tree)
+        assert summarizer.rescanned == 1
+        assert summary["total_size"] == 1185
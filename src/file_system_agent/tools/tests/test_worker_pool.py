@@ -0,0 +1,160 @@
+# type: ignore
+"""
+测试 worker_pool 预热的 Python 工作进程池
+"""
+
+import asyncio
+import sys
+import time
+
+import pytest
+
+from ..src.file_system_tools.worker_pool import WorkerPool
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(size=2, max_runs=3)
+    yield pool
+    pool.close()
+
+
+def write_script(tmp_path, body, name="script.py"):
+    path = tmp_path / name
+    path.write_text(body, encoding="utf-8")
+    return path
+
+
+class TestWorkerPool:
+    """测试进程池执行脚本"""
+
+    def test_output_and_timing(self, tmp_path):
+        pool = WorkerPool(size=1)
+        script = write_script(
+            tmp_path, "import sys\nprint('hi', sys.argv[1:])\nsys.exit(2)\n"
+        )
+        first = pool.run(script, ["x"])
+        assert first["exit_code"] == 2
+        assert first["output"] == "hi ['x']\n"
+        second = pool.run(script)
+        # 第二次使用的是已经启动好的工作进程
+        assert second["startup_time"] == 0
+        assert second["exec_time"] <= second["duration"]
+        pool.close()
+
+    def test_isolated_globals(self, pool, tmp_path):
+        script = write_script(
+            tmp_path,
+            "try:\n    counter\n    print('leaked')\nexcept NameError:\n    counter = 1\n    print('fresh')\n",
+        )
+        outputs = {pool.run(script)["output"] for _ in range(4)}
+        assert outputs == {"fresh\n"}
+
+    def test_exception_and_fd_output(self, pool, tmp_path):
+        script = write_script(
+            tmp_path,
+            "import os\nos.write(1, b'raw\\n')\nraise ValueError('boom')\n",
+        )
+        result = pool.run(script)
+        assert result["exit_code"] == 1
+        assert "raw" in result["output"]
+        assert "ValueError: boom" in result["output"]
+
+    def test_recycle_after_max_runs(self, tmp_path):
+        pool = WorkerPool(size=1, max_runs=3)
+        script = write_script(tmp_path, "pass\n")
+        recycled = [pool.run(script)["recycled"] for _ in range(4)]
+        assert recycled == [False, False, True, False]
+        pool.close()
+
+    def test_timeout_replaces_worker(self, pool, tmp_path):
+        slow = write_script(tmp_path, "import time\ntime.sleep(30)\n", "slow.py")
+        result = pool.run(slow, timeout=0.5)
+        assert result["timed_out"]
+        fast = write_script(tmp_path, "print('ok')\n", "fast.py")
+        assert pool.run(fast)["output"] == "ok\n"
+
+    def test_worker_exit(self, pool, tmp_path):
+        script = write_script(tmp_path, "import os\nos._exit(7)\n")
+        result = pool.run(script)
+        assert result["exit_code"] == 7
+        assert not result["timed_out"]
+
+    def test_reload_edited_helper(self, tmp_path):
+        pool = WorkerPool(size=1)
+        helper = write_script(tmp_path, "VALUE = 1\n", "helper.py")
+        script = write_script(tmp_path, "import helper\nprint(helper.VALUE)\n")
+        assert pool.run(script)["output"] == "1\n"
+        # 修改后的文件大小不同，即使修改时间相同也不会使用旧的字节码缓存
+        helper.write_text("VALUE = 'changed'\n", encoding="utf-8")
+        assert pool.run(script)["output"] == "changed\n"
+        pool.close()
+
+    def test_keep_site_packages_under_script_dir(self, tmp_path):
+        """脚本目录中虚拟环境的第三方库不会在每次运行后被删除"""
+        pool = WorkerPool(size=1)
+        site = tmp_path / ".venv" / "lib" / "site-packages"
+        site.mkdir(parents=True)
+        write_script(
+            site,
+            "import sys\nsys.fake_loads = getattr(sys, 'fake_loads', 0) + 1\n",
+            "fakelib.py",
+        )
+        script = write_script(
+            tmp_path,
+            f"import sys\nsys.path.insert(0, {str(site)!r})\n"
+            "import fakelib\nprint(sys.fake_loads)\n",
+        )
+        assert pool.run(script)["output"] == "1\n"
+        assert pool.run(script)["output"] == "1\n"
+        pool.close()
+
+    def test_output_between_runs(self, tmp_path):
+        pool = WorkerPool(size=1)
+        script = write_script(
+            tmp_path,
+            "import os, threading, time\n"
+            "def late():\n"
+            "    time.sleep(0.2)\n"
+            "    print('late')\n"
+            "    os.write(2, b'late\\n')\n"
+            "threading.Thread(target=late).start()\n",
+        )
+        assert pool.run(script)["exit_code"] == 0
+        time.sleep(0.4)
+        # 运行结束后的输出被丢弃，不会破坏协议
+        second = pool.run(script)
+        assert second["exit_code"] == 0
+        assert second["output"] == ""
+        assert not second["recycled"]
+        pool.close()
+
+    def test_unparseable_response_replaces_worker(self, tmp_path):
+        fake = tmp_path / "fake_python"
+        fake.write_text(
+            f"#!{sys.executable}\n"
+            "import sys\n"
+            "print('{\"ready\": true}', flush=True)\n"
+            "for line in sys.stdin:\n"
+            "    print('garbage', flush=True)\n"
+        )
+        fake.chmod(0o755)
+        pool = WorkerPool(size=1, python=str(fake))
+        script = write_script(tmp_path, "pass\n")
+        for _ in range(2):
+            result = pool.run(script)
+            assert not result["timed_out"]
+            assert result["exit_code"] is not None
+            assert result["recycled"]
+        pool.close()
+
+    def test_async(self, pool, tmp_path):
+        script = write_script(tmp_path, "print('async')\n")
+        result = asyncio.run(pool.run_async(script))
+        assert result["output"] == "async\n"
+
+    def test_closed(self, tmp_path):
+        pool = WorkerPool(size=1)
+        pool.close()
+        with pytest.raises(RuntimeError):
+            pool.run(write_script(tmp_path, "pass\n"))